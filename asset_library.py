@@ -0,0 +1,319 @@
+"""
+Local image library for PICTURE placeholders
+
+An asset directory is indexed once: every image's keywords (the words of its
+path relative to the library, plus any listed in an optional keywords.json) go
+into an inverted index, and its content hash is recorded so renditions can be
+cached by content. The index is kept in the cache directory and revalidated by
+file size and mtime, so only new or changed files are hashed again.
+
+Images are selected by the keywords an outline supplies, weighted so rare
+keywords count for more than common ones. Renditions (centre-cropped to the
+placeholder's aspect ratio and scaled down to its size at RENDITION_DPI) are
+decoded and resized on a thread pool, stored on disk by content hash and kept
+in memory, so an image shared by many slides or decks is decoded once.
+DeckImages then adds each distinct rendition to a deck as a single media part.
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+from PIL import Image as PILImage, ImageOps
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml.shapes.picture import CT_Picture
+from pptx.parts.image import Image, ImagePart
+
+from template_cache import file_sha256
+
+DEFAULT_CACHE_DIR = ".cache/images"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".webp"}
+KEYWORDS_FILE = "keywords.json"
+INDEX_VERSION = 1
+# Pixels per inch of placeholder, enough for a projected slide
+RENDITION_DPI = 150
+JPEG_QUALITY = 85
+EMU_PER_INCH = 914400
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "and", "at", "by", "for", "from", "in", "into", "is", "it", "of",
+              "on", "or", "the", "to", "with", "img", "image", "photo", "picture"}
+
+
+def keywords(text) -> Set[str]:
+    """Normalised keyword set of a string or list of strings"""
+    if not isinstance(text, str):
+        text = " ".join(str(item) for item in text or ())
+    words = set()
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS or word.isdigit() or len(word) < 2:
+            continue
+        # Fold simple plurals so "servers" matches "server"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return words
+
+
+class Asset:
+    """One image of the library"""
+
+    __slots__ = ("path", "sha256", "keywords")
+
+    def __init__(self, path: str, sha256: str, keywords: Set[str]):
+        self.path = path
+        self.sha256 = sha256
+        self.keywords = keywords
+
+
+class AssetLibrary:
+    """Keyword index and rendition cache over an image directory"""
+
+    def __init__(self, directory: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 workers: int = None, memory_items: int = 256):
+        self.directory = os.path.abspath(directory)
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self._workers = workers or min(8, os.cpu_count() or 1)
+        self._executor = None
+        self._lock = threading.Lock()
+        # Rendition key -> Future of a pptx Image, most recently used last
+        self._renditions: "OrderedDict[str, Future]" = OrderedDict()
+        self.assets: List[Asset] = []
+        self._postings: Dict[str, List[int]] = {}
+        self.signature = None
+        self.renditions_made = 0
+        self.index_hashed = 0
+        self.refresh()
+
+    # -- index --
+
+    def _index_path(self) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        name = hashlib.sha256(self.directory.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"index-{name}.json")
+
+    def _read_keywords_file(self) -> Dict[str, Set[str]]:
+        try:
+            with open(os.path.join(self.directory, KEYWORDS_FILE), 'r') as f:
+                listed = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {path.replace("\\", "/"): keywords(words) for path, words in listed.items()}
+
+    def refresh(self):
+        """(Re)build the keyword index, hashing only files that are new or changed"""
+        index_path = self._index_path()
+        previous = {}
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    stored = json.load(f)
+                if stored.get("version") == INDEX_VERSION:
+                    previous = stored["files"]
+            except (OSError, ValueError, KeyError):
+                previous = {}
+
+        listed = self._read_keywords_file()
+        files = {}
+        for root, dirs, names in os.walk(self.directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(names):
+                if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                relpath = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                stat = os.stat(path)
+                entry = previous.get(relpath)
+                if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+                    self.index_hashed += 1
+                files[relpath] = entry
+
+        assets, postings = [], {}
+        for relpath, entry in files.items():
+            words = keywords(os.path.splitext(relpath)[0]) | listed.get(relpath, set())
+            for word in words:
+                postings.setdefault(word, []).append(len(assets))
+            assets.append(Asset(os.path.join(self.directory, relpath), entry["sha256"], words))
+        self.assets, self._postings = assets, postings
+        self.signature = hashlib.sha256(json.dumps(
+            [[relpath, entry["sha256"], sorted(assets[i].keywords)]
+             for i, (relpath, entry) in enumerate(files.items())]).encode("utf-8")).hexdigest()
+
+        if index_path and files != previous:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": INDEX_VERSION, "directory": self.directory, "files": files}, f)
+            os.replace(tmp_path, index_path)
+
+    def select(self, wanted: Iterable[str]) -> Optional[Asset]:
+        """Best matching asset for a keyword set, or None when nothing matches
+
+        Each matched keyword scores its inverse document frequency; ties go to the
+        asset listed first, so the same keywords always pick the same image.
+        """
+        scores: Dict[int, float] = {}
+        total = len(self.assets)
+        for word in wanted:
+            posting = self._postings.get(word)
+            if not posting:
+                continue
+            weight = math.log(1 + total / len(posting))
+            for position in posting:
+                scores[position] = scores.get(position, 0.0) + weight
+        if not scores:
+            return None
+        best = max(scores.items(), key=lambda item: (item[1], -item[0]))[0]
+        return self.assets[best]
+
+    # -- renditions --
+
+    @staticmethod
+    def target_pixels(width: int, height: int):
+        """Pixel size of a rendition for a placeholder of width x height EMU"""
+        return (max(1, round(width / EMU_PER_INCH * RENDITION_DPI)),
+                max(1, round(height / EMU_PER_INCH * RENDITION_DPI)))
+
+    def rendition(self, asset: Asset, width: int, height: int) -> Future:
+        """Future of a pptx Image of `asset` cropped and scaled for a width x height EMU box"""
+        size = self.target_pixels(width, height)
+        key = hashlib.sha256(
+            f"{asset.sha256}:{size[0]}x{size[1]}:{RENDITION_DPI}:{JPEG_QUALITY}".encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            future = self._renditions.get(key)
+            if future is not None:
+                self._renditions.move_to_end(key)
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix="assets")
+            future = self._executor.submit(self._load_rendition, key, asset, size)
+            self._renditions[key] = future
+            while len(self._renditions) > self.memory_items:
+                self._renditions.popitem(last=False)
+        return future
+
+    def _cache_path(self, key: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, key) if self.cache_dir else None
+
+    def _load_rendition(self, key: str, asset: Asset, size) -> Image:
+        cache_path = self._cache_path(key)
+        blob = None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                blob = f.read()
+        if blob is None:
+            blob = self._render(asset.path, size)
+            if cache_path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Unique across processes sharing the cache, not just across this one's threads
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(blob)
+                    os.replace(tmp_path, cache_path)
+                except BaseException:
+                    try:
+                        os.remove(tmp_path)
+                    except FileNotFoundError:
+                        pass
+                    raise
+        image = Image.from_blob(blob)
+        # Compute the lazy properties here rather than on the render thread
+        image.sha1, image.size, image.content_type, image.ext
+        return image
+
+    def _render(self, path: str, size) -> bytes:
+        """Decode, crop to the target aspect ratio and scale down, never up"""
+        with PILImage.open(path) as source:
+            # Let JPEG decode at a reduced scale when the source is much larger
+            source.draft("RGB", size)
+            picture = ImageOps.exif_transpose(source)
+            has_alpha = picture.mode in ("RGBA", "LA") or "transparency" in picture.info
+            # The centre crop is min(width/w, height/h) targets wide; keep smaller sources as they are
+            scale = min(1.0, picture.width / size[0], picture.height / size[1])
+            target = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+            crop_width = min(picture.width, picture.height * size[0] / size[1])
+            crop_height = min(picture.height, crop_width * size[1] / size[0])
+            left, top = (picture.width - crop_width) / 2, (picture.height - crop_height) / 2
+            picture = picture.convert("RGBA" if has_alpha else "RGB").resize(
+                target, PILImage.LANCZOS, box=(left, top, left + crop_width, top + crop_height),
+                reducing_gap=3.0)
+        out = io.BytesIO()
+        if has_alpha:
+            picture.save(out, "PNG")
+        else:
+            picture.save(out, "JPEG", quality=JPEG_QUALITY)
+        # Runs on the asset pool, so several renders may finish at once
+        with self._lock:
+            self.renditions_made += 1
+        return out.getvalue()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class DeckImages:
+    """Add images to one deck, storing each distinct image as a single media part
+
+    Replaces python-pptx's lookup, which walks every relationship of the package
+    for each picture inserted.
+    """
+
+    def __init__(self, prs):
+        self.prs = prs
+        self._parts: Dict[str, ImagePart] = {}
+        self._next_number = 1
+        for part in prs.part.package.iter_parts():
+            if isinstance(part, ImagePart):
+                self._parts.setdefault(part.sha1, part)
+            if part.partname.startswith("/ppt/media/image") and part.partname.idx is not None:
+                self._next_number = max(self._next_number, part.partname.idx + 1)
+
+    def image_part(self, image: Image) -> ImagePart:
+        part = self._parts.get(image.sha1)
+        if part is None:
+            partname = PackURI(f"/ppt/media/image{self._next_number}.{image.ext}")
+            self._next_number += 1
+            part = ImagePart(partname, image.content_type, self.prs.part.package, image.blob)
+            self._parts[image.sha1] = part
+        return part
+
+    def insert(self, placeholder, image: Image, box=None):
+        """placeholder.insert_picture(image) with the deck's shared media part
+
+        box is the placeholder's (width, height) when already known; looking it up
+        through the layout is the slowest step of an insert.
+        """
+        rId = placeholder.part.relate_to(self.image_part(image), RT.IMAGE)
+        pic = CT_Picture.new_ph_pic(placeholder.shape_id, placeholder.name, f"image.{image.ext}", rId)
+        pic.crop_to_fit(image.size, box or (placeholder.width, placeholder.height))
+        placeholder._replace_placeholder_with(pic)
+
+
+_libraries: Dict[tuple, AssetLibrary] = {}
+_libraries_lock = threading.Lock()
+
+
+def open_library(directory: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> AssetLibrary:
+    """Shared AssetLibrary for a directory, so batch and server builds reuse renditions"""
+    key = (os.path.abspath(directory), cache_dir)
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is None:
+            library = _libraries[key] = AssetLibrary(directory, cache_dir)
+        return library
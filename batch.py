@@ -0,0 +1,102 @@
+"""
+Batch mode: build many decks from a topics file with one warm generator
+
+Outline generation is I/O bound (one GenAI round-trip per topic), so outlines are
+requested concurrently on a thread pool. Rendering shares the generator's
+template state and runs on the calling thread as each outline arrives.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+
+def load_topics(topics_file: str) -> List[Dict]:
+    """Read topics from a .txt file (one per line) or a .jsonl file
+
+    JSONL lines may be a plain string or an object with a "topic" key and an
+    optional "output" path. Blank lines and lines starting with # are skipped.
+    """
+    topics = []
+    with open(topics_file, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if topics_file.endswith('.jsonl'):
+                entry = json.loads(line)
+                if isinstance(entry, str):
+                    entry = {"topic": entry}
+                if not entry.get("topic"):
+                    raise ValueError(f"{topics_file}:{line_number}: missing 'topic'")
+                topics.append(entry)
+            else:
+                topics.append({"topic": line})
+    return topics
+
+
+def run_batch(generator, topics: List[Dict], output_dir: str = "output",
+              concurrency: int = 4) -> List[Dict]:
+    """Generate and render a deck per topic, returning a per-topic report
+
+    Decks are written as soon as their outline arrives, so the report order
+    follows completion order. A failed outline or render is recorded and does
+    not stop the rest of the batch.
+    """
+    from metrics import BuildMetrics
+    from presentation_generator import safe_topic_name
+
+    os.makedirs(output_dir, exist_ok=True)
+    report = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {}
+        for entry in topics:
+            metrics = BuildMetrics(entry["topic"])
+            future = pool.submit(_timed_outline, generator, entry["topic"], metrics)
+            futures[future] = (entry, metrics)
+
+        for future in as_completed(futures):
+            entry, metrics = futures[future]
+            topic = entry["topic"]
+            output_path = entry.get("output") or os.path.join(
+                output_dir, f"{safe_topic_name(topic)}.pptx"
+            )
+            result = {"topic": topic, "output": output_path}
+            try:
+                outline, result["outline_seconds"] = future.result()
+                render_started = time.perf_counter()
+                generator.create_presentation(outline, output_path, metrics)
+                result["render_seconds"] = round(time.perf_counter() - render_started, 3)
+                result["status"] = "ok"
+            except Exception as e:
+                print(f"❌ Batch item failed for '{topic}': {e}")
+                result["status"] = "failed"
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["metrics"] = metrics.to_record()
+            report.append(result)
+
+    succeeded = sum(1 for r in report if r["status"] == "ok")
+    elapsed = time.perf_counter() - started
+    print(f"\n📦 Batch finished: {succeeded}/{len(report)} decks in {elapsed:.1f}s")
+    for result in report:
+        marker = "✅" if result["status"] == "ok" else "❌"
+        print(f"  {marker} {result['topic']} -> {result.get('error', result['output'])}")
+    return report
+
+
+def _timed_outline(generator, topic: str, metrics=None):
+    """Generate one outline and return it together with its latency"""
+    started = time.perf_counter()
+    outline = generator.generate_outline(topic, fallback_to_mock=False, metrics=metrics)
+    return outline, round(time.perf_counter() - started, 3)
+
+
+def write_report(report: List[Dict], report_path: str):
+    """Write the batch report as JSON"""
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Batch report saved to: {report_path}")
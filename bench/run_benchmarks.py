@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmark outline-to-deck rendering at scale
+
+Every (format, size) case runs in a fresh interpreter so template-load timings
+are cold and peak RSS belongs to that case alone. Template load, slide rendering
+and saving are timed separately through the real PresentationGenerator code
+paths, and the results are written as JSON for comparison between commits.
+
+Usage:
+    python3 bench/run_benchmarks.py
+    python3 bench/run_benchmarks.py --sizes 10,100 --formats layouts
+    python3 bench/run_benchmarks.py --compare bench/results/<old>.json
+    python3 bench/run_benchmarks.py --slim -o bench/results/slim.json
+    python3 bench/run_benchmarks.py --stream-write --formats layouts --sizes 1000,5000
+    python3 bench/run_benchmarks.py --render-workers 1,2,4,8 --sizes 2000
+    python3 bench/run_benchmarks.py --save-levels pptx,0,1,6,9 --formats layouts --sizes 100,500
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = "10,100,500,2000"
+DEFAULT_TEMPLATE = os.path.join(ROOT, "input", "branding.pptx")
+# "pptx" saves with python-pptx's own prs.save; numbers are package_writer compression levels
+DEFAULT_SAVE_LEVELS = "6"
+TIMED_PHASES = ("template_load_cold", "template_load_warm", "render", "save")
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    """Peak resident set size of this process (or its largest finished child) in MiB"""
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(outline_format: str, slide_count: int, template_path: str, slim: bool = False,
+             stream_write: bool = False, render_workers: int = 1, save_level: str = "6") -> dict:
+    """Build one synthetic deck in this process and return its measurements
+
+    With slim the unused layouts and duplicate media are dropped before saving,
+    and the slimming pass is timed on its own. With stream_write (layouts format)
+    each slide is written to the zip as it is rendered, so render includes
+    serializing slides and save only finishes the package. With render_workers
+    above 1 the slides are rendered by a process pool, which is started (and
+    timed as pool_start) before rendering. save_level "pptx" saves with
+    prs.save; a number saves with package_writer at that compression level.
+    """
+    import pptx  # noqa: F401  keep import time out of the template load timing
+    from package_writer import DEFAULT_COMPRESSION_LEVEL, save_package
+    from presentation_generator import PresentationGenerator
+    from synthetic import OUTLINE_FORMATS
+    from template_cache import template_cache
+
+    outline = OUTLINE_FORMATS[outline_format](slide_count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PresentationGenerator(template_path)
+        generator.render_workers = render_workers
+
+        started = time.perf_counter()
+        template_cache.get(template_path)
+        template_load_cold = time.perf_counter() - started
+
+        started = time.perf_counter()
+        generator.prs = template_cache.get(template_path)
+        template_load_warm = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "bench.pptx")
+            streamed = stream_write and outline_format == "layouts"
+            if streamed:
+                from stream_writer import StreamingDeckWriter
+                level = DEFAULT_COMPRESSION_LEVEL if save_level == "pptx" else int(save_level)
+                generator._writer = StreamingDeckWriter(generator.prs, output_path, level)
+
+            pool_start = 0.0
+            if render_workers > 1:
+                from parallel_render import get_pool
+                started = time.perf_counter()
+                get_pool(generator, render_workers)
+                pool_start = time.perf_counter() - started
+
+            started = time.perf_counter()
+            if outline_format == "layouts":
+                generator._create_presentation_from_layouts(outline["layouts"])
+            else:
+                generator._create_presentation_from_slides(outline)
+            render = time.perf_counter() - started
+
+            slim_seconds = 0.0
+            if slim and not streamed:
+                from slim import slim_presentation
+                started = time.perf_counter()
+                slim_presentation(generator.prs)
+                slim_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            if streamed:
+                generator._writer.close()
+            elif save_level == "pptx":
+                generator.prs.save(output_path)
+            else:
+                save_package(generator.prs, output_path, int(save_level))
+            save = time.perf_counter() - started
+            output_bytes = os.path.getsize(output_path)
+
+        if render_workers > 1:
+            from parallel_render import shutdown_pools
+            shutdown_pools()
+
+    return {
+        "format": outline_format,
+        "requested_slides": slide_count,
+        "render_workers": render_workers,
+        "save_level": save_level,
+        "slides": len(generator.prs.slides),
+        "template_load_cold": round(template_load_cold, 4),
+        "template_load_warm": round(template_load_warm, 4),
+        "pool_start": round(pool_start, 4),
+        "render": round(render, 4),
+        "render_per_slide_ms": round(render / max(len(generator.prs.slides), 1) * 1000, 3),
+        "slim": round(slim_seconds, 4),
+        "save": round(save, 4),
+        "output_bytes": output_bytes,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "worker_peak_rss_mb": round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def _run_case_in_subprocess(outline_format: str, slide_count: int, template_path: str,
+                            slim: bool = False, stream_write: bool = False,
+                            render_workers: int = 1, save_level: str = "6") -> dict:
+    command = [sys.executable, "-W", "ignore", os.path.abspath(__file__), "--run-case",
+               outline_format, str(slide_count), "--template", template_path]
+    if slim:
+        command.append("--slim")
+    if stream_write:
+        command.append("--stream-write")
+    command += ["--render-workers", str(render_workers), "--save-levels", save_level]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a description of every timed phase that regressed beyond `threshold`"""
+    def key(case):
+        # Results from before save levels existed were saved with prs.save
+        return (case["format"], case["requested_slides"], case.get("render_workers", 1),
+                case.get("save_level", "pptx"))
+
+    previous = {key(c): c for c in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = previous.get(key(case))
+        if not old:
+            continue
+        for phase in TIMED_PHASES + ("peak_rss_mb",):
+            before, after = old.get(phase), case.get(phase)
+            if before and after and after > before * (1 + threshold):
+                regressions.append(
+                    f"{case['format']}/{case['requested_slides']}/{case.get('render_workers', 1)}w/"
+                    f"{case.get('save_level', 'pptx')} {phase}: "
+                    f"{before} -> {after} (+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outline-to-deck rendering")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated slide counts (default: {DEFAULT_SIZES})")
+    parser.add_argument("--formats", default="layouts,slides",
+                        help="Comma-separated outline formats (default: layouts,slides)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Template to render with")
+    parser.add_argument("-o", "--output", help="Results file (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression (default: 0.2)")
+    parser.add_argument("--slim", action="store_true",
+                        help="Slim each deck (drop unused layouts, dedupe media) before saving")
+    parser.add_argument("--stream-write", action="store_true",
+                        help="Write layouts-format slides to the zip as they are rendered")
+    parser.add_argument("--render-workers", default="1",
+                        help="Comma-separated render process counts to run each case with (default: 1)")
+    parser.add_argument("--save-levels", default=DEFAULT_SAVE_LEVELS,
+                        help="Comma-separated save methods to run each case with: pptx for prs.save, "
+                             f"0-9 for package_writer at that compression level (default: {DEFAULT_SAVE_LEVELS})")
+    parser.add_argument("--run-case", nargs=2, metavar=("FORMAT", "SLIDES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        outline_format, slide_count = args.run_case
+        print(json.dumps(run_case(outline_format, int(slide_count), args.template, args.slim,
+                                  args.stream_write, int(args.render_workers), args.save_levels)))
+        return
+
+    commit = _git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "template": os.path.relpath(args.template, ROOT),
+        "slim": args.slim,
+        "stream_write": args.stream_write,
+        "cases": [],
+    }
+
+    print(f"{'format':<8} {'slides':>6} {'workers':>7} {'load':>8} {'clone':>8} {'render':>8} "
+          f"{'speedup':>7} {'level':>5} {'save':>8} {'size MB':>8} {'RSS MB':>8}")
+    for outline_format in args.formats.split(","):
+        for size in args.sizes.split(","):
+            baseline_render = None
+            for workers in args.render_workers.split(","):
+                for save_level in args.save_levels.split(","):
+                    case = _run_case_in_subprocess(outline_format, int(size), args.template, args.slim,
+                                                   args.stream_write, int(workers), save_level)
+                    results["cases"].append(case)
+                    baseline_render = baseline_render or case["render"]
+                    print(f"{outline_format:<8} {case['slides']:>6} {case['render_workers']:>7} "
+                          f"{case['template_load_cold']:>8.3f} {case['template_load_warm']:>8.3f} "
+                          f"{case['render']:>8.3f} {baseline_render / case['render']:>6.2f}x "
+                          f"{save_level:>5} {case['save']:>8.3f} {case['output_bytes'] / 1e6:>8.2f} "
+                          f"{case['peak_rss_mb']:>8.1f}")
+
+    output = args.output or os.path.join(ROOT, "bench", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
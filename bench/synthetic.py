@@ -0,0 +1,60 @@
+"""
+Synthetic outlines for benchmarks, in both the layouts and the legacy slides format
+"""
+
+import json
+import os
+from typing import Dict
+
+LAYOUTS_FILE = os.path.join(os.path.dirname(__file__), "..", "input", "slide_layouts.json")
+
+LOREM = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud "
+         "exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat. ")
+
+
+def load_layout_catalogue():
+    """Return the layouts list from slide_layouts.json"""
+    with open(LAYOUTS_FILE, 'r') as f:
+        return json.load(f)["layouts"]
+
+
+def _filler(slide_number: int, max_chars: int) -> str:
+    text = f"Slide {slide_number}: " + LOREM * 8
+    return text[:max_chars or 200]
+
+
+def make_layouts_outline(slide_count: int) -> Dict:
+    """Outline in the layouts format cycling through every layout in the catalogue"""
+    catalogue = load_layout_catalogue()
+    layouts = []
+    for n in range(slide_count):
+        layout = json.loads(json.dumps(catalogue[n % len(catalogue)]))
+        for placeholder in layout["placeholders"]:
+            if "PICTURE" not in placeholder["type"]:
+                placeholder["content"] = _filler(n + 1, placeholder.get("max_chars"))
+        layouts.append(layout)
+    return {"layouts": layouts}
+
+
+def make_slides_outline(slide_count: int) -> Dict:
+    """Outline in the legacy slides format; cover and closing slides are added by the renderer"""
+    slide_types = ["agenda", "executive_summary", "key_message", "content", "onepager"]
+    slides = []
+    for n in range(max(slide_count - 2, 0)):
+        slide_type = slide_types[n % len(slide_types)]
+        slide = {"type": slide_type, "title": f"Slide {n + 1}"}
+        if slide_type == "agenda":
+            slide["points"] = [f"Point {i}" for i in range(1, 6)]
+        elif slide_type == "key_message":
+            slide["message"] = _filler(n + 1, 150)
+        else:
+            slide["content"] = _filler(n + 1, 450)
+        slides.append(slide)
+    return {"title": "Benchmark Deck", "subtitle": "Synthetic content", "slides": slides}
+
+
+OUTLINE_FORMATS = {
+    "layouts": make_layouts_outline,
+    "slides": make_slides_outline,
+}
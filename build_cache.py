@@ -0,0 +1,193 @@
+"""
+Content-addressed cache of finished decks
+
+Scheduled jobs and retries often rebuild the same outline against the same
+template. Builds are keyed by a SHA-256 of everything that decides the output
+bytes: the template file hash, the layout catalogue key, the normalized outline,
+the render options that change the deck (text fitting, slimming, the image
+library's contents, the compression level) and a fingerprint of the rendering code and python-pptx
+version. A hit hands the stored .pptx back as a copy of the file, as bytes or
+into a stream, without importing python-pptx. Hardlinking instead of copying is
+opt-in (link_outputs), for callers that treat their outputs as read-only: a
+link shares the entry's read-only mode, and editing it in place would change
+the cached deck.
+
+Entries are written atomically (temp file + os.replace) and read-only, so
+several processes can share the cache. A hit refreshes the entry's mtime and
+eviction removes the least recently used decks once the cache exceeds its
+entry or byte budget, as in response_cache.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+DEFAULT_BUILD_CACHE_DIR = ".cache/builds"
+BUILD_CACHE_VERSION = 1
+
+# Modules whose code shapes the deck; editing any of them invalidates every entry
+RENDER_MODULES = (
+    "presentation_generator.py", "render_plan.py", "text_fit.py", "template_cache.py",
+    "template_registry.py", "slim.py", "stream_writer.py", "asset_library.py", "parallel_render.py",
+    "package_writer.py",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def code_fingerprint() -> str:
+    """Hash of the rendering modules and the installed python-pptx version"""
+    from importlib import metadata
+
+    digest = hashlib.sha256()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in RENDER_MODULES:
+        with open(os.path.join(root, name), 'rb') as f:
+            digest.update(name.encode("utf-8") + b"\0" + f.read())
+    try:
+        digest.update(metadata.version("python-pptx").encode("utf-8"))
+    except metadata.PackageNotFoundError:
+        pass
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """Bounded LRU cache of built decks stored as one .pptx per key"""
+
+    def __init__(self, directory: str = DEFAULT_BUILD_CACHE_DIR, max_entries: int = 200,
+                 max_bytes: int = 500 * 1024 * 1024, link_outputs: bool = False):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.link_outputs = link_outputs
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(generator, outline: Dict) -> str:
+        """Return the content address of building `outline` with `generator`'s template and options"""
+        from template_registry import template_registry
+
+        # Revalidated by stat, so a template edited since the generator started is noticed
+        catalogue = template_registry.resolve(generator.template_path, generator.layouts_file)
+        material = json.dumps(
+            {
+                "version": BUILD_CACHE_VERSION,
+                "code": code_fingerprint(),
+                "template_sha256": catalogue.template_sha256,
+                "catalogue": catalogue.key,
+                "outline": outline,
+                "options": {
+                    "text_fit": generator.text_fit,
+                    "slim": generator.slim,
+                    "assets": generator.assets.signature if generator.assets is not None else None,
+                    "compression_level": generator.compression_level,
+                },
+            },
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pptx")
+
+    def fetch(self, key: str, output_path=None):
+        """Deliver a cached deck, returning None on a miss
+
+        With a path the deck is copied there (hardlinked with link_outputs) and
+        the path is returned; with a writable stream it is copied into it; without either its
+        bytes are returned.
+        """
+        path = self._path(key)
+        try:
+            if isinstance(output_path, str):
+                self._deliver(path, output_path)
+                result = output_path
+            elif output_path is not None:
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, output_path)
+                result = output_path
+            else:
+                with open(path, 'rb') as f:
+                    result = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return result
+
+    def _deliver(self, source: str, destination: str):
+        """Replace destination with a writable copy of source, or a hardlink with link_outputs"""
+        tmp_path = os.path.join(os.path.dirname(os.path.abspath(destination)),
+                                f".{os.path.basename(destination)}.{os.getpid()}.tmp")
+        if self.link_outputs:
+            try:
+                os.link(source, tmp_path)
+                os.replace(tmp_path, destination)
+                return
+            except FileNotFoundError:
+                raise  # the entry is gone (evicted by another process): a miss
+            except OSError:
+                pass  # another filesystem: copy instead
+        # A new file, so it gets the usual mode rather than the entry's read-only one
+        try:
+            shutil.copyfile(source, tmp_path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        os.replace(tmp_path, destination)
+
+    def put(self, key: str, deck):
+        """Store a deck (a file path or bytes) atomically, then evict old entries if over budget"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".pptx")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if isinstance(deck, str):
+                    with open(deck, 'rb') as source:
+                        shutil.copyfileobj(source, f)
+                else:
+                    f.write(deck)
+            # Read-only, since hits may hand out hardlinks to the same file
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until within max_entries and max_bytes"""
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.directory) as it:
+            for dirent in it:
+                if not dirent.name.endswith(".pptx") or dirent.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = dirent.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, dirent.path))
+                total_bytes += stat.st_size
+
+        entries.sort()
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total_bytes -= size
+
+    @staticmethod
+    def _remove(path: Optional[str]):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,167 @@
+"""
+Section fan-out: build large decks from a skeleton plus concurrent section calls
+
+A single outline request's latency grows with the length of its output. Fan-out
+mode first asks for a short skeleton (section titles and a layout name per
+slide), then writes every section with its own GenAI call, each given only the
+layouts it uses. Section calls run concurrently on a bounded thread pool; the
+results are merged back into the `layouts` outline format in skeleton order.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from prompt_compiler import json_generation_config
+from template_registry import without_geometry
+
+SKELETON_PROMPT = os.path.join(os.path.dirname(__file__), "input/skeleton_prompt.md")
+SECTION_PROMPT = os.path.join(os.path.dirname(__file__), "input/section_prompt.md")
+
+# Reply shape requested by the skeleton prompt, for Gemini's JSON mode
+SKELETON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "slides": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["title", "slides"],
+            },
+        },
+    },
+    "required": ["sections"],
+}
+
+
+def _load_prompt(path: str) -> str:
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"❌ Error: {os.path.basename(path)} file not found at: {path}")
+        sys.exit(1)
+
+
+def validate_skeleton(skeleton: Dict, layouts: Dict[str, Dict]) -> List[Dict]:
+    """Return the skeleton's sections with unknown layout names dropped
+
+    Raises ValueError when no section has a usable slide left.
+    """
+    sections = []
+    for section in skeleton.get("sections", []):
+        slides = []
+        for name in section.get("slides", []):
+            if name in layouts:
+                slides.append(name)
+            else:
+                print(f"⚠️  Warning: Skeleton uses unknown layout '{name}', skipping...")
+        if slides:
+            sections.append({"title": section.get("title", ""), "slides": slides})
+    if not sections:
+        raise ValueError("Skeleton contains no slides with known layouts")
+    return sections
+
+
+def _deck_outline(sections: List[Dict]) -> str:
+    return "\n".join(f"{n}. {section['title']} ({len(section['slides'])} slides)"
+                     for n, section in enumerate(sections, 1))
+
+
+def _section_prompt(template: str, topic: str, sections: List[Dict], section: Dict,
+                    layouts: Dict[str, Dict]) -> str:
+    needed = [layouts[name] for name in dict.fromkeys(section["slides"])]
+    return (template
+            .replace("{topic}", topic)
+            .replace("{deck_outline}", _deck_outline(sections))
+            .replace("{section_title}", section["title"])
+            .replace("{section_slides}", ", ".join(section["slides"]))
+            .replace("{layouts}", json.dumps([without_geometry(layout) for layout in needed], indent=2)))
+
+
+def _section_layouts(reply: Dict, layouts: Dict[str, Dict], layouts_by_id: Dict[int, Dict]) -> List[Dict]:
+    """Keep the reply's layouts that match the template, with ids taken from its catalogue"""
+    result = []
+    for layout in reply.get("layouts", []):
+        config = layouts.get(layout.get("name")) or layouts_by_id.get(layout.get("id"))
+        if config is None:
+            print(f"⚠️  Warning: Section returned unknown layout '{layout.get('name')}', skipping...")
+            continue
+        result.append(dict(layout, id=config["id"], name=config["name"]))
+    if not result:
+        raise ValueError("Section reply contains no usable layouts")
+    return result
+
+
+def generate_outline_fanout(generator, topic: str, slide_count: int = 40,
+                            concurrency: int = 4, retries: int = 1, metrics=None) -> Dict:
+    """Generate a layouts-format outline from a skeleton and concurrent section calls
+
+    Up to `concurrency` section requests run at once. Sections that fail are
+    retried one at a time afterwards, up to `retries` more attempts each; a
+    section that still fails raises.
+    """
+    from metrics import BuildMetrics
+
+    metrics = metrics or BuildMetrics(topic)
+    if not generator.client:
+        return generator.generate_outline(topic, metrics=metrics)
+
+    started = time.perf_counter()
+    print(f"🦴 Requesting skeleton for '{topic}' (~{slide_count} slides)...")
+    with metrics.phase("prompt_load"):
+        catalogue = "\n".join(f"- {name}: {layout.get('description', '')}"
+                              for name, layout in generator.layouts.items())
+        skeleton_prompt = (_load_prompt(SKELETON_PROMPT)
+                           .replace("{topic}", topic)
+                           .replace("{slide_count}", str(slide_count))
+                           .replace("{layout_catalogue}", catalogue))
+        section_template = _load_prompt(SECTION_PROMPT)
+    # In JSON mode the generator's own schema is the outline's, which has no sections
+    config = json_generation_config(SKELETON_SCHEMA) if generator.generation_config else None
+    skeleton = generator._request_json(skeleton_prompt, metrics, generation_config=config)
+    sections = validate_skeleton(skeleton, generator.layouts)
+    print(f"✅ Skeleton with {len(sections)} sections, "
+          f"{sum(len(s['slides']) for s in sections)} slides")
+
+    def fill(section):
+        prompt = _section_prompt(section_template, topic, sections, section, generator.layouts)
+        reply = generator._request_json(prompt, metrics)
+        return _section_layouts(reply, generator.layouts, generator.layouts_by_id)
+
+    results: Dict[int, List[Dict]] = {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [(n, pool.submit(fill, section)) for n, section in enumerate(sections)]
+        for n, future in futures:
+            try:
+                results[n] = future.result()
+            except Exception as e:
+                print(f"⚠️  Section '{sections[n]['title']}' failed: {e}")
+                failed.append(n)
+
+    for n in failed:
+        for attempt in range(1, retries + 1):
+            print(f"🔁 Retrying section '{sections[n]['title']}' (attempt {attempt}/{retries})...")
+            try:
+                results[n] = fill(sections[n])
+                break
+            except Exception as e:
+                print(f"⚠️  Section '{sections[n]['title']}' failed: {e}")
+        else:
+            raise RuntimeError(f"Section '{sections[n]['title']}' failed after {retries + 1} attempts")
+
+    outline = {"layouts": [layout for n in range(len(sections)) for layout in results[n]]}
+    metrics.set("sections", len(sections))
+    metrics.set("section_retries", len(failed))
+    print(f"✅ Generated outline with {len(outline['layouts'])} layouts from {len(sections)} "
+          f"sections in {time.perf_counter() - started:.1f}s")
+    return outline
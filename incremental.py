@@ -0,0 +1,133 @@
+"""
+Incremental rebuilds of layouts-format decks
+
+Next to each deck built with incremental mode a manifest records a content hash
+per slide (layout id plus placeholder content) together with the hashes of the
+template and its layout catalogue. On the next build into the same path the new
+outline is diffed against the manifest: slides whose hash is unchanged are kept
+from the previous .pptx as they are, only changed or added slides are rendered,
+removed ones are dropped, and the slide order is rewritten to match the outline.
+Anything that invalidates the previous deck (different template, layout
+overrides or image library, a missing or mismatched file, slimmed output whose
+layout list no longer matches the template) falls back to a full build.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 2
+
+
+def manifest_path(output_path: str) -> str:
+    return f"{output_path}.manifest.json"
+
+
+def slide_hash(layout: Dict) -> str:
+    """Content hash of one layouts-format slide"""
+    content = {"id": layout.get("id"), "placeholders": layout.get("placeholders", [])}
+    if layout.get("image_keywords"):
+        content["image_keywords"] = layout["image_keywords"]
+    material = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _build_inputs(generator) -> Dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "template_sha256": generator.catalogue.template_sha256,
+        "catalogue_sha256": generator.catalogue.key,
+        "text_fit": generator.text_fit,
+        "assets": generator.assets.signature if generator.assets is not None else None,
+    }
+
+
+def write_manifest(generator, layouts: List[Dict], output_path: str):
+    """Record the slide hashes of a deck just written to output_path
+
+    Layouts the template does not have produce no slide and are left out.
+    """
+    slides = [slide_hash(layout) for layout in layouts if layout.get("id") in generator.render_plans]
+    manifest = dict(_build_inputs(generator), slides=slides)
+    with open(manifest_path(output_path), 'w') as f:
+        json.dump(manifest, f)
+
+
+def _load_manifest(output_path: str) -> Optional[Dict]:
+    try:
+        with open(manifest_path(output_path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def rebuild(generator, layouts: List[Dict], output_path: str, metrics) -> bool:
+    """Update the deck at output_path in place to match `layouts`
+
+    Returns False (without touching anything) when the previous build cannot be
+    reused, in which case the caller does a full build.
+    """
+    from pptx import Presentation
+
+    if generator.slim:
+        return False
+    manifest = _load_manifest(output_path)
+    if manifest is None or not os.path.exists(output_path):
+        return False
+    previous = manifest.get("slides", [])
+    inputs = _build_inputs(generator)
+    if {k: manifest.get(k) for k in inputs} != inputs:
+        print("♻️  Template or layouts changed since the last build, rebuilding every slide")
+        return False
+
+    with metrics.phase("previous_load"):
+        prs = Presentation(output_path)
+    sld_ids = list(prs.slides._sldIdLst)
+    if len(sld_ids) != len(previous):
+        return False
+
+    # Queue the previous slides by hash so duplicated slides are reused one-for-one
+    reusable = defaultdict(list)
+    for sld_id, digest in zip(sld_ids, previous):
+        reusable[digest].append(sld_id)
+
+    hashes = [slide_hash(layout) for layout in layouts]
+    ordered = [reusable[digest].pop(0) if reusable[digest] else None for digest in hashes]
+    reused = sum(1 for sld_id in ordered if sld_id is not None)
+
+    # Drop slides that are no longer in the outline; their parts become unreachable
+    for leftovers in reusable.values():
+        for sld_id in leftovers:
+            prs.slides._sldIdLst.remove(sld_id)
+            prs.part.drop_rel(sld_id.rId)
+
+    # New slides are named after the slide count, so close the gaps first
+    prs.part.rename_slide_parts([sld_id.rId for sld_id in prs.slides._sldIdLst])
+
+    generator.prs = prs
+    with metrics.phase("render"):
+        for position, layout in enumerate(layouts):
+            if ordered[position] is not None:
+                continue
+            if generator._add_layout_slide(layout) is not None:
+                ordered[position] = prs.slides._sldIdLst[-1]
+
+        sld_id_lst = prs.slides._sldIdLst
+        for sld_id in list(sld_id_lst):
+            sld_id_lst.remove(sld_id)
+        for sld_id in ordered:
+            if sld_id is not None:
+                sld_id_lst.append(sld_id)
+        prs.part.rename_slide_parts([sld_id.rId for sld_id in sld_id_lst])
+
+    rendered = sum(1 for sld_id in ordered if sld_id is not None) - reused
+    metrics.set("slides_reused", reused)
+    metrics.set("slides_rendered", rendered)
+    print(f"♻️  Incremental rebuild: reused {reused} slides, rendered {rendered}, "
+          f"removed {len(previous) - reused}")
+
+    generator._save_presentation(output_path)
+    write_manifest(generator, layouts, output_path)
+    return True
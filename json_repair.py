@@ -0,0 +1,129 @@
+"""
+Tolerant parsing of JSON written by an LLM
+
+Model replies are mostly JSON but regularly break json.loads in a few
+predictable ways: prose or markdown fences around the object, raw newlines
+inside strings, trailing commas, and output cut off at the token limit. The
+repair pass fixes those locally in one scan instead of paying for a full
+regeneration, and reports which repairs it made.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+from outline_stream import LayoutStreamParser
+
+_CLOSERS = {"{": "}", "[": "]"}
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+# Repair kinds, as recorded in metrics (json_repair_<kind>)
+LEADING_PROSE = "leading_prose"
+TRAILING_PROSE = "trailing_prose"
+UNESCAPED_NEWLINE = "unescaped_newline"
+TRAILING_COMMA = "trailing_comma"
+TRUNCATED = "truncated"
+
+
+def _strip_prose(text: str) -> str:
+    return text.replace("```json", "").replace("```", "").strip()
+
+
+def _clean(text: str) -> Tuple[str, List[str], bool, List[Tuple[int, Tuple[str, ...]]]]:
+    """Scan the first JSON value in `text`, fixing what can be fixed in place
+
+    Returns the cleaned text, the repairs made, whether the value was cut off,
+    and the points (length of cleaned text, open brackets) at which a truncated
+    value can be closed.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object found in response")
+    start = min(starts)
+
+    repairs = []
+    if _strip_prose(text[:start]):
+        repairs.append(LEADING_PROSE)
+
+    out: List[str] = []
+    stack: List[str] = []
+    safe_points: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = False
+    escape = False
+    end = None
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            elif c in _STRING_ESCAPES:
+                c = _STRING_ESCAPES[c]
+                if UNESCAPED_NEWLINE not in repairs:
+                    repairs.append(UNESCAPED_NEWLINE)
+            out.append(c)
+            continue
+
+        if c == '"':
+            in_string = True
+        elif c in _CLOSERS:
+            stack.append(c)
+            out.append(c)
+            safe_points.append((len(out), tuple(stack)))
+            continue
+        elif c in "}]":
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+                if TRAILING_COMMA not in repairs:
+                    repairs.append(TRAILING_COMMA)
+            if stack:
+                stack.pop()
+            out.append(c)
+            if not stack:
+                end = i + 1
+                break
+            safe_points.append((len(out), tuple(stack)))
+            continue
+        elif c == ",":
+            safe_points.append((len(out), tuple(stack)))
+        out.append(c)
+
+    truncated = end is None
+    if truncated:
+        repairs.append(TRUNCATED)
+    elif _strip_prose(text[end:]):
+        repairs.append(TRAILING_PROSE)
+    return "".join(out), repairs, truncated, safe_points
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """Parse `text`, repairing common LLM faults; returns (value, repairs)
+
+    Raises ValueError when no JSON value can be recovered.
+    """
+    try:
+        return json.loads(text), []
+    except ValueError:
+        pass
+
+    cleaned, repairs, truncated, safe_points = _clean(text)
+    if truncated:
+        length, stack = safe_points[-1]
+        cleaned = cleaned[:length].rstrip().rstrip(",") + "".join(_CLOSERS[c] for c in reversed(stack))
+    return json.loads(cleaned), repairs
+
+
+def repair_outline(text: str) -> Tuple[Dict, List[str]]:
+    """Parse an outline reply, keeping only complete layouts when it was cut off"""
+    outline, repairs = repair_json(text)
+    if TRUNCATED in repairs and isinstance(outline, dict) and "layouts" in outline:
+        # The last layout was closed artificially; keep only those the model finished
+        parser = LayoutStreamParser()
+        parser.feed(_clean(text)[0])
+        outline["layouts"] = parser.layouts
+    return outline, repairs
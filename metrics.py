@@ -0,0 +1,133 @@
+"""
+Per-build timing and size metrics
+
+A BuildMetrics object follows one deck from prompt to saved file. Phases are
+timed with the `phase()` context manager (phases may nest or run on several
+threads at once, so they are a breakdown rather than parts of a sum), sizes
+and token counts are recorded as counters, and slide rendering is broken down
+per layout. A finished build can be emitted as a JSON record (one line per
+build) or in Prometheus text format.
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Phases in pipeline order, used to keep records and reports stable
+PHASES = (
+    "prompt_load",
+    "queue_wait",
+    "retry_backoff",
+    "llm_request",
+    "parse",
+    "template_load",
+    "stream",
+    "render",
+    "slim",
+    "save",
+)
+
+
+class BuildMetrics:
+    """Timings and counters for a single build"""
+
+    def __init__(self, topic: str = None):
+        self.build_id = uuid.uuid4().hex[:12]
+        self.topic = topic
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+        self.layouts: Dict[str, Dict[str, float]] = {}
+        # Outline requests may record from several threads at once
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block and add it to phase `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float):
+        """Add `seconds` to phase `name`"""
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: float = 1):
+        """Add `value` to counter `name`"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: Optional[float]):
+        """Set counter `name` to `value` (ignored when None)"""
+        if value is not None:
+            self.counters[name] = value
+
+    def record_layout(self, layout_name: str, seconds: float):
+        """Add one rendered slide of `layout_name` taking `seconds`"""
+        entry = self.layouts.setdefault(layout_name, {"slides": 0, "seconds": 0.0})
+        entry["slides"] += 1
+        entry["seconds"] += seconds
+
+    def to_record(self) -> Dict:
+        """JSON-serialisable record of the build; total_seconds is wall time since it started"""
+        ordered = [p for p in PHASES if p in self.phases]
+        ordered += sorted(p for p in self.phases if p not in PHASES)
+        return {
+            "build_id": self.build_id,
+            "topic": self.topic,
+            "started_at": round(self.started_at, 3),
+            "phases": {p: round(self.phases[p], 6) for p in ordered},
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "counters": dict(self.counters),
+            "layouts": {
+                name: {"slides": entry["slides"], "seconds": round(entry["seconds"], 6)}
+                for name, entry in sorted(self.layouts.items())
+            },
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_record(), ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "pptgen") -> str:
+        """Prometheus text exposition of the build"""
+        lines = [
+            f"# HELP {prefix}_phase_seconds Time spent in each build phase",
+            f"# TYPE {prefix}_phase_seconds gauge",
+        ]
+        for phase, seconds in self.to_record()["phases"].items():
+            lines.append(f'{prefix}_phase_seconds{{phase="{phase}"}} {seconds}')
+
+        lines += [
+            f"# HELP {prefix}_layout_render_seconds Time spent rendering slides of each layout",
+            f"# TYPE {prefix}_layout_render_seconds gauge",
+        ]
+        for name, entry in sorted(self.layouts.items()):
+            lines.append(f'{prefix}_layout_render_seconds{{layout="{name}"}} {entry["seconds"]:.6f}')
+        lines += [
+            f"# HELP {prefix}_layout_slides Slides rendered with each layout",
+            f"# TYPE {prefix}_layout_slides gauge",
+        ]
+        for name, entry in sorted(self.layouts.items()):
+            lines.append(f'{prefix}_layout_slides{{layout="{name}"}} {entry["slides"]}')
+
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: str = "json"):
+        """Append the JSON record (one line per build) or write Prometheus text to `path`"""
+        if fmt == "prometheus":
+            with open(path, 'w') as f:
+                f.write(self.to_prometheus())
+        else:
+            with open(path, 'a') as f:
+                f.write(self.to_json() + "\n")
+        print(f"📈 Build metrics written to: {path}")
@@ -0,0 +1,92 @@
+"""
+Incremental parser that pulls complete layouts out of a streamed outline
+
+The model streams its JSON answer in arbitrary chunks. LayoutStreamParser scans
+the text as it arrives, tracking string/escape state and bracket depth inside the
+top-level "layouts" array, and returns each layout object as soon as its closing
+brace is seen. Surrounding prose or markdown fences are ignored.
+"""
+
+import json
+import re
+from typing import Dict, List
+
+_LAYOUTS_ARRAY = re.compile(r'"layouts"\s*:\s*\[')
+
+
+class LayoutStreamParser:
+    """Feed text chunks, get back the layouts that became complete"""
+
+    def __init__(self):
+        self.layouts: List[Dict] = []
+        self.done = False
+        self.skipped = 0
+        self._chunks = []
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume a chunk and return layouts completed by it"""
+        self._chunks.append(chunk)
+        if self.done:
+            return []
+        self._buffer += chunk
+
+        if not self._in_array:
+            match = _LAYOUTS_ARRAY.search(self._buffer)
+            if not match:
+                return []
+            self._in_array = True
+            self._buffer = self._buffer[match.end():]
+            self._pos = 0
+
+        completed = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer):
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == '{' or c == '[':
+                if self._depth == 0 and c == '{':
+                    self._item_start = i
+                self._depth += 1
+            elif c == '}' or c == ']':
+                if self._depth == 0:
+                    self.done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._item_start is not None:
+                    try:
+                        completed.append(json.loads(buffer[self._item_start:i + 1]))
+                    except ValueError:
+                        self.skipped += 1
+                    self._item_start = None
+            i += 1
+
+        # Drop text that can no longer be part of a pending layout
+        keep_from = self._item_start if self._item_start is not None else i
+        self._buffer = buffer[keep_from:]
+        self._pos = i - keep_from
+        if self._item_start is not None:
+            self._item_start = 0
+
+        self.layouts.extend(completed)
+        return completed
+
+    @property
+    def full_text(self) -> str:
+        """Everything fed so far"""
+        return "".join(self._chunks)
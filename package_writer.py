@@ -0,0 +1,219 @@
+"""
+Save a presentation package without recompressing the template
+
+prs.save deflates every part in turn at zlib's default level, including the
+template's media, which is mostly PNG/JPEG that does not compress further, on
+every save. save_package writes the same entries in the same order, but:
+
+- a part whose bytes match the member it was read from in the source .pptx
+  (same name, size and CRC-32) is copied from that file still compressed,
+  stored or deflated as it was there, without being inflated again;
+- template XML, which python-pptx always re-serializes, is deflated once per
+  process and the result reused by later saves while its bytes are unchanged;
+- the remaining XML parts (slides and anything else new) are serialized and
+  deflated on a thread pool at a configurable level (zlib releases the GIL);
+- new media is stored, since images are already compressed.
+
+Entries are appended to a zipfile.ZipFile with their sizes and CRC known up
+front, so the result is an ordinary zip that zipfile, PowerPoint and python-pptx
+read like one written by prs.save.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+
+# zlib's default level, which python-pptx's save uses
+DEFAULT_COMPRESSION_LEVEL = 6
+# Content types stored without compression when they are not copied from the source
+PRECOMPRESSED_TYPES = {"image/png", "image/jpeg", "image/gif", "image/jpg", "audio/mpeg", "video/mp4"}
+# Deflated template XML kept for reuse, by (SHA-1 of the bytes, level)
+MEMO_ITEMS = 1024
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+_memo: "OrderedDict[tuple, bytes]" = OrderedDict()
+_memo_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(min(8, os.cpu_count() or 1), thread_name_prefix="deflate")
+        return _executor
+
+
+class _SourceZip:
+    """Raw access to the members of the zip a package was read from"""
+
+    def __init__(self, path: str):
+        self._zip = zipfile.ZipFile(path)
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+
+    def match(self, membername: str, blob: bytes) -> Optional[zipfile.ZipInfo]:
+        """The member holding exactly `blob`, if there is one"""
+        info = self._zip.NameToInfo.get(membername)
+        if info is None or info.file_size != len(blob) or info.CRC != zlib.crc32(blob):
+            return None
+        return info
+
+    def raw(self, info: zipfile.ZipInfo) -> bytes:
+        """The member's bytes as stored in the file (compressed, if it is)"""
+        with self._lock:
+            self._file.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(self._file.read(_LOCAL_HEADER.size))
+            self._file.seek(header[10] + header[11], os.SEEK_CUR)
+            return self._file.read(info.compress_size)
+
+    def close(self):
+        self._zip.close()
+        self._file.close()
+
+
+def _open_source(package, output) -> Optional[_SourceZip]:
+    path = getattr(package, "_pkg_file", None)
+    if not isinstance(path, str) or not os.path.isfile(path):
+        return None
+    # Saving over the file the package was read from (incremental rebuilds) truncates it first
+    if isinstance(output, str) and os.path.exists(output) and os.path.samefile(path, output):
+        return None
+    if not zipfile.is_zipfile(path):
+        return None
+    return _SourceZip(path)
+
+
+def _deflate(blob: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(blob) + compressor.flush()
+
+
+class _Entry:
+    """One zip member ready to append: its stored bytes and what describes them"""
+
+    __slots__ = ("name", "data", "compress_type", "crc", "size")
+
+    def __init__(self, name: str, data: bytes, compress_type: int, crc: int, size: int):
+        self.name = name
+        self.data = data
+        self.compress_type = compress_type
+        self.crc = crc
+        self.size = size
+
+
+def encode_entry(name: str, blob: bytes, level: int, memoize: bool = False) -> _Entry:
+    """Compress one member's bytes at `level` (stored at level 0)"""
+    crc = zlib.crc32(blob)
+    if level == 0:
+        return _Entry(name, blob, zipfile.ZIP_STORED, crc, len(blob))
+    key = None
+    if memoize:
+        key = (hashlib.sha1(blob).digest(), level)
+        with _memo_lock:
+            data = _memo.get(key)
+            if data is not None:
+                _memo.move_to_end(key)
+                return _Entry(name, data, zipfile.ZIP_DEFLATED, crc, len(blob))
+    data = _deflate(blob, level)
+    if key is not None:
+        with _memo_lock:
+            _memo[key] = data
+            while len(_memo) > MEMO_ITEMS:
+                _memo.popitem(last=False)
+    return _Entry(name, data, zipfile.ZIP_DEFLATED, crc, len(blob))
+
+
+def append_entry(zf: zipfile.ZipFile, entry: _Entry):
+    """Append an already-compressed member to a ZipFile open for writing"""
+    info = zipfile.ZipInfo(entry.name, date_time=time.localtime(time.time())[:6])
+    info.compress_type = entry.compress_type
+    info.external_attr = 0o600 << 16
+    info.CRC = entry.crc
+    info.file_size = entry.size
+    info.compress_size = len(entry.data)
+    # Mirrors ZipFile.writestr for a member whose sizes are known before it is written
+    with zf._lock:
+        zf._writecheck(info)
+        zf._didModify = True
+        info.header_offset = zf.fp.tell()
+        zf.fp.write(info.FileHeader())
+        zf.fp.write(entry.data)
+        zf.filelist.append(info)
+        zf.NameToInfo[info.filename] = info
+        zf.start_dir = zf.fp.tell()
+
+
+class PartEncoder:
+    """Turn the parts of a package into zip entries, reusing the source's compressed bytes"""
+
+    def __init__(self, package, level: int = DEFAULT_COMPRESSION_LEVEL, output=None):
+        self.level = level
+        self.source = _open_source(package, output)
+        self.copied = 0
+        self.deflated = 0
+
+    def _part_entry(self, part) -> _Entry:
+        name = part.partname.membername
+        blob = part.blob
+        info = self.source.match(name, blob) if self.source is not None else None
+        if info is not None:
+            self.copied += 1
+            return _Entry(name, self.source.raw(info), info.compress_type, info.CRC, info.file_size)
+        if not isinstance(part, XmlPart) and part.content_type in PRECOMPRESSED_TYPES:
+            return encode_entry(name, blob, 0)
+        self.deflated += 1
+        # XML parts the source also has are template parts: worth remembering
+        memoize = self.source is not None and name in self.source._zip.NameToInfo
+        return encode_entry(name, blob, self.level, memoize)
+
+    def entries(self, part):
+        """The part's entry followed by its .rels entry, if it has relationships"""
+        result = [self._part_entry(part)]
+        if part._rels:
+            result.append(encode_entry(part.partname.rels_uri.membername, part.rels.xml, self.level))
+        return result
+
+    def write_parts(self, zf: zipfile.ZipFile, parts):
+        """Encode `parts` on the thread pool and append them to `zf` in order"""
+        for entries in _pool().map(self.entries, parts):
+            for entry in entries:
+                append_entry(zf, entry)
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+
+
+def save_package(prs, output, level: int = DEFAULT_COMPRESSION_LEVEL) -> Dict[str, int]:
+    """prs.save(output) reusing the template's compressed bytes; see the module docstring
+
+    Returns how many parts were copied from the source file and how many deflated.
+    """
+    package = prs.part.package
+    parts = tuple(package.iter_parts())
+    encoder = PartEncoder(package, level, output)
+    try:
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED,
+                             strict_timestamps=False) as zf:
+            append_entry(zf, encode_entry(CONTENT_TYPES_URI.membername,
+                                          serialize_part_xml(_ContentTypesItem.xml_for(parts)), level))
+            append_entry(zf, encode_entry(PACKAGE_URI.rels_uri.membername, package._rels.xml, level))
+            encoder.write_parts(zf, parts)
+    finally:
+        encoder.close()
+    return {"copied": encoder.copied, "deflated": encoder.deflated}
@@ -0,0 +1,214 @@
+"""
+Render one deck's slides on several cores
+
+The outline is split into contiguous chunks that a process pool renders with
+the regular single-slide code (_add_layout_slide, or the legacy slide builders).
+Each worker keeps its own generator and warm template for the life of the pool.
+A worker returns every slide it built as serialized XML, plus the slide's
+relationships: template parts by part name, media by SHA-1 with the image bytes
+sent once per chunk.
+
+The parent loads the slides in outline order and attaches them the same way
+python-pptx's add_slide does, so part names, relationship ids, slide ids and
+media numbering come out exactly as in a sequential build. Chunks are merged
+as they arrive, in order, while later chunks are still rendering. They can
+also be passed straight to the streaming writer.
+
+Workers are started with "spawn" so a pool can be created from a threaded batch
+run or server without inheriting held locks, and pools are kept per template
+and options so batch builds reuse warm workers.
+"""
+
+import contextlib
+import io
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import Image, ImagePart
+from pptx.parts.slide import SlidePart
+
+# Chunks per worker: enough to balance uneven slides without much per-chunk overhead
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK = 8
+
+_pools: Dict[Tuple, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+# The generator of a worker process, created by _init_worker
+_worker = None
+
+
+def _init_worker(template_path: str, layouts_file: str, assets: Tuple):
+    """Create this worker's generator and parse its template once"""
+    global _worker
+    from presentation_generator import PresentationGenerator
+    from template_cache import template_cache
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker = PresentationGenerator(template_path, layouts_file=layouts_file)
+    if assets is not None:
+        from asset_library import AssetLibrary
+        _worker.assets = AssetLibrary(*assets)
+    template_cache.get(template_path)
+
+
+def _render_chunk(kind: str, items: List, text_fit: bool) -> Dict:
+    """Render a chunk of slides in a fresh copy of the template and serialize them"""
+    from metrics import BuildMetrics
+    from template_cache import template_cache
+
+    generator = _worker
+    generator.text_fit = text_fit
+    generator._metrics = BuildMetrics()
+    generator.prs = template_cache.get(generator.template_path)
+    generator._deck_images = None
+    template_parts = set(generator.prs.part.package.iter_parts())
+
+    if kind == "layouts":
+        for layout_data in items:
+            generator._add_layout_slide(layout_data)
+    else:
+        for builder, slide_type, slide_data in items:
+            generator._add_legacy_slide(builder, slide_type, slide_data)
+
+    slides, images = [], {}
+    for slide in generator.prs.slides:
+        rels = []
+        for rId, rel in slide.part.rels.items():
+            if rel.is_external:
+                rels.append((rId, rel.reltype, "external", rel.target_ref))
+                continue
+            target = rel.target_part
+            if target in template_parts:
+                rels.append((rId, rel.reltype, "part", str(target.partname)))
+            elif isinstance(target, ImagePart):
+                images.setdefault(target.sha1, target.blob)
+                rels.append((rId, rel.reltype, "image", target.sha1))
+            else:
+                raise ValueError(f"Cannot merge {target.partname} from a render worker")
+        slides.append((slide.part.blob, rels))
+    return {
+        "slides": slides,
+        "images": images,
+        "counters": generator._metrics.counters,
+        "layouts": generator._metrics.layouts,
+    }
+
+
+def _render_chunk_args(args):
+    return _render_chunk(*args)
+
+
+def _pool_key(generator, workers: int) -> Tuple:
+    assets = None
+    if generator.assets is not None:
+        assets = (generator.assets.directory, generator.assets.cache_dir)
+    return generator.template_path, generator.layouts_file, workers, assets
+
+
+def get_pool(generator, workers: int) -> ProcessPoolExecutor:
+    """Warm process pool for a generator's template, layouts and asset library"""
+    key = _pool_key(generator, workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=key[:2] + key[3:],
+            )
+            # Start every worker now rather than on the first chunks of a build
+            list(pool.map(_noop, range(workers)))
+            _pools[key] = pool
+        return pool
+
+
+def _noop(_):
+    return None
+
+
+def shutdown_pools():
+    """Stop every worker pool (they are otherwise stopped at interpreter exit)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+class _SlideMerger:
+    """Attach serialized slides to the generator's presentation in outline order"""
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.prs = generator.prs
+        self.package = self.prs.part.package
+        self.parts = {str(part.partname): part for part in self.package.iter_parts()}
+        self.sld_id_lst = self.prs.slides._sldIdLst
+        self.slide_count = len(self.sld_id_lst)
+        self.next_slide_id = max([255] + [int(sld_id.id) for sld_id in self.sld_id_lst]) + 1
+        self.images: Dict[str, Image] = {}
+
+    def add_chunk(self, chunk: Dict):
+        generator = self.generator
+        if chunk["images"] and getattr(generator._deck_images, "prs", None) is not self.prs:
+            from asset_library import DeckImages
+            generator._deck_images = DeckImages(self.prs)
+        for sha1, blob in chunk["images"].items():
+            self.images.setdefault(sha1, Image.from_blob(blob))
+        for blob, rels in chunk["slides"]:
+            slide = self._add_slide(blob, rels)
+            if generator._writer is not None:
+                generator._writer.write_slide(slide)
+        metrics = generator._metrics
+        for name, value in chunk["counters"].items():
+            metrics.count(name, value)
+        for name, entry in chunk["layouts"].items():
+            merged = metrics.layouts.setdefault(name, {"slides": 0, "seconds": 0.0})
+            merged["slides"] += entry["slides"]
+            merged["seconds"] += entry["seconds"]
+
+    def _add_slide(self, blob: bytes, rels: List):
+        self.slide_count += 1
+        partname = PackURI(f"/ppt/slides/slide{self.slide_count}.xml")
+        slide_part = SlidePart.load(partname, CT.PML_SLIDE, self.package, blob)
+        slide_rels = slide_part.rels
+        for rId, reltype, kind, ref in rels:
+            if kind == "external":
+                target, mode = ref, RTM.EXTERNAL
+            elif kind == "image":
+                target, mode = self.generator._deck_images.image_part(self.images[ref]), RTM.INTERNAL
+            else:
+                target, mode = self.parts[ref], RTM.INTERNAL
+            slide_rels._rels[rId] = _Relationship(partname.baseURI, rId, reltype, mode, target)
+        rId = self.prs.part.rels._add_relationship(RT.SLIDE, slide_part)
+        self.sld_id_lst._add_sldId(id=self.next_slide_id, rId=rId)
+        self.next_slide_id += 1
+        return slide_part.slide
+
+
+def render_parallel(generator, kind: str, items: List, workers: int):
+    """Render layouts-format entries or legacy slide jobs of `generator` on `workers` processes"""
+    if not items:
+        return
+    pool = get_pool(generator, workers)
+    size = max(MIN_CHUNK, math.ceil(len(items) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [(kind, items[start:start + size], generator.text_fit)
+              for start in range(0, len(items), size)]
+    merger = _SlideMerger(generator)
+    try:
+        for chunk in pool.map(_render_chunk_args, chunks):
+            with generator._metrics.phase("merge"):
+                merger.add_chunk(chunk)
+    except BrokenProcessPool:
+        with _pools_lock:
+            _pools.pop(_pool_key(generator, workers), None)
+        raise
+    generator._metrics.set("render_workers", workers)
@@ -5,101 +5,437 @@ Generates branded PowerPoint presentations from a topic using GenAI
 """
 
 import argparse
+import io
 import os
+import shutil
 import sys
-from typing import List, Dict
-from pptx import Presentation
-from pptx.util import Pt
-import google.generativeai as genai
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Callable, List, Dict
+
+_MODULE_IMPORT_STARTED = time.perf_counter()
+_PROCESS_CPU_BEFORE_IMPORT = time.process_time()
+
+# Heavy dependencies (python-pptx, google.generativeai) are imported on first use
+# so the --json and mock paths never pay for the Gemini SDK.
+from json_repair import TRUNCATED, repair_outline
+from metrics import BuildMetrics
+from prompt_compiler import estimate_tokens, prompt_compiler
+from render_plan import compile_render_plans
+from response_cache import DEFAULT_CACHE_DIR, ResponseCache
+from scheduler import INTERACTIVE, DeadlineExceeded, wait_until
+from template_cache import template_cache
+from template_registry import template_registry
+from text_fit import apply_fit, fit_text
+
+_MODULE_IMPORT_FINISHED = time.perf_counter()
+
+# Defaults for --image-cache, --build-cache-dir and --compression-level, kept here so
+# the CLI does not import asset_library, build_cache or package_writer unless they are used
+ASSET_CACHE_DIR = ".cache/images"
+DEFAULT_BUILD_CACHE_DIR = ".cache/builds"
+DEFAULT_COMPRESSION_LEVEL = 6
+# Slides ahead of the one being rendered whose images are prepared in the background
+IMAGE_LOOKAHEAD = 16
+
+
+class BuildCancelled(Exception):
+    """Raised inside a build whose async caller was cancelled or ran out of time"""
+
+
+def safe_topic_name(topic: str) -> str:
+    """Turn a topic into a lowercase, filesystem-safe file stem"""
+    safe_topic = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in topic)
+    return safe_topic.replace(' ', '_').lower()
 
 
 class PresentationGenerator:
-    def __init__(self, template_path: str, api_key: str = None):
-        """Initialize the presentation generator"""
+    def __init__(self, template_path: str, api_key: str = None, response_cache=None,
+                 layouts_file: str = None):
+        """Initialize the presentation generator
+
+        Pass a ResponseCache to reuse GenAI responses for identical requests.
+        layouts_file holds hand-written overrides (descriptions, max_chars) for the
+        layouts read from the template; by default it is looked up next to it.
+        """
         self.template_path = template_path
         self.prs = None
+        self._prompt_template = None
+        self.response_cache = response_cache
+        self.profile_path = None
+        self.slim = False
+        self.save_responses = True
+        self.incremental = False
+        # Fit text to each placeholder's measured box; False falls back to max_chars cuts
+        self.text_fit = True
+        # Write each layouts-format slide out as soon as it is rendered (see stream_writer)
+        self.stream_write = False
+        self._writer = None
+        # AssetLibrary (see asset_library) that fills PICTURE placeholders; None leaves them empty
+        self.assets = None
+        self._deck_images = None
+        # Render processes for one deck; 1 renders in this process
+        self.render_workers = 1
+        # zlib level for the XML parts written on save (see package_writer); 0 stores them
+        self.compression_level = DEFAULT_COMPRESSION_LEVEL
+        # BuildCache of finished decks (see build_cache); None always renders
+        self.build_cache = None
+        # "compact" compiles the prompt from the layout catalogue; "full" sends input/prompt.md
+        self.prompt_style = "compact"
+        self._metrics = BuildMetrics()
         
-        # Load slide layout configuration
-        layout_file = os.path.join(os.path.dirname(__file__), "input/slide_layouts.json")
-        try:
-            import json
-            with open(layout_file, 'r') as f:
-                layout_config = json.load(f)
-                self.layouts = {layout['name']: layout for layout in layout_config['layouts']}
-                self.layouts_by_id = {layout['id']: layout for layout in layout_config['layouts']}
-        except FileNotFoundError:
-            print(f"❌ Error: slide_layouts.json file not found at: {layout_file}")
-            print("Please ensure slide_layouts.json exists in the same directory as this script.")
-            sys.exit(1)
+        # Layout catalogue introspected from the template and merged with its overrides
+        self.catalogue = template_registry.resolve(template_path, layouts_file)
+        self.layouts_file = self.catalogue.overrides_path
+        self.layouts = {layout['name']: layout for layout in self.catalogue.layouts}
+        self.layouts_by_id = {layout['id']: layout for layout in self.catalogue.layouts}
+        self.render_plans = compile_render_plans(self.catalogue.layouts)
+        self._plans_fingerprint = None
         
         # Initialize Google Gemini client
+        self.model_name = 'gemini-2.0-flash'
+        self.generation_config = None
+        # Optional RequestScheduler shared between generators; batch runs use BATCH priority
+        self.scheduler = None
+        self.priority = INTERACTIVE
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._client = None
+        self._async_client = None
+        # create_presentation_async builds queue on an asyncio lock (per event loop) and
+        # take the thread lock while rendering
+        self._build_lock = None
+        self._render_lock = threading.Lock()
+        self._abort = None
         if not self.api_key:
             print("⚠️  No API key provided. Using mock mode with sample content.")
-            self.client = None
-        else:
+    
+    @property
+    def client(self):
+        """Gemini model client, created (and the SDK imported) on first use"""
+        if self._client is None and self.api_key:
+            import google.generativeai as genai
             genai.configure(api_key=self.api_key)
-            self.client = genai.GenerativeModel('gemini-2.0-flash')
+            self._client = genai.GenerativeModel(self.model_name)
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    @property
+    def async_client(self):
+        """Client awaited by the async API through generate_content_async
+        
+        Defaults to the Gemini model, whose SDK provides it; set any object with
+        an async generate_content_async(prompt, **kwargs) to plug in another.
+        """
+        return self._async_client or self.client
+    
+    @async_client.setter
+    def async_client(self, client):
+        self._async_client = client
     
-    def generate_outline(self, topic: str) -> Dict:
-        """Use GenAI to generate presentation outline and content"""
+    def generate_outline(self, topic: str, fallback_to_mock: bool = True,
+                         metrics: BuildMetrics = None) -> Dict:
+        """Use GenAI to generate presentation outline and content
+
+        With fallback_to_mock=False a failed GenAI call raises instead of silently
+        returning mock content (used by batch mode to report failures). Pass a
+        BuildMetrics to record prompt, request and parse timings.
+        """
         print(f"🤖 Generating presentation outline for topic: '{topic}'...")
+        metrics = metrics or BuildMetrics(topic)
         
-        # Load prompt template from file
-        prompt_file = os.path.join(os.path.dirname(__file__), "input/prompt.md")
-        try:
-            with open(prompt_file, 'r') as f:
-                prompt_template = f.read()
-            prompt = prompt_template.replace("{topic}", topic)
-        except FileNotFoundError:
-            print(f"❌ Error: prompt.md file not found at: {prompt_file}")
-            print("Please ensure prompt.md exists in the same directory as this script.")
-            sys.exit(1)
+        with metrics.phase("prompt_load"):
+            prompt = self._load_prompt_template().replace("{topic}", topic)
 
         if not self.client:
             print("⚠️  Using mock mode (no API key provided)")
             return self._generate_mock_outline(topic)
         
         try:
-            response = self.client.generate_content(prompt)
-            
-            import json
-            # Extract JSON from response
-            content = response.text
-            
-            # Save raw response to output directory
-            output_dir = "output"
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            safe_topic = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in topic)
-            safe_topic = safe_topic.replace(' ', '_').lower()
-            response_file = os.path.join(output_dir, f"{safe_topic}_response.json")
-            
-            with open(response_file, 'w') as f:
-                f.write(content)
-            print(f"💾 Saved AI response to: {response_file}")
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
+            repairs = []
+            outline = self._request_json(prompt, metrics, save_as=topic, repairs=repairs)
+            if TRUNCATED in repairs and 'layouts' in outline:
+                outline = self._request_missing_layouts(prompt, outline, metrics)
+            self._report_outline(outline)
+            return outline
             
-            outline = json.loads(content)
-            # Check if response is in new layouts format
-            if 'layouts' in outline:
-                print(f"✅ Generated outline with {len(outline.get('layouts', []))} layouts")
-            else:
-                print(f"✅ Generated outline with {len(outline.get('slides', []))} slides")
+        except Exception as e:
+            print(f"❌ Error generating outline: {e}")
+            if not fallback_to_mock:
+                raise
+            print("Falling back to mock content...")
+            return self._generate_mock_outline(topic)
+    
+    async def generate_outline_async(self, topic: str, fallback_to_mock: bool = True,
+                                     metrics: BuildMetrics = None, timeout: float = None) -> Dict:
+        """generate_outline for asyncio, awaiting the model through async_client
+        
+        timeout (seconds) bounds the whole outline, including queueing in the
+        scheduler and any follow-up request; when it runs out DeadlineExceeded is
+        handled like any other failed request. Cancelling the caller cancels the
+        request in flight.
+        """
+        print(f"🤖 Generating presentation outline for topic: '{topic}'...")
+        metrics = metrics or BuildMetrics(topic)
+        deadline = time.monotonic() + timeout if timeout else None
+        
+        with metrics.phase("prompt_load"):
+            prompt = self._load_prompt_template().replace("{topic}", topic)
+
+        if not self.async_client:
+            print("⚠️  Using mock mode (no API key provided)")
+            return self._generate_mock_outline(topic)
+        
+        try:
+            repairs = []
+            outline = await self._request_json_async(prompt, metrics, deadline, save_as=topic,
+                                                     repairs=repairs)
+            if TRUNCATED in repairs and 'layouts' in outline:
+                outline = await self._request_missing_layouts_async(prompt, outline, metrics, deadline)
+            self._report_outline(outline)
             return outline
             
         except Exception as e:
             print(f"❌ Error generating outline: {e}")
+            if not fallback_to_mock:
+                raise
             print("Falling back to mock content...")
             return self._generate_mock_outline(topic)
     
+    @staticmethod
+    def _report_outline(outline: Dict):
+        # Check if response is in new layouts format
+        if 'layouts' in outline:
+            print(f"✅ Generated outline with {len(outline.get('layouts', []))} layouts")
+        else:
+            print(f"✅ Generated outline with {len(outline.get('slides', []))} slides")
+    
+    def _request_json(self, prompt: str, metrics: BuildMetrics, save_as: str = None,
+                      repairs: List[str] = None, generation_config: Dict = None):
+        """Send one prompt to GenAI (or the response cache) and parse the JSON reply
+        
+        With save_as the raw reply is written to output/<save_as>_response.json
+        before parsing. Repairs made to the reply are appended to `repairs`.
+        Replies are only cached once they parse, and never when they were cut off.
+        generation_config replaces self.generation_config for this request.
+        """
+        cache_key, content = self._cached_response(prompt, metrics, generation_config)
+        from_cache = content is not None
+        if not from_cache:
+            kwargs = {"generation_config": generation_config} if generation_config else {}
+            response = self._call_model(prompt, metrics, **kwargs)
+            # Extract JSON from response
+            content = response.text
+            self._record_usage(metrics, response)
+        return self._accept_response(content, from_cache, cache_key, metrics, save_as, repairs)
+    
+    async def _request_json_async(self, prompt: str, metrics: BuildMetrics, deadline: float = None,
+                                  save_as: str = None, repairs: List[str] = None,
+                                  generation_config: Dict = None):
+        """_request_json awaiting the model call, which must finish before `deadline`"""
+        cache_key, content = self._cached_response(prompt, metrics, generation_config)
+        from_cache = content is not None
+        if not from_cache:
+            kwargs = {"generation_config": generation_config} if generation_config else {}
+            response = await self._call_model_async(prompt, metrics, deadline, **kwargs)
+            content = response.text
+            self._record_usage(metrics, response)
+        return self._accept_response(content, from_cache, cache_key, metrics, save_as, repairs)
+    
+    def _cached_response(self, prompt: str, metrics: BuildMetrics, generation_config: Dict = None):
+        """Record the prompt size and look it up in the response cache: (cache key, text or None)"""
+        self._record_prompt_size(metrics, prompt)
+        
+        # Reuse a cached response for an identical request
+        cache_key = None
+        content = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.key(self.model_name, prompt,
+                                                generation_config or self.generation_config)
+            content = self.response_cache.get(cache_key)
+            if content is not None:
+                print(f"♻️  Using cached AI response ({cache_key[:12]})")
+        metrics.count("response_cache_hit", int(content is not None))
+        return cache_key, content
+    
+    def _accept_response(self, content: str, from_cache: bool, cache_key: str, metrics: BuildMetrics,
+                         save_as: str = None, repairs: List[str] = None):
+        """Save, parse and cache a reply (see _request_json)"""
+        metrics.count("response_bytes", len(content.encode("utf-8")))
+        
+        if save_as is not None:
+            self._save_raw_response(save_as, content)
+        
+        with metrics.phase("parse"):
+            parsed, made = self._parse_json(content, metrics)
+        if repairs is not None:
+            repairs.extend(made)
+        if cache_key is not None and not from_cache and TRUNCATED not in made:
+            self.response_cache.put(cache_key, content, self.model_name)
+        return parsed
+    
+    def _call_model(self, prompt: str, metrics: BuildMetrics, **kwargs):
+        """Call generate_content, through the scheduler when one is configured"""
+        if self.generation_config and "generation_config" not in kwargs:
+            kwargs["generation_config"] = self.generation_config
+        if self.scheduler is None:
+            with metrics.phase("llm_request"):
+                return self.client.generate_content(prompt, **kwargs)
+        return self.scheduler.call(self.client.generate_content, prompt,
+                                   tokens=estimate_tokens(prompt), priority=self.priority,
+                                   metrics=metrics, **kwargs)
+    
+    async def _call_model_async(self, prompt: str, metrics: BuildMetrics, deadline: float = None, **kwargs):
+        """Await generate_content_async, through the scheduler when one is configured
+        
+        A deadline replaces the scheduler's own timeout for this call.
+        """
+        if self.generation_config and "generation_config" not in kwargs:
+            kwargs["generation_config"] = self.generation_config
+        generate = self.async_client.generate_content_async
+        if self.scheduler is None:
+            with metrics.phase("llm_request"):
+                return await wait_until(generate(prompt, **kwargs), deadline)
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise DeadlineExceeded("no time left for the GenAI request")
+        return await self.scheduler.call_async(generate, prompt, tokens=estimate_tokens(prompt),
+                                               priority=self.priority, timeout=timeout,
+                                               metrics=metrics, **kwargs)
+    
+    @staticmethod
+    def _parse_json(content: str, metrics: BuildMetrics = None):
+        """Parse a reply, repairing fences, prose, trailing commas and truncation
+        
+        Returns (value, repairs); each repair is counted in metrics as
+        json_repair_<kind>.
+        """
+        outline, repairs = repair_outline(content)
+        if repairs:
+            print(f"🩹 Repaired AI response: {', '.join(repairs)}")
+            if metrics is not None:
+                for kind in repairs:
+                    metrics.count(f"json_repair_{kind}")
+        return outline, repairs
+    
+    def _request_missing_layouts(self, prompt: str, outline: Dict, metrics: BuildMetrics) -> Dict:
+        """Ask only for the layouts a cut-off reply did not get to, and append them
+        
+        If the follow-up fails too, the salvaged layouts are kept.
+        """
+        request = self._tail_request(prompt, outline, metrics)
+        if request is None:
+            return outline
+        tail_prompt, missing = request
+        try:
+            tail = self._request_json(tail_prompt, metrics)
+        except Exception as e:
+            print(f"⚠️  Could not fetch the missing layouts ({e}), keeping {len(outline['layouts'])} salvaged")
+            return outline
+        return self._merge_tail(outline, tail, missing)
+    
+    async def _request_missing_layouts_async(self, prompt: str, outline: Dict, metrics: BuildMetrics,
+                                             deadline: float = None) -> Dict:
+        """_request_missing_layouts awaiting the follow-up request"""
+        request = self._tail_request(prompt, outline, metrics)
+        if request is None:
+            return outline
+        tail_prompt, missing = request
+        try:
+            tail = await self._request_json_async(tail_prompt, metrics, deadline)
+        except Exception as e:
+            print(f"⚠️  Could not fetch the missing layouts ({e}), keeping {len(outline['layouts'])} salvaged")
+            return outline
+        return self._merge_tail(outline, tail, missing)
+    
+    def _tail_request(self, prompt: str, outline: Dict, metrics: BuildMetrics):
+        """(follow-up prompt, missing layout ids) for a cut-off outline, or None if nothing is missing"""
+        received = [layout.get("id") for layout in outline["layouts"]]
+        missing = [layout_id for layout_id in self.layouts_by_id if layout_id not in received]
+        if not missing:
+            return None
+        
+        print(f"🔁 Response was cut off after {len(received)} layouts, requesting the "
+              f"remaining {len(missing)}...")
+        metrics.count("json_tail_requests")
+        tail_prompt = (f"{prompt}\n\nYour previous answer was cut off. It already contains the "
+                       f"layouts with ids {received}. Return only the remaining layouts, with ids "
+                       f"{missing}, in the same JSON format.")
+        return tail_prompt, missing
+    
+    @staticmethod
+    def _merge_tail(outline: Dict, tail: Dict, missing: List) -> Dict:
+        """Append the follow-up's layouts that were missing, each id once"""
+        wanted = set(missing)
+        for layout in tail.get("layouts", []):
+            if layout.get("id") in wanted:
+                outline["layouts"].append(layout)
+                wanted.discard(layout.get("id"))
+        return outline
+    
+    @staticmethod
+    def _record_prompt_size(metrics: BuildMetrics, prompt: str):
+        """Record the prompt's size and estimated input tokens for one request"""
+        prompt_bytes = len(prompt.encode("utf-8"))
+        tokens = estimate_tokens(prompt)
+        metrics.count("prompt_bytes", prompt_bytes)
+        metrics.count("prompt_tokens_estimate", tokens)
+        print(f"📏 Prompt: {prompt_bytes} bytes, ~{tokens} input tokens")
+    
+    @staticmethod
+    def _record_usage(metrics: BuildMetrics, response):
+        """Record token counts reported by the model, if any"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        for counter, attribute in (("prompt_tokens", "prompt_token_count"),
+                                   ("response_tokens", "candidates_token_count")):
+            value = getattr(usage, attribute, None)
+            if value is not None:
+                metrics.count(counter, value)
+    
+    def _save_raw_response(self, topic: str, content: str):
+        """Save raw response to output directory (skipped when save_responses is off)"""
+        if not self.save_responses:
+            return
+        output_dir = "output"
+        os.makedirs(output_dir, exist_ok=True)
+        
+        response_file = os.path.join(output_dir, f"{safe_topic_name(topic)}_response.json")
+        
+        with open(response_file, 'w') as f:
+            f.write(content)
+        print(f"💾 Saved AI response to: {response_file}")
+    
+    def _load_prompt_template(self) -> str:
+        """Load the prompt template (built once per generator), with {topic} left in place"""
+        if self._prompt_template is None and self.prompt_style == "compact":
+            self._prompt_template = prompt_compiler.compile(
+                self.catalogue.key, list(self.layouts.values())
+            )
+        if self._prompt_template is None:
+            prompt_file = os.path.join(os.path.dirname(__file__), "input/prompt.md")
+            try:
+                with open(prompt_file, 'r') as f:
+                    self._prompt_template = f.read()
+            except FileNotFoundError:
+                print(f"❌ Error: prompt.md file not found at: {prompt_file}")
+                print("Please ensure prompt.md exists in the same directory as this script.")
+                sys.exit(1)
+        return self._prompt_template
+    
+    def warm_up(self):
+        """Load the prompt and parse the template ahead of the first request"""
+        self._load_prompt_template()
+        template_cache.get(self.template_path)
+    
     def _generate_mock_outline(self, topic: str) -> Dict:
         """Generate a mock outline when API is not available"""
         return {
@@ -144,68 +480,516 @@ class PresentationGenerator:
             ]
         }
     
-    def create_presentation(self, outline: Dict, output_path: str):
-        """Create the presentation using the template and outline"""
+    def create_presentation(self, outline: Dict, output_path=None, metrics: BuildMetrics = None):
+        """Create the presentation using the template and outline
+        
+        output_path may be a file path or any writable binary stream (BytesIO,
+        sys.stdout.buffer, an HTTP response body). Without one the deck is
+        returned as bytes. With self.incremental set, a layouts-format deck
+        rebuilt into the same path only re-renders slides whose content changed.
+        With self.stream_write set, layouts-format slides are written to the output
+        as they are rendered so memory stays flat for very large decks. Pass a
+        BuildMetrics to record template load, per-layout render and save timings;
+        set profile_path to dump a cProfile of the render phase. With a
+        build_cache, a deck already built from the same template, outline and
+        options is handed back without rendering.
+        """
+        self._metrics = metrics or BuildMetrics()
+        incremental = self.incremental and isinstance(output_path, str) and 'layouts' in outline
+        build_key = None
+        if self.build_cache is not None:
+            with self._metrics.phase("build_cache"):
+                build_key = self.build_cache.key(self, outline)
+                delivered = self.build_cache.fetch(build_key, output_path)
+            self._metrics.set("build_cache_hit", int(delivered is not None))
+            if delivered is not None:
+                self._report_cached_build(build_key, delivered)
+                if incremental:
+                    from incremental import write_manifest
+                    write_manifest(self, outline['layouts'], output_path)
+                return delivered if output_path is None else None
+        if incremental:
+            from incremental import rebuild, write_manifest
+            if rebuild(self, outline['layouts'], output_path, self._metrics):
+                return
         print(f"📄 Creating presentation using template: {self.template_path}")
         
-        # Load the branded template
-        self.prs = Presentation(self.template_path)
+        # Load the branded template (parsed once per process, cloned per build)
+        with self._metrics.phase("template_load"):
+            self.prs = template_cache.get(self.template_path)
         
-        # Check if outline is in new layouts format or old slides format
-        if 'layouts' in outline:
-            self._create_presentation_from_layouts(outline['layouts'])
+        streamed = self.stream_write and 'layouts' in outline and not self.slim
+        # A stream cannot be read back into the build cache, so the deck is built in memory first
+        buffered = output_path is None or (build_key is not None and not isinstance(output_path, str))
+        target = io.BytesIO() if buffered else output_path
+        if streamed:
+            from stream_writer import StreamingDeckWriter
+            self._writer = StreamingDeckWriter(self.prs, target, self.compression_level)
+        
+        profiler = None
+        if self.profile_path:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        
+        try:
+            with self._metrics.phase("render"):
+                # Check if outline is in new layouts format or old slides format
+                if 'layouts' in outline:
+                    self._create_presentation_from_layouts(outline['layouts'])
+                else:
+                    # Legacy format support
+                    self._create_presentation_from_slides(outline)
+        except BaseException:
+            if self._writer is not None:
+                self._writer.abort()
+                self._writer = None
+            raise
+        
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(self.profile_path)
+            print(f"🔬 Render profile saved to: {self.profile_path}")
+        
+        if streamed:
+            try:
+                with self._metrics.phase("save"):
+                    self._writer.close()
+            finally:
+                self._writer = None
+            self._report_saved(target)
         else:
-            # Legacy format support
-            self._create_presentation_from_slides(outline)
+            self._save_presentation(target)
+        if build_key is not None:
+            self.build_cache.put(build_key, target.getvalue() if buffered else target)
+        if output_path is None:
+            # getvalue() hands over BytesIO's own buffer without copying it
+            return target.getvalue()
+        if buffered:
+            output_path.write(target.getvalue())
+        if incremental:
+            write_manifest(self, outline['layouts'], output_path)
+    
+    async def create_presentation_async(self, outline: Dict, output_path: str = None,
+                                        metrics: BuildMetrics = None, timeout: float = None,
+                                        executor=None):
+        """create_presentation for asyncio, rendering and saving on `executor`
+        
+        (default: the event loop's thread pool). Builds on one generator run one at a
+        time; use several generators to render in parallel. A deck for a path is
+        written beside it and renamed into place once complete, so a build that is
+        cancelled or passes its timeout (seconds, including the wait for earlier
+        builds; raises DeadlineExceeded) leaves no partial file. Its render thread
+        stops at the next slide.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self._build_lock is None or self._build_lock[0] is not loop:
+            self._build_lock = (loop, asyncio.Lock())
+        lock = self._build_lock[1]
+        deadline = time.monotonic() + timeout if timeout else None
+        await wait_until(lock.acquire(), deadline, "no free generator before the build deadline")
         
-        # Save the presentation
-        self.prs.save(output_path)
-        print(f"✅ Presentation saved to: {output_path}")
+        abort = threading.Event()
+        job = loop.run_in_executor(executor, self._build_in_thread, outline, output_path, metrics, abort)
+        
+        def finished(job):
+            # The lock is held until the thread is done with self.prs, even if the caller has gone
+            if not job.cancelled():
+                job.exception()
+            lock.release()
+        job.add_done_callback(finished)
+        try:
+            return await wait_until(asyncio.shield(job), deadline,
+                                    "presentation build did not finish before its deadline")
+        except BaseException:
+            abort.set()
+            raise
+    
+    def _build_in_thread(self, outline: Dict, output_path: str, metrics: BuildMetrics,
+                         abort: threading.Event):
+        """Run one create_presentation_async build, publishing a path output only if not aborted"""
+        with self._render_lock:
+            return self._run_build(outline, output_path, metrics, abort)
+    
+    def _run_build(self, outline: Dict, output_path: str, metrics: BuildMetrics, abort: threading.Event):
+        """Build into a partial file beside output_path and move it into place"""
+        self._abort = abort
+        try:
+            if output_path is None:
+                return self.create_presentation(outline, None, metrics)
+            partial = os.path.join(os.path.dirname(os.path.abspath(output_path)),
+                                   f".{os.path.basename(output_path)}.{uuid.uuid4().hex[:8]}.partial")
+            moves = [(partial, output_path)]
+            if self.incremental:
+                from incremental import manifest_path
+                moves.append((manifest_path(partial), manifest_path(output_path)))
+                # Rebuild from copies of the previous deck and manifest, if there are any
+                if all(os.path.exists(final) for _, final in moves):
+                    for temporary, final in moves:
+                        shutil.copyfile(final, temporary)
+            try:
+                self.create_presentation(outline, partial, metrics)
+                if abort.is_set():
+                    raise BuildCancelled("build abandoned by its caller")
+                for temporary, final in moves:
+                    if os.path.exists(temporary):
+                        os.replace(temporary, final)
+            finally:
+                for temporary, _ in moves:
+                    if os.path.exists(temporary):
+                        os.remove(temporary)
+        finally:
+            self._abort = None
+    
+    def _check_abort(self):
+        """Stop a build whose async caller has gone"""
+        if self._abort is not None and self._abort.is_set():
+            raise BuildCancelled("build abandoned by its caller")
+    
+    def _save_presentation(self, output_path):
+        """Save the presentation, slimming it first when self.slim is set
+        
+        A path is written through a partial file beside it that replaces it only
+        once complete, so a failed save keeps the previous deck (which incremental
+        rebuilds also read their unchanged slides from while saving).
+        """
+        if self.slim:
+            from slim import slim_presentation
+            with self._metrics.phase("slim"):
+                report = slim_presentation(self.prs)
+            self._metrics.set("slim_bytes_saved", report["bytes_saved"])
+            print(f"✂️  Slimmed deck: removed {report['layouts']} layouts, {report['masters']} masters, "
+                  f"{report['duplicate_media']} duplicate media ({report['bytes_saved'] / 1024:.0f} KB)")
+        from package_writer import save_package
+        target = output_path
+        if isinstance(output_path, str):
+            target = os.path.join(os.path.dirname(os.path.abspath(output_path)),
+                                  f".{os.path.basename(output_path)}.{uuid.uuid4().hex[:8]}.partial")
+        try:
+            with self._metrics.phase("save"):
+                report = save_package(self.prs, target, self.compression_level)
+            if target is not output_path:
+                # Also replaces a hardlink to a build cache entry rather than writing through it
+                os.replace(target, output_path)
+        except BaseException:
+            if target is not output_path and os.path.exists(target):
+                os.remove(target)
+            raise
+        self._metrics.set("parts_copied", report["copied"])
+        self._metrics.set("parts_deflated", report["deflated"])
+        self._report_saved(output_path)
+    
+    def _report_cached_build(self, build_key: str, delivered):
+        """Record and print a deck handed back by the build cache"""
+        print(f"♻️  Reusing cached build ({build_key[:12]})")
+        if isinstance(delivered, bytes):
+            self._metrics.set("output_bytes", len(delivered))
+            print("✅ Presentation returned from build cache")
+        elif isinstance(delivered, str):
+            self._metrics.set("output_bytes", os.path.getsize(delivered))
+            print(f"✅ Presentation saved to: {delivered}")
+        else:
+            print("✅ Presentation written to output stream")
+    
+    def _report_saved(self, output_path):
+        """Record and print the size of a deck just written to output_path"""
+        self._metrics.set("slides", len(self.prs.slides))
+        if isinstance(output_path, str):
+            self._metrics.set("output_bytes", os.path.getsize(output_path))
+            print(f"✅ Presentation saved to: {output_path}")
+        else:
+            try:
+                self._metrics.set("output_bytes", output_path.tell())
+            except (AttributeError, OSError):
+                pass  # pipes and sockets cannot report a position
+            print("✅ Presentation written to output stream")
         print(f"📊 Total slides: {len(self.prs.slides)}")
     
+    def generate_presentation_streaming(self, topic: str, output_path: str,
+                                        on_slide: Callable = None,
+                                        metrics: BuildMetrics = None,
+                                        fallback_to_mock: bool = True) -> Dict:
+        """Stream the outline from GenAI and render each layout as soon as it is complete
+
+        on_slide(slide_number, layout_data, elapsed_seconds) is called after every
+        rendered slide. Falls back to the regular build when the streamed response
+        contains no layouts (legacy slides format or unparseable output), or when
+        the stream fails before the first layout: the outline is then requested
+        with generate_outline, retried and replaced by mock content like any
+        other. A stream that fails or is cut off part way keeps the slides
+        rendered so far and requests only the missing layouts. The deck is
+        stored in the build cache under the outline it was built from;
+        incremental and stream_write do not apply to streamed builds.
+        """
+        from outline_stream import LayoutStreamParser
+        
+        print(f"🤖 Streaming presentation outline for topic: '{topic}'...")
+        metrics = metrics or BuildMetrics(topic)
+        if not self.client:
+            outline = self.generate_outline(topic, metrics=metrics)
+            self.create_presentation(outline, output_path, metrics)
+            return outline
+        
+        started = time.perf_counter()
+        self._metrics = metrics
+        with metrics.phase("prompt_load"):
+            prompt = self._load_prompt_template().replace("{topic}", topic)
+        self._record_prompt_size(metrics, prompt)
+        cache_key = None
+        cached = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.key(self.model_name, prompt, self.generation_config)
+            cached = self.response_cache.get(cache_key)
+        
+        # Load the template before the first chunk arrives
+        print(f"📄 Creating presentation using template: {self.template_path}")
+        with metrics.phase("template_load"):
+            self.prs = template_cache.get(self.template_path)
+        
+        if cached is not None:
+            print(f"♻️  Using cached AI response ({cache_key[:12]})")
+            chunks = iter([cached])
+        else:
+            chunks = self._stream_chunks(prompt, metrics)
+        
+        parser = LayoutStreamParser()
+        rendered = 0
+        
+        def render(layout_data):
+            nonlocal rendered
+            if self._add_layout_slide(layout_data) is None:
+                return
+            rendered += 1
+            elapsed = time.perf_counter() - started
+            if rendered == 1:
+                print(f"⏱️  First slide rendered after {elapsed:.2f}s")
+                metrics.set("first_slide_seconds", round(elapsed, 6))
+            if on_slide:
+                on_slide(rendered, layout_data, elapsed)
+        
+        stream_error = None
+        with metrics.phase("stream"):
+            while True:
+                # Only failures of the stream itself are caught; a failed render still raises
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    stream_error = e
+                    break
+                for layout_data in parser.feed(chunk):
+                    render(layout_data)
+        
+        content = parser.full_text
+        metrics.set("response_bytes", len(content.encode("utf-8")))
+        self._save_raw_response(topic, content)
+        if stream_error is not None:
+            print(f"❌ Error streaming outline: {stream_error}")
+        if not parser.layouts:
+            if stream_error is not None:
+                print("Requesting the outline without streaming...")
+                outline = self.generate_outline(topic, fallback_to_mock, metrics)
+            else:
+                print("⚠️  No layouts found in streamed response, parsing it as a whole")
+                try:
+                    outline = self._parse_json(content, metrics)[0]
+                except ValueError as e:
+                    print(f"❌ Error generating outline: {e}")
+                    if not fallback_to_mock:
+                        raise
+                    print("Falling back to mock content...")
+                    outline = self._generate_mock_outline(topic)
+            self.create_presentation(outline, output_path, metrics)
+            return outline
+        
+        outline = {"layouts": list(parser.layouts)}
+        cut_off = stream_error is not None or not parser.done
+        if cut_off:
+            received = len(outline["layouts"])
+            outline = self._request_missing_layouts(prompt, outline, metrics)
+            for layout_data in outline["layouts"][received:]:
+                render(layout_data)
+        elif cache_key is not None and cached is None:
+            self.response_cache.put(cache_key, content, self.model_name)
+        self._save_presentation(output_path)
+        if self.build_cache is not None and isinstance(output_path, str):
+            with metrics.phase("build_cache"):
+                self.build_cache.put(self.build_cache.key(self, outline), output_path)
+        print(f"⏱️  Total time {time.perf_counter() - started:.2f}s for {rendered} slides")
+        return outline
+    
+    def _stream_chunks(self, prompt: str, metrics: BuildMetrics):
+        """Text of each chunk of a streamed reply; opening the stream is deferred to the first chunk"""
+        for chunk in self._call_model(prompt, metrics, stream=True):
+            yield chunk.text
+    
     def _create_presentation_from_layouts(self, layouts: List[Dict]):
-        """Create presentation from new layouts format with embedded content"""
+        """Create presentation from new layouts format with embedded content
+        
+        With an asset library, images for the next IMAGE_LOOKAHEAD slides are
+        prepared on its thread pool while the current slide renders. With
+        render_workers above 1 the slides are rendered by a process pool instead
+        (see parallel_render).
+        """
+        if self.render_workers > 1:
+            from parallel_render import render_parallel
+            render_parallel(self, "layouts", layouts, self.render_workers)
+            return
+        pending = deque()
+        ahead = iter(layouts)
         for layout_data in layouts:
-            layout_id = layout_data.get('id')
-            layout_name = layout_data.get('name')
-            placeholders = layout_data.get('placeholders', [])
+            if self.assets is not None:
+                for queued in islice(ahead, IMAGE_LOOKAHEAD + 1 - len(pending)):
+                    pending.append(self._request_images(queued))
+                images = pending.popleft()
+            else:
+                images = None
+            slide = self._add_layout_slide(layout_data, images)
+            if slide is not None and self._writer is not None:
+                self._writer.write_slide(slide)
+    
+    def _add_layout_slide(self, layout_data: Dict, images: Dict = None):
+        """Add one slide from a layouts-format entry, returning it (None if skipped)
+        
+        images maps picture idx -> rendition future from _request_images; it is
+        requested here when an asset library is set and none is passed.
+        """
+        self._check_abort()
+        started = time.perf_counter()
+        layout_id = layout_data.get('id')
+        layout_name = layout_data.get('name')
+        placeholders = layout_data.get('placeholders', [])
+        
+        # Get the layout from template
+        if layout_id not in self.layouts_by_id:
+            print(f"⚠️  Warning: Layout ID {layout_id} ({layout_name}) not found in template")
+            return None
+        
+        plan = self.render_plans[layout_id]
+        slide, shapes = self._new_slide(layout_id)
+        
+        # Set content for each placeholder
+        for placeholder_data in placeholders:
+            idx = placeholder_data.get('idx')
+            placeholder_type = placeholder_data.get('type', '')
+            content = placeholder_data.get('content')
+            max_chars = placeholder_data.get('max_chars') or plan.max_chars(idx)
             
-            # Get the layout from template
-            if layout_id not in self.layouts_by_id:
-                print(f"⚠️  Warning: Layout ID {layout_id} ({layout_name}) not found in template")
+            # Skip if no content or if it's a picture placeholder
+            if content is None or 'PICTURE' in placeholder_type or idx in plan.picture_idxs:
                 continue
             
-            layout_config = self.layouts_by_id[layout_id]
-            slide_layout = self.prs.slide_layouts[layout_id]
+            # Set the text in the placeholder
+            self._set_placeholder_text(slide, idx, content, max_chars, shapes, plan)
+        
+        if self.assets is not None and plan.picture_idxs:
+            if images is None:
+                images = self._request_images(layout_data)
+            self._fill_pictures(shapes, plan, images)
+        self._metrics.record_layout(plan.name, time.perf_counter() - started)
+        return slide
+    
+    @staticmethod
+    def _image_keywords(layout_data: Dict, placeholder_data: Dict):
+        """Keywords for a picture placeholder
+        
+        Taken from the placeholder's "keywords", else the layout's "image_keywords",
+        else the slide's text.
+        """
+        from asset_library import keywords
+        for given in (placeholder_data.get('keywords'), layout_data.get('image_keywords')):
+            if given:
+                return keywords(given)
+        return keywords([p.get('content') or '' for p in layout_data.get('placeholders', [])
+                         if isinstance(p.get('content'), str)])
+    
+    def _request_images(self, layout_data: Dict) -> Dict:
+        """Start preparing the images of one layouts-format slide: picture idx -> Future"""
+        plan = self.render_plans.get(layout_data.get('id'))
+        if plan is None:
+            return {}
+        entries = {p.get('idx'): p for p in layout_data.get('placeholders', [])}
+        images = {}
+        for idx in plan.picture_idxs:
+            slot = plan.slots[idx]
+            asset = self.assets.select(self._image_keywords(layout_data, entries.get(idx, {})))
+            if asset is not None and slot.width and slot.height:
+                images[idx] = self.assets.rendition(asset, slot.width, slot.height)
+        return images
+    
+    def _fill_pictures(self, shapes: Dict, plan, images: Dict):
+        """Insert prepared images into their placeholders, one media part per distinct image"""
+        if not images:
+            return
+        if self._deck_images is None or self._deck_images.prs is not self.prs:
+            from asset_library import DeckImages
+            self._deck_images = DeckImages(self.prs)
+        for idx, future in images.items():
+            placeholder = shapes.get(idx)
+            if placeholder is None:
+                continue
+            try:
+                if future.done():
+                    image = future.result()
+                else:
+                    with self._metrics.phase("image_wait"):
+                        image = future.result()
+            except Exception as e:
+                print(f"⚠️  Warning: could not prepare image for placeholder {idx}: {e}")
+                continue
+            slot = plan.slots[idx]
+            self._deck_images.insert(placeholder, image, (slot.width, slot.height))
+            self._metrics.count("images_placed")
+    
+    def _new_slide(self, layout_id: int):
+        """Add a slide for a layout and return it with its idx -> placeholder map"""
+        fingerprint = template_cache.fingerprint(self.template_path)
+        if fingerprint != self._plans_fingerprint:
+            # Template changed on disk, so learned placeholder positions and boxes are stale
+            for plan in self.render_plans.values():
+                plan.forget_template()
+            self._plans_fingerprint = fingerprint
+        
+        slide_layout = self.prs.slide_layouts[layout_id]
+        if self._writer is not None:
+            slide = self._writer.add_slide(slide_layout)
+        else:
             slide = self.prs.slides.add_slide(slide_layout)
-            
-            # Set content for each placeholder
-            for placeholder_data in placeholders:
-                idx = placeholder_data.get('idx')
-                placeholder_type = placeholder_data.get('type', '')
-                content = placeholder_data.get('content')
-                max_chars = placeholder_data.get('max_chars')
-                
-                # Skip if no content or if it's a picture placeholder
-                if content is None or 'PICTURE' in placeholder_type:
-                    continue
-                
-                # Set the text in the placeholder
-                self._set_placeholder_text(slide, idx, content, max_chars)
+        return slide, self.render_plans[layout_id].placeholders_by_idx(slide)
     
     def _create_presentation_from_slides(self, outline: Dict):
         """Create presentation from legacy slides format"""
-        # Create cover slide
-        self._create_cover_slide(outline.get("title", "Presentation"), 
-                                outline.get("subtitle", ""))
-        
-        # Create content slides
+        jobs = self._legacy_slide_jobs(outline)
+        if self.render_workers > 1:
+            from parallel_render import render_parallel
+            render_parallel(self, "slides", jobs, self.render_workers)
+            return
+        for builder, slide_type, slide_data in jobs:
+            self._add_legacy_slide(builder, slide_type, slide_data)
+    
+    @staticmethod
+    def _legacy_slide_jobs(outline: Dict) -> List:
+        """(builder, slide type, data) for the cover, each content slide and the closing slide"""
+        cover = {"title": outline.get("title", "Presentation"), "subtitle": outline.get("subtitle", "")}
+        jobs = [("cover", "cover", cover)]
         for slide_data in outline.get("slides", []):
-            slide_type = slide_data.get("type", "content")
+            jobs.append(("slide", slide_data.get("type", "content"), slide_data))
+        jobs.append(("closing", "closing", {}))
+        return jobs
+    
+    def _add_legacy_slide(self, builder: str, slide_type: str, slide_data: Dict):
+        """Add one slide of a legacy outline, described by a _legacy_slide_jobs entry"""
+        self._check_abort()
+        started = time.perf_counter()
+        if builder == "cover":
+            self._create_cover_slide(slide_data["title"], slide_data["subtitle"])
+        elif builder == "closing":
+            self._create_closing_slide()
+        else:
             self._create_slide_by_type(slide_type, slide_data)
-        
-        # Create closing slide
-        self._create_closing_slide()
+        self._metrics.record_layout(slide_type, time.perf_counter() - started)
     
     def _create_slide_by_type(self, slide_type: str, slide_data: Dict):
         """Dynamically create a slide based on type from JSON configuration (legacy support)"""
@@ -233,16 +1017,36 @@ class PresentationGenerator:
             # Use generic layout creation for most slide types
             self._create_slide_from_layout(layout_name, slide_data)
     
-    def _set_placeholder_text(self, slide, placeholder_idx: int, text: str, max_chars: int = None):
-        """Set text in a placeholder, truncating if necessary"""
-        if max_chars and len(text) > max_chars:
-            text = text[:max_chars-3] + "..."
-        
-        for shape in slide.placeholders:
-            if shape.placeholder_format.idx == placeholder_idx:
-                shape.text = text
-                return True
-        return False
+    def _set_placeholder_text(self, slide, placeholder_idx: int, text: str, max_chars: int = None,
+                              shapes: Dict = None, plan=None):
+        """Set text in a placeholder, fitting it to the placeholder's box
+
+        With the slide's render plan the text is laid out against the box measured
+        from the template and shrunk or cut at a word boundary only if it overflows;
+        without one (or with text_fit off) it is cut at max_chars. Pass the slide's
+        idx -> placeholder map from _new_slide for an O(1) lookup.
+        """
+        if shapes is not None:
+            shape = shapes.get(placeholder_idx)
+        else:
+            shape = next((s for s in slide.placeholders if s.placeholder_format.idx == placeholder_idx), None)
+        if shape is None:
+            return False
+
+        box = plan.text_box(placeholder_idx, shape) if plan is not None and self.text_fit else None
+        if box is None:
+            if max_chars and len(text) > max_chars:
+                text = text[:max_chars-3] + "..."
+            shape.text = text
+            return True
+
+        result = fit_text(text, box)
+        apply_fit(shape, result)
+        if result.size is not None:
+            self._metrics.count("text_fit_shrunk")
+        if result.truncated:
+            self._metrics.count("text_fit_truncated")
+        return True
     
     def _create_slide_from_layout(self, layout_name: str, data: Dict):
         """Generic method to create a slide from layout configuration"""
@@ -250,61 +1054,41 @@ class PresentationGenerator:
             print(f"⚠️  Warning: Layout '{layout_name}' not found in configuration")
             return
         
-        layout_config = self.layouts[layout_name]
-        layout_id = layout_config['id']
-        slide_layout = self.prs.slide_layouts[layout_id]
-        slide = self.prs.slides.add_slide(slide_layout)
+        layout_id = self.layouts[layout_name]['id']
+        plan = self.render_plans[layout_id]
+        slide, shapes = self._new_slide(layout_id)
         
-        # Set content for each placeholder based on data
-        for placeholder in layout_config['placeholders']:
-            if placeholder['type'] == 'text':
-                # Map common field names to data
-                text = None
-                idx = placeholder['idx']
-                name = placeholder['name']
-                max_chars = placeholder.get('max_chars')
-                
-                # Try to find matching data
-                if 'title' in name.lower() and 'title' in data:
-                    text = data['title']
-                elif 'subtitle' in name.lower() and 'subtitle' in data:
-                    text = data['subtitle']
-                elif 'message' in name.lower() and 'message' in data:
-                    text = data['message']
-                elif 'text' in name.lower() and 'content' in data:
-                    text = data['content']
-                elif 'presenter' in name.lower() and 'presenter' in data:
-                    text = data['presenter']
-                elif 'date' in name.lower() and 'date' in data:
-                    text = data['date']
-                
-                if text:
-                    self._set_placeholder_text(slide, idx, text, max_chars)
+        # Set content for each placeholder bound to data fields in the render plan
+        for idx, fields in plan.field_bindings.items():
+            field = next((f for f in fields if f in data), None)
+            text = data[field] if field else None
+            if text:
+                self._set_placeholder_text(slide, idx, text, plan.max_chars(idx), shapes, plan)
     
     def _create_cover_slide(self, title: str, subtitle: str):
         """Create the cover slide"""
         layout_config = self.layouts['cover']
-        slide_layout = self.prs.slide_layouts[layout_config['id']]
-        slide = self.prs.slides.add_slide(slide_layout)
+        slide, shapes = self._new_slide(layout_config['id'])
+        plan = self.render_plans[layout_config['id']]
         
         # Find and set placeholders dynamically
         for placeholder in layout_config['placeholders']:
             if 'title' in placeholder['name'].lower():
-                self._set_placeholder_text(slide, placeholder['idx'], title, placeholder.get('max_chars'))
+                self._set_placeholder_text(slide, placeholder['idx'], title, placeholder.get('max_chars'), shapes, plan)
             elif 'subtitle' in placeholder['name'].lower():
-                self._set_placeholder_text(slide, placeholder['idx'], subtitle, placeholder.get('max_chars'))
+                self._set_placeholder_text(slide, placeholder['idx'], subtitle, placeholder.get('max_chars'), shapes, plan)
     
     def _create_agenda_slide(self, slide_data: Dict):
         """Create an agenda slide"""
         layout_config = self.layouts['agenda_with_image']
-        slide_layout = self.prs.slide_layouts[layout_config['id']]
-        slide = self.prs.slides.add_slide(slide_layout)
+        slide, shapes = self._new_slide(layout_config['id'])
+        plan = self.render_plans[layout_config['id']]
         
         # Set title
         title = slide_data.get("title", "Agenda")
         for placeholder in layout_config['placeholders']:
             if placeholder['name'] == 'title':
-                self._set_placeholder_text(slide, placeholder['idx'], title, placeholder.get('max_chars'))
+                self._set_placeholder_text(slide, placeholder['idx'], title, placeholder.get('max_chars'), shapes, plan)
                 break
         
         # Set agenda items
@@ -314,55 +1098,214 @@ class PresentationGenerator:
             if i < len(agenda_placeholders):
                 placeholder = agenda_placeholders[i]
                 text = f"{i + 1}. {point}"
-                self._set_placeholder_text(slide, placeholder['idx'], text, placeholder.get('max_chars'))
+                self._set_placeholder_text(slide, placeholder['idx'], text, placeholder.get('max_chars'), shapes, plan)
     
     def _create_onepager_slide(self, slide_data: Dict):
         """Create a one-pager summary slide"""
         layout_config = self.layouts['onepager_1']
-        slide_layout = self.prs.slide_layouts[layout_config['id']]
-        slide = self.prs.slides.add_slide(slide_layout)
+        slide, shapes = self._new_slide(layout_config['id'])
+        plan = self.render_plans[layout_config['id']]
         
         # Set title
         title = slide_data.get("title", "Overview")
         for placeholder in layout_config['placeholders']:
             if placeholder['name'] == 'title':
-                self._set_placeholder_text(slide, placeholder['idx'], title, placeholder.get('max_chars'))
+                self._set_placeholder_text(slide, placeholder['idx'], title, placeholder.get('max_chars'), shapes, plan)
                 break
         
         # Set content in first text placeholder
         content = slide_data.get("content", "")
         text_placeholders = [p for p in layout_config['placeholders'] if p['type'] == 'text' and 'text_' in p['name']]
         if text_placeholders:
-            self._set_placeholder_text(slide, text_placeholders[0]['idx'], content, text_placeholders[0].get('max_chars'))
+            self._set_placeholder_text(slide, text_placeholders[0]['idx'], content, text_placeholders[0].get('max_chars'), shapes, plan)
     
     def _create_closing_slide(self):
         """Create a closing/thank you slide"""
         layout_config = self.layouts['salutation']
-        slide_layout = self.prs.slide_layouts[layout_config['id']]
-        slide = self.prs.slides.add_slide(slide_layout)
+        slide, shapes = self._new_slide(layout_config['id'])
+        plan = self.render_plans[layout_config['id']]
         
         for placeholder in layout_config['placeholders']:
             if placeholder['name'] == 'title':
-                self._set_placeholder_text(slide, placeholder['idx'], "Thank You", placeholder.get('max_chars'))
+                self._set_placeholder_text(slide, placeholder['idx'], "Thank You", placeholder.get('max_chars'), shapes, plan)
                 break
 
 
+class StartupTimer:
+    """Collects per-phase wall times for --timing-startup"""
+    
+    def __init__(self):
+        # CPU time spent before this module started importing approximates interpreter startup
+        self.marks = [
+            ("interpreter startup (CPU)", _PROCESS_CPU_BEFORE_IMPORT),
+            ("module imports", _MODULE_IMPORT_FINISHED - _MODULE_IMPORT_STARTED),
+            ("argument parsing", time.perf_counter() - _MODULE_IMPORT_FINISHED),
+        ]
+        self._last = time.perf_counter()
+    
+    def mark(self, label: str):
+        """Record the time since the previous mark under `label`"""
+        now = time.perf_counter()
+        self.marks.append((label, now - self._last))
+        self._last = now
+    
+    def report(self):
+        """Print the recorded phases and which heavy dependencies got imported"""
+        print("\n⏱️  Startup timing:")
+        for label, seconds in self.marks:
+            print(f"  {label:<36} {max(seconds, 0) * 1000:8.1f} ms")
+        for module in ("pptx", "google.generativeai"):
+            loaded = "yes" if module in sys.modules else "no"
+            print(f"  {module + ' imported':<36} {loaded:>8}")
+
+
+def add_response_cache_arguments(parser):
+    """Add the GenAI response and build cache options shared by all entry points"""
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached GenAI responses (default: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="Seconds before a cached GenAI response expires (default: never)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call GenAI instead of reusing cached responses"
+    )
+    parser.add_argument(
+        "--build-cache-dir",
+        default=DEFAULT_BUILD_CACHE_DIR,
+        help=f"Directory for decks reused when template, outline and options repeat "
+             f"(default: {DEFAULT_BUILD_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--no-build-cache",
+        action="store_true",
+        help="Always render instead of reusing a deck built from the same inputs"
+    )
+
+
+def response_cache_from_args(args):
+    """Build the ResponseCache selected on the command line, or None"""
+    if args.no_cache:
+        return None
+    return ResponseCache(args.cache_dir, ttl_seconds=args.cache_ttl)
+
+
+def build_cache_from_args(args):
+    """Build the BuildCache selected on the command line, or None"""
+    if args.no_build_cache:
+        return None
+    from build_cache import BuildCache
+    return BuildCache(args.build_cache_dir)
+
+
+def add_scheduler_arguments(parser):
+    """Add the GenAI rate limit, retry and deadline options shared by all entry points"""
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        help="Maximum GenAI requests per minute (default: unlimited)"
+    )
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        help="Maximum GenAI tokens per minute (default: unlimited)"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=4,
+        help="Retries for rate-limited or transient GenAI errors (default: 4)"
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        help="Seconds a GenAI request may take, including queueing and retries (default: none)"
+    )
+
+
+def scheduler_from_args(args):
+    """Build the RequestScheduler selected on the command line"""
+    from scheduler import RequestScheduler
+    return RequestScheduler(args.rpm, args.tpm, max_retries=args.max_retries,
+                            timeout=args.request_timeout)
+
+
+def add_asset_arguments(parser):
+    """Add the image library options shared by all entry points"""
+    parser.add_argument(
+        "--assets",
+        metavar="DIR",
+        help="Fill picture placeholders with images from DIR, chosen by keywords (layouts format)"
+    )
+    parser.add_argument(
+        "--image-cache",
+        default=ASSET_CACHE_DIR,
+        help=f"Directory for the asset index and resized images (default: {ASSET_CACHE_DIR})"
+    )
+
+
+def assets_from_args(args):
+    """Open the AssetLibrary selected on the command line, or None"""
+    if not args.assets:
+        return None
+    from asset_library import open_library
+    library = open_library(args.assets, args.image_cache)
+    print(f"🖼️  Asset library: {len(library.assets)} images in {library.directory}")
+    return library
+
+
+def configure_generator(generator: PresentationGenerator, args):
+    """Apply the output and prompt options shared by single and batch runs"""
+    generator.slim = args.slim
+    generator.incremental = args.incremental
+    generator.save_responses = not args.no_save_response
+    generator.prompt_style = args.prompt_style
+    generator.text_fit = not args.no_text_fit
+    generator.stream_write = args.stream_write
+    generator.assets = assets_from_args(args)
+    generator.render_workers = args.render_workers
+    generator.compression_level = args.compression_level
+    generator.build_cache = build_cache_from_args(args)
+    generator.scheduler = scheduler_from_args(args)
+    if args.json_mode:
+        from prompt_compiler import json_generation_config
+        generator.generation_config = json_generation_config()
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from server import main as serve_main
+        serve_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="Generate a branded PowerPoint presentation from a topic using GenAI"
     )
     parser.add_argument(
         "topic",
-        help="The topic for the presentation"
+        nargs="?",
+        help="The topic for the presentation (omit when using --batch)"
     )
     parser.add_argument(
         "-t", "--template",
         default="input/branding.pptx",
         help="Path to the branded template (default: input/branding.pptx)"
     )
+    parser.add_argument(
+        "--layouts",
+        metavar="FILE",
+        help="Layout overrides (descriptions, max_chars) for the template "
+             "(default: <template>.layouts.json or slide_layouts.json next to it)"
+    )
     parser.add_argument(
         "-o", "--output",
-        help="Output filename (default: generated_<topic>.pptx)"
+        help="Output filename, or - for stdout (default: output/<topic>.pptx); output directory with --batch"
     )
     parser.add_argument(
         "-k", "--api-key",
@@ -372,19 +1315,139 @@ def main():
         "-j", "--json",
         help="Use existing JSON response file instead of calling GenAI"
     )
+    parser.add_argument(
+        "-b", "--batch",
+        help="Generate one deck per topic listed in a .txt (one per line) or .jsonl file"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum concurrent GenAI calls in batch and fan-out mode (default: 4)"
+    )
+    parser.add_argument(
+        "--fanout",
+        type=int,
+        metavar="SLIDES",
+        help="Plan a ~SLIDES-slide skeleton first, then write its sections concurrently"
+    )
+    parser.add_argument(
+        "--variants",
+        metavar="LIST",
+        help="Build one deck per variant from a single GenAI call, e.g. executive,technical or "
+             "en,de,fr (written as <output stem>_<variant>.pptx)"
+    )
+    parser.add_argument(
+        "-s", "--stream",
+        action="store_true",
+        help="Stream the GenAI response and render each slide as soon as it arrives"
+    )
+    parser.add_argument(
+        "--timing-startup",
+        action="store_true",
+        help="Print how long startup, imports, generation and rendering took"
+    )
+    parser.add_argument(
+        "--prompt-style",
+        choices=["compact", "full"],
+        default="compact",
+        help="compact: prompt compiled from the layout catalogue; full: input/prompt.md (default: compact)"
+    )
+    parser.add_argument(
+        "--json-mode",
+        action="store_true",
+        help="Ask Gemini for bare JSON matching the outline schema (response_schema)"
+    )
+    parser.add_argument(
+        "--no-save-response",
+        action="store_true",
+        help="Do not write the raw GenAI response to output/<topic>_response.json"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep a manifest next to the deck and only re-render changed slides on rebuild"
+    )
+    parser.add_argument(
+        "--slim",
+        action="store_true",
+        help="Drop unused layouts/masters and duplicate media from the saved deck"
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Render the slides of each deck on N processes (default: 1)"
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(10),
+        default=DEFAULT_COMPRESSION_LEVEL,
+        metavar="0-9",
+        help="zlib level for the slide XML written on save; template parts are copied "
+             f"as they are compressed in the template (default: {DEFAULT_COMPRESSION_LEVEL}, 0 stores)"
+    )
+    parser.add_argument(
+        "--stream-write",
+        action="store_true",
+        help="Write each slide to the output as soon as it is rendered, keeping memory flat "
+             "for very large decks (layouts format; ignored with --slim)"
+    )
+    parser.add_argument(
+        "--no-text-fit",
+        action="store_true",
+        help="Cut placeholder text at max_chars instead of fitting it to the placeholder box"
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write per-phase build metrics to FILE (appends one JSON line per build)"
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=["json", "prometheus"],
+        default="json",
+        help="Metrics output format (default: json)"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write a cProfile dump of the render phase to FILE"
+    )
+    add_response_cache_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_asset_arguments(parser)
     
     args = parser.parse_args()
+    timer = StartupTimer()
+    
+    if args.batch:
+        _run_batch_mode(args)
+        return
+    if not args.topic:
+        parser.error("a topic is required unless --batch is given")
+    if args.variants and args.output == "-":
+        parser.error("--variants writes one deck per variant and cannot write to stdout")
+    if args.stream and (args.incremental or args.stream_write):
+        parser.error("--stream renders slides as they arrive and cannot be combined with "
+                     "--incremental or --stream-write")
     
     # Generate output filename if not provided
     if not args.output:
-        safe_topic = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in args.topic)
-        safe_topic = safe_topic.replace(' ', '_').lower()
-        args.output = f"output/{safe_topic}.pptx"
+        args.output = f"output/{safe_topic_name(args.topic)}.pptx"
     
-    # Create output directory if it doesn't exist
-    output_dir = os.path.dirname(args.output)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    output_target = args.output
+    if args.output == "-":
+        # The deck goes to stdout, so progress messages move to stderr
+        output_target = sys.stdout.buffer
+        sys.stdout = sys.stderr
+    else:
+        # Create output directory if it doesn't exist
+        output_dir = os.path.dirname(args.output)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
     
     # Check if template exists
     if not os.path.exists(args.template):
@@ -393,33 +1456,74 @@ def main():
     
     try:
         # Initialize generator
-        generator = PresentationGenerator(args.template, args.api_key)
+        generator = PresentationGenerator(args.template, args.api_key,
+                                          response_cache_from_args(args), args.layouts)
+        generator.profile_path = args.profile
+        configure_generator(generator, args)
+        metrics = BuildMetrics(args.topic)
+        timer.mark("generator init")
         
         # Generate or load outline
-        if args.json:
+        written = None
+        if args.variants and not args.json:
+            # Every variant from one GenAI call, rendered as separate decks below
+            from variants import generate_variant_outlines, parse_variants
+            outline = {"variants": generate_variant_outlines(
+                generator, args.topic, parse_variants(args.variants), args.concurrency, metrics)}
+        elif args.json:
             # Load existing JSON response
             print(f"📂 Loading existing JSON response from: {args.json}")
-            import json
             with open(args.json, 'r') as f:
                 content = f.read()
             
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
-            
-            outline = json.loads(content)
-            print(f"✅ Loaded outline with {len(outline.get('slides', []))} slides")
+            outline = generator._parse_json(content, metrics)[0]
+            if 'variants' in outline:
+                print(f"✅ Loaded {len(outline['variants'])} variant outlines")
+            elif 'layouts' in outline:
+                print(f"✅ Loaded outline with {len(outline['layouts'])} layouts")
+            else:
+                print(f"✅ Loaded outline with {len(outline.get('slides', []))} slides")
+        elif args.stream:
+            # Render slides while the outline is still streaming in
+            generator.generate_presentation_streaming(
+                args.topic, output_target,
+                on_slide=lambda n, layout, elapsed: print(
+                    f"🖼️  Slide {n} ({layout.get('name')}) rendered at {elapsed:.2f}s"),
+                metrics=metrics
+            )
+            outline = None
+            timer.mark("streamed outline + render + save")
+        elif args.fanout:
+            # Skeleton first, then one concurrent GenAI call per section
+            from fanout import generate_outline_fanout
+            outline = generate_outline_fanout(generator, args.topic, args.fanout,
+                                              args.concurrency, metrics=metrics)
         else:
             # Generate outline using GenAI
-            outline = generator.generate_outline(args.topic)
+            outline = generator.generate_outline(args.topic, metrics=metrics)
         
-        # Create presentation
-        generator.create_presentation(outline, args.output)
+        if outline is not None and 'variants' in outline:
+            timer.mark("outline")
+            from variants import create_variant_presentations
+            written = create_variant_presentations(generator, outline['variants'], args.output, metrics)
+            timer.mark("render + save")
+        elif outline is not None:
+            timer.mark("outline")
+            # Create presentation
+            generator.create_presentation(outline, output_target, metrics)
+            timer.mark("render + save")
         
-        print(f"\n✨ Success! Your presentation is ready: {args.output}")
+        if written:
+            print(f"\n✨ Success! Your {len(written)} presentations are ready: {', '.join(written.values())}")
+        elif output_target is not args.output:
+            output_target.flush()
+            print("\n✨ Success! Your presentation was written to stdout")
+        else:
+            print(f"\n✨ Success! Your presentation is ready: {args.output}")
+        if args.metrics:
+            metrics.write(args.metrics, args.metrics_format)
+        if args.timing_startup:
+            timer.report()
         
     except ValueError as e:
         print(f"❌ Configuration Error: {e}")
@@ -435,5 +1539,29 @@ def main():
         sys.exit(1)
 
 
+def _run_batch_mode(args):
+    """Run --batch: one warm generator, concurrent outlines, per-topic report"""
+    from batch import load_topics, run_batch, write_report
+    from scheduler import BATCH
+    
+    if not os.path.exists(args.template):
+        print(f"❌ Error: Template file '{args.template}' not found")
+        sys.exit(1)
+    
+    topics = load_topics(args.batch)
+    print(f"📚 Loaded {len(topics)} topics from: {args.batch}")
+    output_dir = args.output or "output"
+    
+    generator = PresentationGenerator(args.template, args.api_key, response_cache_from_args(args),
+                                      args.layouts)
+    configure_generator(generator, args)
+    generator.priority = BATCH
+    report = run_batch(generator, topics, output_dir, args.concurrency)
+    write_report(report, os.path.join(output_dir, "batch_report.json"))
+    
+    if any(result["status"] != "ok" for result in report):
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
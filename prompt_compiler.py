@@ -0,0 +1,106 @@
+"""
+Compile the outline prompt from the template's layout catalogue
+
+The hand-written prompt.md embeds a pretty-printed copy of the layout catalogue,
+which costs input tokens on every call and drifts whenever the layouts change.
+The compiler renders the catalogue from the loaded layouts in a one-line-per-
+layout encoding (picture placeholders are left out, since the model never fills
+them) and asks for a reply that only carries layout ids, placeholder idx values
+and content. Compiled prompts are cached per (catalogue key, prompt file hash);
+the key is the content hash template_registry gives each template + overrides.
+"""
+
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from template_cache import file_sha256
+
+COMPACT_PROMPT = os.path.join(os.path.dirname(__file__), "input/prompt_compact.md")
+
+# Reply shape requested by the compact prompt, for Gemini's JSON mode
+OUTLINE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "layouts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "placeholders": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "idx": {"type": "integer"},
+                                "content": {"type": "string"},
+                            },
+                            "required": ["idx", "content"],
+                        },
+                    },
+                },
+                "required": ["id", "placeholders"],
+            },
+        },
+    },
+    "required": ["layouts"],
+}
+
+
+def json_generation_config(schema: Dict = None) -> Dict:
+    """Generation settings that make Gemini return bare JSON matching `schema`"""
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": schema or OUTLINE_SCHEMA,
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input token count (about four bytes of UTF-8 per token)"""
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def encode_layout(layout: Dict) -> str:
+    """One catalogue line: `id name | description | idx field max_chars, ...`
+
+    Placeholders sharing a field name and limit are listed once with their idx
+    values joined by '/'; the limit is left out when the catalogue has none.
+    """
+    groups: Dict[Tuple[str, int], List[str]] = {}
+    for placeholder in layout["placeholders"]:
+        if "PICTURE" in placeholder.get("type", ""):
+            continue
+        key = (placeholder["name"].replace(" ", "_"), placeholder.get("max_chars"))
+        groups.setdefault(key, []).append(str(placeholder["idx"]))
+    fields = ", ".join(f"{'/'.join(idxs)} {name}" + (f" {max_chars}" if max_chars else "")
+                       for (name, max_chars), idxs in groups.items())
+    return f"{layout['id']} {layout['name']} | {layout.get('description', '')} | {fields}"
+
+
+def compact_catalogue(layouts: List[Dict]) -> str:
+    return "\n".join(encode_layout(layout) for layout in layouts)
+
+
+class PromptCompiler:
+    """Compile and cache the compact outline prompt (with {topic} left in place)"""
+
+    def __init__(self):
+        self._compiled: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, catalogue_key: str, layouts: List[Dict], prompt_file: str = COMPACT_PROMPT) -> str:
+        key = (catalogue_key, file_sha256(prompt_file))
+        with self._lock:
+            prompt = self._compiled.get(key)
+            if prompt is None:
+                with open(prompt_file, 'r') as f:
+                    prompt = (f.read()
+                              .replace("{layouts}", compact_catalogue(layouts))
+                              .replace("{layout_count}", str(len(layouts))))
+                self._compiled[key] = prompt
+        return prompt
+
+
+# Shared by every PresentationGenerator in the process
+prompt_compiler = PromptCompiler()
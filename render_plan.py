@@ -0,0 +1,110 @@
+"""
+Precompiled render plans, one per layout in slide_layouts.json
+
+A plan is compiled once per generator and holds everything the render loop used
+to recompute per slide: placeholder slots with their truncation limits, which
+idx values are PICTURE placeholders, and the legacy field-name bindings that
+used to be found by substring matching on placeholder names. The
+idx -> position mapping into a new slide's placeholder list is learned from the
+first slide built with the layout, after which each placeholder is an O(1)
+lookup. Text boxes for fitting (see text_fit) are measured the same way, once
+per placeholder.
+"""
+
+from typing import Dict, List, Optional
+
+from text_fit import TextBox, measure_box
+
+# Legacy outline fields, in the precedence order the name matching used
+LEGACY_FIELD_RULES = [
+    ("title", "title"),
+    ("subtitle", "subtitle"),
+    ("message", "message"),
+    ("text", "content"),
+    ("presenter", "presenter"),
+    ("date", "date"),
+]
+
+
+class PlaceholderSlot:
+    """Static facts about one placeholder of a layout"""
+
+    __slots__ = ("idx", "name", "type", "max_chars", "is_picture", "width", "height")
+
+    def __init__(self, placeholder: Dict):
+        self.idx = placeholder["idx"]
+        self.name = placeholder["name"]
+        self.type = placeholder.get("type", "")
+        self.max_chars = placeholder.get("max_chars")
+        self.is_picture = "PICTURE" in self.type
+        # Geometry in EMU from the template catalogue (None for hand-written catalogues)
+        self.width = placeholder.get("width")
+        self.height = placeholder.get("height")
+
+
+class LayoutPlan:
+    """Render plan for one template layout"""
+
+    def __init__(self, layout_config: Dict):
+        self.layout_id = layout_config["id"]
+        self.name = layout_config["name"]
+        self.slots: Dict[int, PlaceholderSlot] = {}
+        for placeholder in layout_config["placeholders"]:
+            self.slots[placeholder["idx"]] = PlaceholderSlot(placeholder)
+        self.picture_idxs = {idx for idx, slot in self.slots.items() if slot.is_picture}
+        self.field_bindings = self._compile_field_bindings(layout_config["placeholders"])
+        self.positions: Optional[Dict[int, int]] = None
+        self.boxes: Dict[int, Optional[TextBox]] = {}
+
+    @staticmethod
+    def _compile_field_bindings(placeholders: List[Dict]) -> Dict[int, List[str]]:
+        """Resolve which legacy data fields may fill each placeholder, once
+
+        Mirrors the per-slide substring matching on 'text'-typed placeholders: the
+        candidate fields are listed in matching precedence, and the first one
+        present in the slide data wins.
+        """
+        bindings: Dict[int, List[str]] = {}
+        for placeholder in placeholders:
+            if placeholder.get("type") != "text":
+                continue
+            name = placeholder["name"].lower()
+            fields = [field for keyword, field in LEGACY_FIELD_RULES if keyword in name]
+            if fields:
+                bindings[placeholder["idx"]] = fields
+        return bindings
+
+    def max_chars(self, idx: int) -> Optional[int]:
+        """Truncation limit for a placeholder from slide_layouts.json"""
+        slot = self.slots.get(idx)
+        return slot.max_chars if slot else None
+
+    def text_box(self, idx: int, shape) -> Optional[TextBox]:
+        """Text box of a placeholder, measured from the first shape seen for it"""
+        if idx not in self.boxes:
+            self.boxes[idx] = measure_box(shape)
+        return self.boxes[idx]
+
+    def forget_template(self):
+        """Drop everything learned from the template's shapes"""
+        self.positions = None
+        self.boxes = {}
+
+    def placeholders_by_idx(self, slide) -> Dict:
+        """Map idx -> placeholder shape for a slide created from this layout
+
+        The first call learns each idx's position in the slide's placeholder list;
+        later calls index straight into that list.
+        """
+        placeholders = list(slide.placeholders)
+        if self.positions is None or len(placeholders) != len(self.positions):
+            self.positions = {
+                shape.placeholder_format.idx: position
+                for position, shape in enumerate(placeholders)
+            }
+        return {idx: placeholders[position] for idx, position in self.positions.items()}
+
+
+def compile_render_plans(layouts: List[Dict]) -> Dict[int, LayoutPlan]:
+    """Compile a render plan for every layout, keyed by layout id"""
+    return {layout["id"]: LayoutPlan(layout) for layout in layouts}
@@ -0,0 +1,108 @@
+"""
+Content-addressed on-disk cache for GenAI outline responses
+
+Entries are keyed by a SHA-256 of (model name, fully rendered prompt, generation
+settings), so any change to the prompt, layouts or model yields a new key. Each
+entry is a small JSON file written atomically (temp file + os.replace), which
+makes the cache safe to share between concurrent processes. A hit refreshes the
+file's mtime, and eviction removes the least recently used files once the cache
+exceeds its entry or byte budget.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = ".cache/responses"
+
+
+class ResponseCache:
+    """Bounded LRU cache of raw model responses stored as one file per key"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = 1000,
+                 max_bytes: int = 100 * 1024 * 1024, ttl_seconds: float = None):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model_name: str, prompt: str, settings: Optional[Dict] = None) -> str:
+        """Return the content address for a request"""
+        material = json.dumps(
+            {"model": model_name, "prompt": prompt, "settings": settings or {}},
+            sort_keys=True, ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None on a miss or expired entry"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry["created"] > self.ttl_seconds:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return entry["text"]
+
+    def put(self, key: str, text: str, model_name: str = None):
+        """Store a response atomically, then evict old entries if over budget"""
+        entry = {"created": time.time(), "model": model_name, "text": text}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until within max_entries and max_bytes"""
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.directory) as it:
+            for dirent in it:
+                if not dirent.name.endswith(".json") or dirent.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = dirent.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, dirent.path))
+                total_bytes += stat.st_size
+
+        entries.sort()
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total_bytes -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
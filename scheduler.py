@@ -0,0 +1,287 @@
+"""
+Quota-aware scheduling of GenAI requests
+
+Every model call can be routed through a RequestScheduler, which
+- admits requests against requests-per-minute and tokens-per-minute token
+  buckets, serving interactive requests before batch ones,
+- retries rate-limit and transient server errors with jittered exponential
+  backoff,
+- enforces a per-request deadline covering queueing, retries and the call itself,
+- records queue wait, backoff and model latency as separate build phases.
+
+One scheduler can be shared by every generator in a process so the budgets are
+global. call_async is the asyncio counterpart of call: it awaits the client's
+coroutine under the same budgets, and waits in the queue without holding a
+thread, so an event loop can keep hundreds of requests in flight. asyncio is
+only imported by the async methods.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional
+
+# Lower runs first
+INTERACTIVE = 0
+BATCH = 1
+
+_RETRYABLE_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "DeadlineExceeded", "GatewayTimeout", "TimeoutError", "ConnectionError"}
+_RETRYABLE_CODES = ("429", "500", "502", "503", "504")
+# Seconds between budget checks of an async request waiting behind others
+ASYNC_POLL_INTERVAL = 0.05
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request cannot finish before its deadline"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts and transient server errors are worth retrying"""
+    if any(klass.__name__ in _RETRYABLE_NAMES for klass in type(error).__mro__):
+        return True
+    message = str(error)
+    return any(message.startswith(code) or f" {code} " in f" {message} " for code in _RETRYABLE_CODES)
+
+
+async def wait_until(awaitable, deadline: Optional[float],
+                     message: str = "GenAI request did not finish before its deadline"):
+    """Await `awaitable`, cancelling it and raising DeadlineExceeded at `deadline` (time.monotonic)"""
+    import asyncio
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(0.0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(message) from None
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to one minute's worth"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float):
+        """Consume units; may go negative to account for underestimated requests"""
+        self.available -= amount
+
+
+class RequestScheduler:
+    """Admission control, retries and deadlines in front of a GenAI client
+
+    requests_per_minute / tokens_per_minute of None disable that budget. Token
+    usage is charged from the prompt estimate on admission and corrected with the
+    usage the model reports.
+    """
+
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 timeout: float = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="genai")
+        self.retries = 0
+        self.rejected = 0
+
+    def call(self, fn: Callable, prompt: str, *, tokens: int = 0, priority: int = INTERACTIVE,
+             timeout: float = None, metrics=None, **kwargs):
+        """Run fn(prompt, **kwargs) once admitted, retrying retryable failures
+
+        Raises DeadlineExceeded when queueing, backoff and attempts do not fit in
+        `timeout` (default: the scheduler's timeout).
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = time.monotonic() + timeout if timeout else None
+
+        for attempt in range(self.max_retries + 1):
+            self._admit(tokens, priority, deadline, metrics)
+            try:
+                response = self._attempt(fn, prompt, deadline, metrics, **kwargs)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline, metrics)
+                if metrics is not None:
+                    with metrics.phase("retry_backoff"):
+                        time.sleep(delay)
+                else:
+                    time.sleep(delay)
+                continue
+
+            self._settle_tokens(tokens, response)
+            return response
+
+    async def call_async(self, fn: Callable, prompt: str, *, tokens: int = 0, priority: int = INTERACTIVE,
+                         timeout: float = None, metrics=None, **kwargs):
+        """Await fn(prompt, **kwargs) once admitted, retrying retryable failures
+
+        fn returns an awaitable (e.g. a client's generate_content_async). Same
+        budgets, retries and DeadlineExceeded as call; cancelling the caller
+        cancels the request wherever it is.
+        """
+        import asyncio
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = time.monotonic() + timeout if timeout else None
+
+        for attempt in range(self.max_retries + 1):
+            await self._admit_async(tokens, priority, deadline, metrics)
+            started = time.perf_counter()
+            try:
+                response = await wait_until(fn(prompt, **kwargs), deadline)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline, metrics)
+                if metrics is not None:
+                    with metrics.phase("retry_backoff"):
+                        await asyncio.sleep(delay)
+                else:
+                    await asyncio.sleep(delay)
+                continue
+            finally:
+                if metrics is not None:
+                    metrics.add_time("llm_request", time.perf_counter() - started)
+
+            self._settle_tokens(tokens, response)
+            return response
+
+    def _retry_delay(self, error: Exception, attempt: int, deadline: Optional[float], metrics) -> float:
+        """Backoff before the next attempt, re-raising errors that are final"""
+        if attempt == self.max_retries or not is_retryable(error):
+            raise error
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise DeadlineExceeded(f"no time left to retry after: {error}") from error
+        print(f"⏳ GenAI request failed ({error}); retrying in {delay:.1f}s "
+              f"(attempt {attempt + 2}/{self.max_retries + 1})")
+        with self._cond:
+            self.retries += 1
+        if metrics is not None:
+            metrics.count("request_retries")
+        return delay
+
+    def _attempt(self, fn: Callable, prompt: str, deadline: Optional[float], metrics, **kwargs):
+        """One call of fn, bounded by `deadline`
+
+        The time left is passed to the client as request_options={"timeout": ...}
+        (google.generativeai's per-request timeout), so the call itself stops
+        rather than holding a worker thread and quota after DeadlineExceeded. A
+        client that ignores it keeps its thread until it returns; a call still
+        waiting for a thread is cancelled.
+        """
+        started = time.perf_counter()
+        try:
+            if deadline is None:
+                return fn(prompt, **kwargs)
+            remaining = max(0.0, deadline - time.monotonic())
+            kwargs["request_options"] = dict(kwargs.get("request_options") or {}, timeout=remaining)
+            future = self._executor.submit(fn, prompt, **kwargs)
+            try:
+                return future.result(timeout=remaining)
+            except FutureTimeout:
+                future.cancel()
+                raise DeadlineExceeded("GenAI request did not finish before its deadline")
+        finally:
+            if metrics is not None:
+                metrics.add_time("llm_request", time.perf_counter() - started)
+
+    def _admit(self, tokens: int, priority: int, deadline: Optional[float], metrics):
+        """Block until this request is first in line and both budgets allow it"""
+        started = time.perf_counter()
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    wait = self._try_take(ticket, tokens, deadline)
+                    if wait == 0.0:
+                        break
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._leave(ticket)
+        if metrics is not None:
+            metrics.add_time("queue_wait", time.perf_counter() - started)
+
+    async def _admit_async(self, tokens: int, priority: int, deadline: Optional[float], metrics):
+        """_admit for coroutines: sleeps on the event loop instead of the condition"""
+        import asyncio
+        started = time.perf_counter()
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(ticket, tokens, deadline)
+                if wait == 0.0:
+                    break
+                # Woken threads are notified; coroutines recheck every ASYNC_POLL_INTERVAL
+                await asyncio.sleep(min(wait, ASYNC_POLL_INTERVAL) if wait else ASYNC_POLL_INTERVAL)
+        finally:
+            with self._cond:
+                self._leave(ticket)
+        if metrics is not None:
+            metrics.add_time("queue_wait", time.perf_counter() - started)
+
+    def _try_take(self, ticket, tokens: int, deadline: Optional[float]) -> Optional[float]:
+        """Admit `ticket` if it is first in line and the budgets allow (returns 0.0),
+        else return how long to wait (None: until woken). Called holding _cond."""
+        now = time.monotonic()
+        wait = None
+        if self._waiting[0] == ticket:
+            wait = max(self.requests.wait_time(1, now) if self.requests else 0.0,
+                       self.tokens.wait_time(tokens, now) if self.tokens else 0.0)
+            if wait == 0.0:
+                if self.requests:
+                    self.requests.take(1)
+                if self.tokens:
+                    self.tokens.take(tokens)
+                return 0.0
+        if deadline is not None:
+            remaining = deadline - now
+            if remaining <= 0 or (wait is not None and wait > remaining):
+                self.rejected += 1
+                raise DeadlineExceeded("rate limit budget exhausted until after the deadline")
+            wait = remaining if wait is None else wait
+        return wait
+
+    def _leave(self, ticket):
+        """Take `ticket` out of the queue and wake the waiters behind it. Called holding _cond."""
+        self._waiting.remove(ticket)
+        heapq.heapify(self._waiting)
+        self._cond.notify_all()
+
+    def _settle_tokens(self, estimated: int, response):
+        """Charge the difference between reported and estimated token usage"""
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None) if usage is not None else None
+        if self.tokens and total:
+            with self._cond:
+                self.tokens.take(total - estimated)
@@ -0,0 +1,285 @@
+"""
+HTTP service mode around a pool of pre-warmed presentation generators
+
+Usage:
+    python3 presentation_generator.py serve --port 8000 --workers 4 --queue-depth 16
+
+Endpoints:
+    GET  /health     -> JSON with pool size, busy workers and queued requests
+    POST /generate   -> body {"topic": "..."} or {"outline": {...}, "topic": "..."},
+                        streams the .pptx back with chunked transfer encoding
+
+Generators stream-write layouts-format decks, so each slide is sent as soon as
+it is rendered. With the build cache on, a deck that is not cached yet is built
+in memory first, so it can be stored, and then sent.
+"""
+
+import argparse
+import io
+import json
+import os
+import queue
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class Backpressure(Exception):
+    """Raised when the request queue is full"""
+
+
+class GeneratorPool:
+    """Fixed set of warm generators with a bounded admission queue
+
+    At most `workers` requests are processed at once; up to `queue_depth` more may
+    wait for a free generator. Anything beyond that is rejected immediately so the
+    caller can answer 429 instead of letting latency pile up.
+    """
+
+    def __init__(self, template_path: str, api_key: str = None, workers: int = 4,
+                 queue_depth: int = 16, response_cache=None, save_responses: bool = True,
+                 scheduler=None, assets=None, build_cache=None):
+        from presentation_generator import PresentationGenerator
+
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._busy = 0
+        self.completed = 0
+        self.rejected = 0
+
+        for _ in range(workers):
+            generator = PresentationGenerator(template_path, api_key, response_cache)
+            generator.save_responses = save_responses
+            generator.scheduler = scheduler
+            generator.assets = assets
+            generator.build_cache = build_cache
+            generator.stream_write = True
+            generator.warm_up()
+            self._idle.put(generator)
+
+    def acquire(self):
+        """Take a warm generator, waiting in the queue if all are busy"""
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_depth:
+                self.rejected += 1
+                raise Backpressure()
+            self._admitted += 1
+        generator = self._idle.get()
+        with self._lock:
+            self._busy += 1
+        return generator
+
+    def release(self, generator):
+        """Return a generator to the pool"""
+        with self._lock:
+            self._busy -= 1
+            self._admitted -= 1
+            self.completed += 1
+        self._idle.put(generator)
+
+    def stats(self) -> Dict:
+        """Snapshot of pool utilisation for the health endpoint"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queued": self._admitted - self._busy,
+                "queue_depth": self.queue_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+def build_deck(generator, request: Dict, output=None):
+    """Generate (or take) the outline for a request and render it into `output` (bytes without one)"""
+    outline = request.get("outline")
+    if outline is None:
+        outline = generator.generate_outline(request["topic"], fallback_to_mock=False)
+
+    return generator.create_presentation(outline, output)
+
+
+class ChunkedDeckResponse(io.RawIOBase):
+    """Writable stream that sends a 200 .pptx response with chunked transfer encoding
+
+    The status line and headers go out with the first chunk, so a build that
+    fails before writing anything can still be answered with an error.
+    """
+
+    def __init__(self, handler: BaseHTTPRequestHandler, filename: str):
+        super().__init__()
+        self._handler = handler
+        self._filename = filename
+        self._buffer = bytearray()
+        self.started = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= STREAM_CHUNK_SIZE:
+            self._send(self._buffer[:STREAM_CHUNK_SIZE])
+            del self._buffer[:STREAM_CHUNK_SIZE]
+        return len(data)
+
+    def _send(self, chunk):
+        handler = self._handler
+        if not self.started:
+            handler.send_response(200)
+            handler.send_header("Content-Type", PPTX_CONTENT_TYPE)
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.send_header("Content-Disposition", f'attachment; filename="{self._filename}"')
+            handler.end_headers()
+            self.started = True
+        if chunk:
+            handler.wfile.write(b"%x\r\n" % len(chunk) + bytes(chunk) + b"\r\n")
+
+    def finish(self):
+        """Send what is buffered and the terminating chunk"""
+        self._send(self._buffer)
+        self._buffer.clear()
+        self._handler.wfile.write(b"0\r\n\r\n")
+
+
+class GeneratorRequestHandler(BaseHTTPRequestHandler):
+    """Routes /health and /generate onto the server's generator pool"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, dict(status="ok", **self.server.pool.stats()))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send_json(400, {"error": f"invalid JSON body: {e}"})
+            return
+        if not isinstance(request, dict) or not (
+                isinstance(request.get("outline"), dict) or request.get("topic")):
+            self._send_json(400, {"error": "request needs a 'topic' or an 'outline' object"})
+            return
+
+        pool = self.server.pool
+        try:
+            generator = pool.acquire()
+        except Backpressure:
+            self._send_json(429, {"error": "server busy, retry later"}, {"Retry-After": "1"})
+            return
+
+        from presentation_generator import safe_topic_name
+        filename = f"{safe_topic_name(request.get('topic') or 'presentation')}.pptx"
+        response = ChunkedDeckResponse(self, filename)
+        try:
+            build_deck(generator, request, response)
+            response.finish()
+        except Exception as e:
+            if not response.started:
+                self._send_json(502, {"error": f"{type(e).__name__}: {e}"})
+            else:
+                # Too late for an error status: drop the connection so the client sees a cut-off body
+                print(f"❌ Build failed after the response started: {type(e).__name__}: {e}")
+                self.close_connection = True
+        finally:
+            pool.release(generator)
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+class GeneratorServer(ThreadingHTTPServer):
+    """Threading HTTP server that owns a GeneratorPool"""
+
+    daemon_threads = True
+
+    def __init__(self, address, pool: GeneratorPool):
+        super().__init__(address, GeneratorRequestHandler)
+        self.pool = pool
+
+
+def main(argv=None):
+    from presentation_generator import (add_asset_arguments, add_response_cache_arguments,
+                                        add_scheduler_arguments, assets_from_args,
+                                        build_cache_from_args, response_cache_from_args,
+                                        scheduler_from_args)
+
+    parser = argparse.ArgumentParser(
+        prog="presentation_generator.py serve",
+        description="Serve presentation generation over HTTP with a warm generator pool"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument(
+        "-t", "--template",
+        default="input/branding.pptx",
+        help="Path to the branded template (default: input/branding.pptx)"
+    )
+    parser.add_argument(
+        "-k", "--api-key",
+        help="Google Gemini API key (or set GEMINI_API_KEY environment variable)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Number of pre-warmed generators, i.e. concurrent builds (default: 4)"
+    )
+    parser.add_argument(
+        "--queue-depth", type=int, default=16,
+        help="Requests allowed to wait for a free generator before 429 (default: 16)"
+    )
+    parser.add_argument(
+        "--no-save-response", action="store_true",
+        help="Do not write raw GenAI responses to output/<topic>_response.json"
+    )
+    add_response_cache_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_asset_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.template):
+        print(f"❌ Error: Template file '{args.template}' not found")
+        sys.exit(1)
+
+    print(f"🔥 Warming {args.workers} generators...")
+    pool = GeneratorPool(args.template, args.api_key, args.workers, args.queue_depth,
+                         response_cache_from_args(args), not args.no_save_response,
+                         scheduler_from_args(args), assets_from_args(args),
+                         build_cache_from_args(args))
+    server = GeneratorServer((args.host, args.port), pool)
+    print(f"🚀 Serving on http://{args.host}:{server.server_address[1]} "
+          f"(workers={args.workers}, queue depth={args.queue_depth})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Slim output decks before saving
+
+A deck built from a template inherits every layout of it, together with the
+media those layouts reference, whether or not any slide uses them. The slimming
+pass drops layouts (and masters) no slide is based on and points duplicate media
+parts at a single copy. python-pptx only writes parts reachable through
+relationships, so parts orphaned this way are left out of the saved file.
+"""
+
+import hashlib
+from typing import Dict
+
+
+def _part_bytes(parts) -> int:
+    return sum(len(part.blob) for part in parts)
+
+
+def prune_layouts(prs) -> Dict[str, int]:
+    """Remove layouts no slide uses, then masters left without used layouts
+
+    Each master keeps at least one layout, and the first master is always kept,
+    so the package stays valid. Returns the number of layouts and masters removed.
+    """
+    used = {slide.part.slide_layout.part for slide in prs.slides}
+    removed = {"layouts": 0, "masters": 0}
+    if not used:
+        return removed
+
+    masters_lst = prs.slide_masters._sldMasterIdLst
+    for master_position, master in enumerate(list(prs.slide_masters)):
+        layouts = master.slide_layouts
+        layout_ids = layouts._sldLayoutIdLst.sldLayoutId_lst
+        unused = [(layout, layout_id) for layout, layout_id in zip(list(layouts), layout_ids)
+                  if layout.part not in used]
+
+        if len(unused) == len(layout_ids) and master_position > 0:
+            master_id = masters_lst.sldMasterId_lst[master_position - removed["masters"]]
+            masters_lst.remove(master_id)
+            prs.part.drop_rel(master_id.rId)
+            removed["masters"] += 1
+            removed["layouts"] += len(unused)
+            continue
+        if len(unused) == len(layout_ids):
+            unused = unused[1:]
+
+        for _, layout_id in unused:
+            layouts._sldLayoutIdLst.remove(layout_id)
+            master.part.drop_rel(layout_id.rId)
+            removed["layouts"] += 1
+    return removed
+
+
+def dedupe_media(prs) -> int:
+    """Point every relationship to a duplicate media part at one canonical copy
+
+    Media parts (images, video, audio) are compared by SHA-256 of their blob.
+    Returns the number of duplicate parts no longer referenced.
+    """
+    canonical = {}
+    duplicates = {}
+    package = prs.part.package
+    for part in package.iter_parts():
+        if not str(part.partname).startswith("/ppt/media/"):
+            continue
+        digest = hashlib.sha256(part.blob).hexdigest()
+        if digest in canonical:
+            duplicates[part] = canonical[digest]
+        else:
+            canonical[digest] = part
+    if not duplicates:
+        return 0
+
+    from pptx.opc.package import _Relationship
+
+    for part in list(package.iter_parts()):
+        for rId, rel in list(part.rels.items()):
+            if not rel.is_external and rel.target_part in duplicates:
+                # target_part is cached on the relationship, so replace it outright
+                part.rels._rels[rId] = _Relationship(
+                    rel._base_uri, rId, rel.reltype, rel._target_mode, duplicates[rel.target_part]
+                )
+    return len(duplicates)
+
+
+def slim_presentation(prs) -> Dict[str, int]:
+    """Prune unused layouts/masters and dedupe media in place, returning a report
+
+    `bytes_saved` is the uncompressed size of the parts that will no longer be
+    written.
+    """
+    package = prs.part.package
+    before = set(package.iter_parts())
+
+    report = prune_layouts(prs)
+    report["duplicate_media"] = dedupe_media(prs)
+
+    after = set(package.iter_parts())
+    dropped = before - after
+    report["parts_dropped"] = len(dropped)
+    report["bytes_saved"] = _part_bytes(dropped)
+    return report
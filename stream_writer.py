@@ -0,0 +1,165 @@
+"""
+Bounded-memory writer for very large decks
+
+python-pptx keeps every slide's XML tree in memory until prs.save. The
+streaming writer instead opens the output zip up front and writes each slide
+part (with its .rels and any new XML parts it references) as soon as the slide
+is rendered. The presentation's relationship to the slide is then pointed at a
+small stand-in that only remembers the part name, so the slide's tree can be
+freed while presentation.xml keeps its slide list. The template parts,
+presentation.xml and its relationships, media, and [Content_Types].xml are
+written when the writer is closed.
+
+Slides are added through the writer rather than prs.slides.add_slide, which
+scans every existing slide relationship and slide id per call and so turns
+quadratic in the thousands of slides.
+
+A path output is written to a temporary file beside it and moved into place
+on close, so a build that fails part way leaves the previous deck intact.
+
+Media parts (images) stay in memory until close so identical images are still
+stored once. Template parts are written on close through package_writer, so
+their compressed bytes are copied from the template file where they match.
+"""
+
+import os
+import uuid
+import zipfile
+from typing import Dict, Set
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import Part, XmlPart, _Relationship
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.parts.slide import SlidePart
+
+from package_writer import DEFAULT_COMPRESSION_LEVEL, PartEncoder, append_entry, encode_entry
+
+
+class _WrittenPart(Part):
+    """Stand-in for a part whose bytes are already in the zip
+
+    Keeps only the part name, content type and the relationships that keep
+    other new parts reachable: media still in memory and stand-ins of parts
+    written along with it.
+    """
+
+    def __init__(self, partname, content_type: str, rels: Dict[str, _Relationship]):
+        super().__init__(partname, content_type, None)
+        self._kept_rels = rels
+
+    @property
+    def rels(self):
+        return self._kept_rels
+
+
+class StreamingDeckWriter:
+    """Write slides of `prs` into `output` (a path or binary stream) one at a time
+
+    Add slides with add_slide(), call write_slide() once each is complete (it
+    must not be touched afterwards), and close() to finish the package. level is
+    the zlib compression level of new parts (0 stores them).
+    """
+
+    def __init__(self, prs, output, level: int = DEFAULT_COMPRESSION_LEVEL):
+        self.prs = prs
+        self.level = level
+        self._output = output
+        self._tmp_path = None
+        if isinstance(output, str):
+            # Created by ZipFile with a plain open(), so it gets the same mode as a regular save
+            self._tmp_path = os.path.join(os.path.dirname(os.path.abspath(output)),
+                                          f".{os.path.basename(output)}.{uuid.uuid4().hex[:8]}.partial")
+        self._zip = zipfile.ZipFile(self._tmp_path or output, 'w', compression=zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED,
+                                    compresslevel=level or None, strict_timestamps=False)
+        # Everything reachable now is template content and is written on close
+        self._template_parts: Set = set(prs.part.package.iter_parts())
+        # Stand-ins by part name, so a part shared by several slides is written once
+        self._written: Dict[str, _WrittenPart] = {}
+        self._sld_id_lst = prs.slides._sldIdLst
+        self._slide_count = len(self._sld_id_lst)
+        self._next_slide_id = max([255] + [int(sld_id.id) for sld_id in self._sld_id_lst]) + 1
+        self.slides_written = 0
+        self.bytes_written = 0
+
+    def add_slide(self, slide_layout):
+        """prs.slides.add_slide(slide_layout) in constant time"""
+        self._slide_count += 1
+        partname = PackURI(f"/ppt/slides/slide{self._slide_count}.xml")
+        slide_part = SlidePart.new(partname, self.prs.part.package, slide_layout.part)
+        rId = self.prs.part.rels._add_relationship(RT.SLIDE, slide_part)
+        self._sld_id_lst._add_sldId(id=self._next_slide_id, rId=rId)
+        self._next_slide_id += 1
+        slide = slide_part.slide
+        slide.shapes.clone_layout_placeholders(slide_layout)
+        return slide
+
+    def _write(self, partname, blob: bytes):
+        self._zip.writestr(partname.membername, blob)
+        self.bytes_written += len(blob)
+
+    def _flush_part(self, part) -> _WrittenPart:
+        """Write an XML part and the new XML parts below it, returning its stand-in"""
+        written = self._written.get(part.partname)
+        if written is not None:
+            return written
+        self._write(part.partname, part.blob)
+        if part._rels:
+            self._write(part.partname.rels_uri, part.rels.xml)
+
+        kept = {}
+        for rId, rel in part.rels.items():
+            target = None if rel.is_external else rel.target_part
+            if target is None or target in self._template_parts:
+                continue  # template parts stay reachable through the presentation part
+            if not isinstance(target, XmlPart):
+                kept[rId] = rel
+            else:
+                stand_in = self._flush_part(target)
+                kept[rId] = _Relationship(rel._base_uri, rId, rel.reltype, rel._target_mode, stand_in)
+        written = _WrittenPart(part.partname, part.content_type, kept)
+        if not isinstance(part, SlidePart):
+            self._written[part.partname] = written
+        return written
+
+    def write_slide(self, slide):
+        """Write a finished slide to the zip and release its XML"""
+        part = slide.part
+        rels = self.prs.part.rels
+        rId = self._sld_id_lst[-1].rId  # normally the slide just added
+        if rels[rId].target_part is not part:
+            rId = next(rId for rId, rel in rels.items() if not rel.is_external and rel.target_part is part)
+        rel = rels[rId]
+        stand_in = self._flush_part(part)
+        rels._rels[rId] = _Relationship(rel._base_uri, rId, rel.reltype, rel._target_mode, stand_in)
+        self.slides_written += 1
+
+    def abort(self):
+        """Close the zip after a failed build and drop it; a path output keeps its previous deck"""
+        self._zip.close()
+        if self._tmp_path is not None:
+            try:
+                os.remove(self._tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Write the remaining parts, the package relationships and content types"""
+        package = self.prs.part.package
+        parts = tuple(package.iter_parts())
+        try:
+            encoder = PartEncoder(package, self.level, self._tmp_path or self._output)
+            try:
+                encoder.write_parts(self._zip, [part for part in parts if not isinstance(part, _WrittenPart)])
+            finally:
+                encoder.close()
+            append_entry(self._zip, encode_entry(PACKAGE_URI.rels_uri.membername, package._rels.xml, self.level))
+            append_entry(self._zip, encode_entry(CONTENT_TYPES_URI.membername,
+                                                 serialize_part_xml(_ContentTypesItem.xml_for(parts)), self.level))
+            self._zip.close()
+        except BaseException:
+            self.abort()
+            raise
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, self._output)
@@ -0,0 +1,144 @@
+"""
+Process-wide cache of parsed PowerPoint templates
+
+Parsing a template (unzip + lxml parse of every master, layout and theme) is the
+most expensive fixed cost of a build. The cache parses each template once per
+process, keeps the parsed package as a pristine copy that is never handed out,
+and gives every build its own clone: XML parts are deep-copied lxml trees and
+binary parts (media, thumbnails) share their immutable blobs.
+"""
+
+import copy
+import hashlib
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+# python-pptx is imported inside the functions that need it so that importing
+# this module (and the generator CLI) stays cheap until a deck is built.
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_lazyproperty(cls, name: str, lazyproperty) -> bool:
+    """Check whether `name` is a python-pptx lazyproperty cached in an instance dict"""
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return isinstance(klass.__dict__[name], lazyproperty)
+    return False
+
+
+def clone_package(package):
+    """Return an independent copy of a loaded package
+
+    Lazily computed attributes are dropped so the clone recomputes them against its
+    own parts instead of pointing back into the source package.
+    """
+    from pptx.opc.package import XmlPart, _Relationship
+    from pptx.package import Package
+    from pptx.util import lazyproperty
+
+    clone = Package(package._pkg_file)
+    part_map = {}
+
+    for part in package.iter_parts():
+        part_cls = type(part)
+        new_part = part_cls.__new__(part_cls)
+        for name, value in part.__dict__.items():
+            if not _is_lazyproperty(part_cls, name, lazyproperty):
+                new_part.__dict__[name] = value
+        new_part._package = clone
+        if isinstance(part, XmlPart):
+            new_part._element = copy.deepcopy(part._element)
+        part_map[part] = new_part
+
+    def copy_rels(source_rels, target_rels):
+        for rId, rel in source_rels.items():
+            target = rel._target if rel.is_external else part_map[rel.target_part]
+            target_rels._rels[rId] = _Relationship(
+                rel._base_uri, rId, rel.reltype, rel._target_mode, target
+            )
+
+    copy_rels(package._rels, clone._rels)
+    for part, new_part in part_map.items():
+        copy_rels(part.rels, new_part.rels)
+
+    return clone
+
+
+class _TemplateEntry:
+    """Pristine parsed template plus the file fingerprint it was parsed from"""
+
+    def __init__(self, package, stat_key: Tuple[int, int], sha256: str):
+        self.package = package
+        self.stat_key = stat_key
+        self.sha256 = sha256
+
+
+class TemplateCache:
+    """Parse each template once per process and hand out cheap per-build clones
+
+    An entry is revalidated on every access with a `stat()`. When the mtime or size
+    changed the file is re-hashed, and the template is only re-parsed if its content
+    hash actually differs (a `touch` keeps the warm copy).
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _TemplateEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template_path: str):
+        """Return a fresh, independently editable Presentation for the template"""
+        key = os.path.abspath(template_path)
+        stat = os.stat(key)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stat_key != stat_key:
+                sha256 = file_sha256(key)
+                if sha256 == entry.sha256:
+                    entry.stat_key = stat_key
+                else:
+                    entry = None
+
+            if entry is None:
+                from pptx import Presentation
+
+                self.misses += 1
+                sha256 = file_sha256(key)
+                prs = Presentation(key)
+                entry = _TemplateEntry(prs.part.package, stat_key, sha256)
+                self._entries[key] = entry
+            else:
+                self.hits += 1
+
+            package = clone_package(entry.package)
+
+        return package.main_document_part.presentation
+
+    def fingerprint(self, template_path: str) -> Optional[str]:
+        """Return the content hash of a cached template, or None if not cached"""
+        entry = self._entries.get(os.path.abspath(template_path))
+        return entry.sha256 if entry else None
+
+    def invalidate(self, template_path: str = None):
+        """Drop one template (or all templates) from the cache"""
+        with self._lock:
+            if template_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(template_path), None)
+
+
+# Shared by every PresentationGenerator in the process
+template_cache = TemplateCache()
@@ -0,0 +1,205 @@
+"""
+Registry of layout catalogues derived from the templates themselves
+
+A catalogue lists a template's layouts in slide_layouts.json form: id, name and
+each placeholder's idx, name, type and geometry (EMU). Instead of maintaining
+that file by hand per template, the registry introspects the .pptx once per
+content hash and merges hand-written overrides on top (descriptions, max_chars,
+friendlier placeholder names). Overrides are looked up next to the template as
+<template>.layouts.json, then slide_layouts.json, unless a file is given.
+
+Derived catalogues are kept on disk under .cache/templates/<sha256>.json so
+other processes skip the parse, and resolved catalogues are kept in process per
+(template, overrides) path, revalidated with a stat() like template_cache.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from template_cache import file_sha256, template_cache
+
+CATALOGUE_VERSION = 1
+DEFAULT_CACHE_DIR = ".cache/templates"
+GEOMETRY_KEYS = ("left", "top", "width", "height")
+
+
+def introspect_template(template_path: str) -> Dict:
+    """Read the layout catalogue of a template with python-pptx"""
+    prs = template_cache.get(template_path)
+    layouts = []
+    for layout_id, layout in enumerate(prs.slide_layouts):
+        placeholders = []
+        for shape in layout.placeholders:
+            placeholders.append({
+                "idx": shape.placeholder_format.idx,
+                "name": shape.name,
+                "type": str(shape.placeholder_format.type),
+                "left": shape.left,
+                "top": shape.top,
+                "width": shape.width,
+                "height": shape.height,
+            })
+        layouts.append({"id": layout_id, "name": layout.name, "placeholders": placeholders})
+    return {
+        "version": CATALOGUE_VERSION,
+        "slide_width": prs.slide_width,
+        "slide_height": prs.slide_height,
+        "layouts": layouts,
+    }
+
+
+def without_geometry(layout: Dict) -> Dict:
+    """A catalogue layout with placeholder geometry stripped, for prompts"""
+    return dict(layout, placeholders=[
+        {k: v for k, v in placeholder.items() if k not in GEOMETRY_KEYS}
+        for placeholder in layout["placeholders"]
+    ])
+
+
+def default_overrides_path(template_path: str) -> Optional[str]:
+    """<template>.layouts.json next to the template, else slide_layouts.json there"""
+    stem, _ = os.path.splitext(template_path)
+    for candidate in (f"{stem}.layouts.json",
+                      os.path.join(os.path.dirname(template_path), "slide_layouts.json")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def merge_overrides(layouts: List[Dict], overrides: List[Dict]) -> List[Dict]:
+    """Apply hand-written layout entries to derived ones
+
+    Override layouts match by name (or by id when they have no name) and their
+    placeholders by idx; every other key in an override wins. Overrides naming
+    layouts or placeholders the template does not have are ignored.
+    """
+    by_name = {layout["name"]: layout for layout in overrides if "name" in layout}
+    by_id = {layout["id"]: layout for layout in overrides if "name" not in layout and "id" in layout}
+    merged = []
+    for layout in layouts:
+        override = by_name.get(layout["name"]) or by_id.get(layout["id"])
+        if override is None:
+            merged.append(layout)
+            continue
+        placeholder_overrides = {p["idx"]: p for p in override.get("placeholders", [])}
+        entry = dict(layout, **{k: v for k, v in override.items() if k not in ("id", "placeholders")})
+        entry["placeholders"] = [dict(p, **placeholder_overrides.get(p["idx"], {}))
+                                 for p in layout["placeholders"]]
+        merged.append(entry)
+
+    known = {layout["name"] for layout in layouts}
+    for name in by_name:
+        if name not in known:
+            print(f"⚠️  Warning: Layout override '{name}' does not match any template layout")
+    return merged
+
+
+class Catalogue:
+    """Merged layout catalogue for one template and overrides file"""
+
+    __slots__ = ("template_path", "overrides_path", "template_sha256", "key", "layouts",
+                 "slide_width", "slide_height")
+
+    def __init__(self, template_path: str, overrides_path: Optional[str], template_sha256: str,
+                 key: str, layouts: List[Dict], slide_width: int, slide_height: int):
+        self.template_path = template_path
+        self.overrides_path = overrides_path
+        self.template_sha256 = template_sha256
+        self.key = key  # content hash of template + overrides
+        self.layouts = layouts
+        self.slide_width = slide_width
+        self.slide_height = slide_height
+
+
+def _stat_key(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    if path is None:
+        return None
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TemplateRegistry:
+    """Resolve the catalogue of any template, introspecting each template once
+
+    cache_dir=None keeps derived catalogues in memory only.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._resolved: Dict[Tuple[str, Optional[str]], Tuple[tuple, Catalogue]] = {}
+        self._derived: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.introspections = 0
+
+    def resolve(self, template_path: str, overrides_path: str = None) -> Catalogue:
+        """Catalogue for a template, merged with its overrides file"""
+        template_path = os.path.abspath(template_path)
+        if overrides_path is None:
+            overrides_path = default_overrides_path(template_path)
+        if overrides_path is not None:
+            overrides_path = os.path.abspath(overrides_path)
+        key = (template_path, overrides_path)
+        stats = (_stat_key(template_path), _stat_key(overrides_path))
+
+        with self._lock:
+            cached = self._resolved.get(key)
+            if cached is not None and cached[0] == stats:
+                return cached[1]
+            catalogue = self._build(template_path, overrides_path)
+            self._resolved[key] = (stats, catalogue)
+            return catalogue
+
+    def _build(self, template_path: str, overrides_path: Optional[str]) -> Catalogue:
+        template_sha256 = file_sha256(template_path)
+        derived = self._derived_catalogue(template_path, template_sha256)
+        digest = hashlib.sha256(template_sha256.encode("ascii"))
+        layouts = derived["layouts"]
+        if overrides_path is not None:
+            with open(overrides_path, 'rb') as f:
+                raw = f.read()
+            digest.update(raw)
+            layouts = merge_overrides(layouts, json.loads(raw).get("layouts", []))
+        return Catalogue(template_path, overrides_path, template_sha256, digest.hexdigest(),
+                         layouts, derived["slide_width"], derived["slide_height"])
+
+    def _derived_catalogue(self, template_path: str, template_sha256: str) -> Dict:
+        """Derived catalogue by content hash: memory, then disk, then introspection"""
+        derived = self._derived.get(template_sha256)
+        if derived is not None:
+            return derived
+
+        cache_file = os.path.join(self.cache_dir, f"{template_sha256}.json") if self.cache_dir else None
+        if cache_file is not None:
+            try:
+                with open(cache_file, 'r') as f:
+                    derived = json.load(f)
+                if derived.get("version") != CATALOGUE_VERSION:
+                    derived = None
+            except (OSError, ValueError):
+                derived = None
+
+        if derived is None:
+            self.introspections += 1
+            derived = introspect_template(template_path)
+            if cache_file is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(derived, f)
+                os.replace(tmp_path, cache_file)
+
+        self._derived[template_sha256] = derived
+        return derived
+
+    def invalidate(self):
+        """Forget every resolved and derived catalogue held in memory"""
+        with self._lock:
+            self._resolved.clear()
+            self._derived.clear()
+
+
+# Shared by every PresentationGenerator in the process
+template_registry = TemplateRegistry()
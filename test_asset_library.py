@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test filling picture placeholders from a local asset library
+"""
+
+import io
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+from PIL import Image as PILImage
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from asset_library import AssetLibrary, keywords  # noqa: E402
+from presentation_generator import PresentationGenerator  # noqa: E402
+from synthetic import make_layouts_outline  # noqa: E402
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+@pytest.fixture
+def assets(tmp_path):
+    directory = tmp_path / "assets"
+    (directory / "cloud").mkdir(parents=True)
+    PILImage.new("RGB", (1200, 800), (30, 90, 200)).save(directory / "cloud" / "servers.jpg")
+    PILImage.new("RGB", (600, 900), (200, 60, 30)).save(directory / "team_meeting.jpg")
+    PILImage.new("RGBA", (400, 400), (0, 0, 0, 0)).save(directory / "logo.png")
+    (directory / "keywords.json").write_text(json.dumps({"team_meeting.jpg": ["workshop"]}))
+    return directory
+
+
+def test_index_selects_by_keywords_and_is_reused(assets, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    library = AssetLibrary(str(assets), cache_dir)
+    assert library.index_hashed == 3
+    assert library.select(keywords("Our new cloud servers")).path.endswith("servers.jpg")
+    assert library.select(keywords(["Workshop"])).path.endswith("team_meeting.jpg")
+    assert library.select(keywords("quarterly revenue")) is None
+
+    # A second library over the same directory only re-hashes what changed
+    PILImage.new("RGB", (10, 10)).save(assets / "logo.png")
+    again = AssetLibrary(str(assets), cache_dir)
+    assert again.index_hashed == 1
+    assert again.signature != library.signature
+
+
+def test_renditions_match_the_box_and_never_upscale(assets, tmp_path):
+    library = AssetLibrary(str(assets), str(tmp_path / "cache"))
+    servers = library.select({"server"})
+    # A 4:3 box of 4 x 3 inches is 600 x 450 px at 150 DPI
+    image = library.rendition(servers, 4 * 914400, 3 * 914400).result()
+    assert image.size == (600, 450) and image.content_type == "image/jpeg"
+    assert library.rendition(servers, 4 * 914400, 3 * 914400).result() is image
+
+    # The 600 x 900 source is too small for a 10 x 5 inch box, so only the crop is applied
+    portrait = library.rendition(library.select({"team"}), 10 * 914400, 5 * 914400).result()
+    assert portrait.size == (600, 300)
+    transparent = library.rendition(library.select({"logo"}), 914400, 914400).result()
+    assert transparent.content_type == "image/png"
+
+    # Renditions are served from disk by a fresh library without decoding again
+    fresh = AssetLibrary(str(assets), str(tmp_path / "cache"))
+    assert fresh.rendition(fresh.select({"server"}), 4 * 914400, 3 * 914400).result().sha1 == image.sha1
+    assert fresh.renditions_made == 0
+
+
+@pytest.mark.parametrize("stream_write", [False, True])
+def test_picture_placeholders_share_one_media_part(assets, tmp_path, monkeypatch, stream_write):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.assets = AssetLibrary(str(assets), str(tmp_path / "cache"))
+    generator.stream_write = stream_write
+
+    # executive_summary_with_one_image three times with the same image, then one by placeholder keywords
+    layouts = [make_layouts_outline(3)["layouts"][2] for _ in range(4)]
+    for layout in layouts[:3]:
+        layout["image_keywords"] = "cloud servers"
+    layouts[3]["placeholders"][0]["keywords"] = ["workshop"]
+    deck = generator.create_presentation({"layouts": layouts})
+
+    prs = Presentation(io.BytesIO(deck))
+    pictures = [shape for slide in prs.slides for shape in slide.placeholders
+                if shape.placeholder_format.idx == 16]
+    assert [picture.image.sha1 for picture in pictures[:3]] == [pictures[0].image.sha1] * 3
+    assert pictures[3].image.sha1 != pictures[0].image.sha1
+    media = [name for name in zipfile.ZipFile(io.BytesIO(deck)).namelist() if name.endswith(".jpg")]
+    assert len(media) == 2
+    assert generator._metrics.counters["images_placed"] == 4
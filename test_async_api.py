@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio API against a local fake async client
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from metrics import BuildMetrics  # noqa: E402
+from presentation_generator import PresentationGenerator  # noqa: E402
+from prompt_compiler import json_generation_config  # noqa: E402
+from scheduler import DeadlineExceeded, RequestScheduler  # noqa: E402
+from synthetic import make_layouts_outline  # noqa: E402
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+OUTLINE = {"layouts": [{"id": 4, "placeholders": [{"idx": 0, "content": "Async"}]}]}
+
+
+class FakeAsyncClient:
+    """Replies after `latency` seconds, failing the first `failures` calls with a 429"""
+
+    def __init__(self, latency=0.0, failures=0):
+        self.latency = latency
+        self.failures = failures
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.cancelled = 0
+        self.configs = []
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        self.configs.append(kwargs.get("generation_config"))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        if self.calls <= self.failures:
+            raise RuntimeError("429 Resource has been exhausted")
+        return SimpleNamespace(text=json.dumps(OUTLINE))
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.save_responses = False
+    return generator
+
+
+def test_hundreds_of_outlines_in_flight_without_threads(generator):
+    generator.async_client = FakeAsyncClient(latency=0.2)
+    generator.scheduler = RequestScheduler()
+
+    async def run():
+        threads = threading.active_count()
+        tasks = [asyncio.ensure_future(generator.generate_outline_async(f"Topic {n}", fallback_to_mock=False))
+                 for n in range(300)]
+        await asyncio.sleep(0.1)
+        assert threading.active_count() == threads
+        return await asyncio.gather(*tasks)
+
+    started = time.perf_counter()
+    outlines = asyncio.run(run())
+    assert outlines == [OUTLINE] * 300
+    assert generator.async_client.peak_in_flight == 300
+    assert time.perf_counter() - started < 2.0
+
+
+def test_retries_and_deadlines(generator):
+    generator.async_client = FakeAsyncClient(failures=2)
+    generator.scheduler = RequestScheduler(base_delay=0.01, max_delay=0.02)
+    assert asyncio.run(generator.generate_outline_async("Retried", fallback_to_mock=False)) == OUTLINE
+    assert generator.scheduler.retries == 2
+
+    for scheduler in (None, RequestScheduler()):
+        generator.scheduler = scheduler
+        generator.async_client = FakeAsyncClient(latency=5)
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(generator.generate_outline_async("Slow", fallback_to_mock=False, timeout=0.1))
+        assert time.perf_counter() - started < 1.0
+        assert generator.async_client.cancelled == 1
+
+
+def test_a_request_can_override_the_generation_config(generator):
+    generator.async_client = FakeAsyncClient()
+    generator.generation_config = json_generation_config()
+    override = json_generation_config({"type": "object"})
+
+    async def run():
+        await generator._request_json_async("Override", BuildMetrics(), generation_config=override)
+        await generator._request_json_async("Default", BuildMetrics())
+
+    asyncio.run(run())
+    assert generator.async_client.configs == [override, generator.generation_config]
+
+
+def test_cancelling_an_outline_cancels_the_request(generator):
+    generator.async_client = FakeAsyncClient(latency=5)
+
+    async def run():
+        task = asyncio.ensure_future(generator.generate_outline_async("Cancelled"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert generator.async_client.cancelled == 1
+
+
+def test_builds_run_off_the_loop_one_at_a_time(generator, tmp_path):
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        beating = asyncio.ensure_future(heartbeat())
+        decks = await asyncio.gather(
+            generator.create_presentation_async(make_layouts_outline(40)),
+            generator.create_presentation_async(OUTLINE, str(tmp_path / "deck.pptx")),
+        )
+        beating.cancel()
+        return decks, ticks
+
+    (deck, _), ticks = asyncio.run(run())
+    assert ticks > 10
+    assert len(Presentation(io.BytesIO(deck)).slides) == 40
+    assert len(Presentation(str(tmp_path / "deck.pptx")).slides) == 1
+    assert os.listdir(tmp_path) == ["deck.pptx"]
+
+
+def test_cancelled_or_late_build_leaves_no_file(generator, tmp_path):
+    outline = make_layouts_outline(2000)
+    output = str(tmp_path / "deck.pptx")
+
+    async def cancel_build():
+        task = asyncio.ensure_future(generator.create_presentation_async(outline, output))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The next build waits for the abandoned one to stop, then succeeds
+        await generator.create_presentation_async(OUTLINE, output)
+
+    asyncio.run(cancel_build())
+    assert len(Presentation(output).slides) == 1
+    assert generator._metrics.counters["slides"] == 1
+
+    async def late_build():
+        with pytest.raises(DeadlineExceeded):
+            await generator.create_presentation_async(outline, str(tmp_path / "late.pptx"), timeout=0.2)
+        # Queued behind the abandoned build, which stops and removes its partial file
+        await generator.create_presentation_async(OUTLINE)
+
+    asyncio.run(late_build())
+    assert os.listdir(tmp_path) == ["deck.pptx"]
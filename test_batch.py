@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test batch mode offline with a stub GenAI client
+"""
+
+import json
+import os
+import threading
+import time
+
+from batch import load_topics, run_batch
+from presentation_generator import PresentationGenerator
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubClient:
+    """Answers every prompt after a fixed delay; fails for topics containing 'boom'"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if "boom" in prompt:
+                raise RuntimeError("429 quota exceeded")
+            outline = {"layouts": [{"id": 4, "name": "key_message_02_white_background",
+                                    "placeholders": [{"idx": 0, "type": "TITLE (1)",
+                                                      "content": "Stub message"}]}]}
+            return StubResponse("```json\n" + json.dumps(outline) + "\n```")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_load_topics_txt_and_jsonl(tmp_path):
+    txt = tmp_path / "topics.txt"
+    txt.write_text("Cloud Computing\n\n# skipped\nData Science\n")
+    assert load_topics(str(txt)) == [{"topic": "Cloud Computing"}, {"topic": "Data Science"}]
+
+    jsonl = tmp_path / "topics.jsonl"
+    jsonl.write_text('"Cloud Computing"\n{"topic": "AI", "output": "ai.pptx"}\n')
+    assert load_topics(str(jsonl)) == [{"topic": "Cloud Computing"},
+                                       {"topic": "AI", "output": "ai.pptx"}]
+
+
+def test_batch_overlaps_outline_calls_and_reports_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = StubClient(latency=0.2)
+
+    topics = [{"topic": f"Topic {i}"} for i in range(5)] + [{"topic": "boom"}]
+    started = time.perf_counter()
+    report = run_batch(generator, topics, str(tmp_path / "decks"), concurrency=3)
+    elapsed = time.perf_counter() - started
+
+    assert generator.client.max_in_flight == 3
+    assert elapsed < 6 * 0.2
+    by_topic = {r["topic"]: r for r in report}
+    assert by_topic["boom"]["status"] == "failed"
+    assert "429" in by_topic["boom"]["error"]
+    for i in range(5):
+        result = by_topic[f"Topic {i}"]
+        assert result["status"] == "ok"
+        assert os.path.exists(result["output"])
+
+
+def test_batch_in_mock_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+
+    report = run_batch(generator, [{"topic": "Cloud Computing"}], str(tmp_path), concurrency=2)
+    assert report[0]["status"] == "ok"
+    assert os.path.exists(tmp_path / "cloud_computing.pptx")
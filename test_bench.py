@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Smoke-test the benchmark suite on small synthetic decks
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from run_benchmarks import DEFAULT_TEMPLATE, compare, run_case  # noqa: E402
+from synthetic import load_layout_catalogue, make_layouts_outline  # noqa: E402
+
+
+def test_layouts_outline_covers_every_layout():
+    outline = make_layouts_outline(26)
+    catalogue_ids = {layout["id"] for layout in load_layout_catalogue()}
+    assert {layout["id"] for layout in outline["layouts"]} == catalogue_ids
+
+
+def test_run_case_measures_each_phase():
+    for outline_format, expected_slides in (("layouts", 13), ("slides", 13)):
+        case = run_case(outline_format, 13, DEFAULT_TEMPLATE)
+        assert case["slides"] == expected_slides
+        for phase in ("template_load_cold", "render", "save", "peak_rss_mb"):
+            assert case[phase] > 0
+
+        slower = dict(case, render=case["render"] * 2)
+        assert compare({"cases": [slower]}, {"cases": [case]}, 0.2)
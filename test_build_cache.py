@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test reusing finished decks from the build cache
+"""
+
+import json
+import os
+import stat
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from build_cache import BuildCache  # noqa: E402
+from presentation_generator import PresentationGenerator  # noqa: E402
+from synthetic import make_layouts_outline  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = os.path.join(ROOT, "input/branding.pptx")
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.build_cache = BuildCache(str(tmp_path / "builds"))
+    return generator
+
+
+def test_repeated_build_is_served_from_cache(generator):
+    outline = make_layouts_outline(6)
+    deck = generator.create_presentation(outline)
+    assert generator.build_cache.misses == 1 and generator._metrics.counters["build_cache_hit"] == 0
+
+    assert generator.create_presentation(outline) == deck
+    assert generator.build_cache.hits == 1 and generator._metrics.counters["build_cache_hit"] == 1
+
+    # Any change to the outline or to an option that shapes the deck is a new build
+    changed = make_layouts_outline(6)
+    changed["layouts"][1]["placeholders"][0]["content"] = "Another title"
+    generator.create_presentation(changed)
+    generator.text_fit = False
+    generator.create_presentation(outline)
+    assert generator.build_cache.misses == 3
+
+
+def test_hit_is_a_writable_copy(generator, tmp_path):
+    first, second = str(tmp_path / "first.pptx"), str(tmp_path / "second.pptx")
+    outline = make_layouts_outline(4)
+    generator.create_presentation(outline, first)
+    generator.create_presentation(outline, second)
+    assert generator.build_cache.hits == 1
+    assert os.stat(second).st_nlink == 1
+    assert stat.S_IMODE(os.stat(second).st_mode) == stat.S_IMODE(os.stat(first).st_mode)
+    assert os.access(second, os.W_OK)
+    assert open(second, 'rb').read() == open(first, 'rb').read()
+
+
+def test_hardlinked_output_is_detached_before_a_rebuild(generator, tmp_path):
+    generator.build_cache.link_outputs = True
+    first, second = str(tmp_path / "first.pptx"), str(tmp_path / "second.pptx")
+    outline = make_layouts_outline(4)
+    generator.create_presentation(outline, first)
+    generator.create_presentation(outline, second)
+    assert generator.build_cache.hits == 1
+    assert os.stat(second).st_nlink == 2
+    cached = open(second, 'rb').read()
+
+    # Building something else into the linked path must not touch the cache entry
+    generator.build_cache = None
+    generator.create_presentation(make_layouts_outline(9), second)
+    entries = [os.path.join(tmp_path, "builds", name) for name in os.listdir(tmp_path / "builds")]
+    assert [open(path, 'rb').read() for path in entries] == [cached]
+    assert open(second, 'rb').read() != cached
+
+
+def test_least_recently_used_builds_are_evicted(tmp_path):
+    cache = BuildCache(str(tmp_path), max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, key.encode("ascii"))
+    os.utime(tmp_path / "a.pptx", (1, 1))
+    os.utime(tmp_path / "b.pptx", (2, 2))
+    assert cache.fetch("a") == b"a"
+    cache.put("c", b"c")
+    assert cache.fetch("b") is None
+    assert sorted(os.listdir(tmp_path)) == ["a.pptx", "c.pptx"]
+
+
+def test_cli_hit_does_not_import_pptx(tmp_path):
+    outline_path = tmp_path / "outline.json"
+    outline_path.write_text(json.dumps(make_layouts_outline(3)))
+    script = (
+        "import sys, presentation_generator\n"
+        "sys.argv = ['presentation_generator.py', 'Topic', '--json', sys.argv[1], '-o', sys.argv[2],"
+        " '--build-cache-dir', sys.argv[3]]\n"
+        "presentation_generator.main()\n"
+        "print('pptx loaded' if 'pptx' in sys.modules else 'pptx not loaded')\n"
+    )
+    env = dict(os.environ, GEMINI_API_KEY="unused")
+    runs = [subprocess.run([sys.executable, "-c", script, str(outline_path), str(tmp_path / f"{n}.pptx"),
+                            str(tmp_path / "builds")], cwd=ROOT, env=env, capture_output=True, text=True)
+            for n in range(2)]
+    assert [run.returncode for run in runs] == [0, 0], runs[1].stderr
+    assert runs[0].stdout.rstrip().endswith("pptx loaded")
+    assert "Reusing cached build" in runs[1].stdout
+    assert runs[1].stdout.rstrip().endswith("pptx not loaded")
+    assert open(tmp_path / "0.pptx", 'rb').read() == open(tmp_path / "1.pptx", 'rb').read()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test section fan-out offline with a stub GenAI client that has artificial latency
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from fanout import generate_outline_fanout, validate_skeleton
+from presentation_generator import PresentationGenerator
+from prompt_compiler import json_generation_config
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+SECTIONS = 8
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class SectionClient:
+    """Returns a skeleton, then fills each section; optionally fails one section once"""
+
+    def __init__(self, latency, fail_section=None):
+        self.latency = latency
+        self.fail_section = fail_section
+        self.schemas = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.section_calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None):
+        with self._lock:
+            if generation_config is not None:
+                self.schemas.append(generation_config["response_schema"]["required"])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if "Presentation Skeleton Prompt" in prompt:
+                sections = [{"title": f"Part {n}",
+                             "slides": ["content_02_no_image", "not_a_layout", "key_message_02_white_background"]}
+                            for n in range(SECTIONS)]
+                return StubResponse(json.dumps({"title": "Deck", "sections": sections}))
+
+            title = prompt.split("## Your Section\n")[1].splitlines()[0]
+            with self._lock:
+                self.section_calls += 1
+                if title == self.fail_section:
+                    self.fail_section = None
+                    raise RuntimeError("503 unavailable")
+            assert "onepager_1" not in prompt
+            return StubResponse(json.dumps({"layouts": [
+                {"name": "content_02_no_image", "placeholders": [
+                    {"idx": 0, "type": "TITLE (1)", "content": title}]},
+                {"name": "key_message_02_white_background", "placeholders": [
+                    {"idx": 0, "type": "TITLE (1)", "content": f"{title} message"}]},
+            ]}))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _generator(monkeypatch, client):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = client
+    return generator
+
+
+def test_sections_are_filled_concurrently_and_merged_in_order(monkeypatch):
+    client = SectionClient(latency=0.1)
+    generator = _generator(monkeypatch, client)
+
+    started = time.perf_counter()
+    outline = generate_outline_fanout(generator, "Topic", slide_count=16, concurrency=SECTIONS)
+    elapsed = time.perf_counter() - started
+
+    assert len(outline["layouts"]) == 2 * SECTIONS
+    assert [layout["placeholders"][0]["content"] for layout in outline["layouts"][:3]] == \
+        ["Part 0", "Part 0 message", "Part 1"]
+    assert outline["layouts"][0]["id"] == 7
+    assert client.max_in_flight == SECTIONS
+    # skeleton + one round of sections, far below the serial 1 + SECTIONS calls
+    assert elapsed < 0.1 * 4
+
+
+def test_concurrency_is_bounded_and_failed_sections_retried(monkeypatch):
+    client = SectionClient(latency=0.02, fail_section="Part 3")
+    generator = _generator(monkeypatch, client)
+
+    outline = generate_outline_fanout(generator, "Topic", concurrency=2)
+
+    assert client.max_in_flight <= 2
+    assert client.section_calls == SECTIONS + 1
+    assert outline["layouts"][6]["placeholders"][0]["content"] == "Part 3"
+
+
+def test_json_mode_requests_the_skeleton_schema(monkeypatch):
+    client = SectionClient(latency=0)
+    generator = _generator(monkeypatch, client)
+    generator.generation_config = json_generation_config()
+
+    outline = generate_outline_fanout(generator, "Topic", concurrency=2)
+
+    assert len(outline["layouts"]) == 2 * SECTIONS
+    assert client.schemas[0] == ["sections"]
+    assert client.schemas[1:] == [["layouts"]] * SECTIONS
+
+
+def test_skeleton_without_known_layouts_is_rejected(monkeypatch):
+    generator = _generator(monkeypatch, None)
+    with pytest.raises(ValueError):
+        validate_skeleton({"sections": [{"title": "A", "slides": ["nope"]}]}, generator.layouts)
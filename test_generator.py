@@ -126,7 +126,7 @@ def test_without_api():
             print(f"📊 Total slides: {len(self.prs.slides)}")
     
     # Run the test
-    generator = MockGenerator("branding.pptx")
+    generator = MockGenerator("input/branding.pptx")
     output_file = "test_presentation.pptx"
     generator.create_presentation(mock_outline, output_file)
     
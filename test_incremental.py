@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test incremental rebuilds that only re-render changed slides
+"""
+
+import copy
+import json
+import os
+
+import pytest
+from pptx import Presentation
+
+import package_writer
+from metrics import BuildMetrics
+from presentation_generator import PresentationGenerator
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+def _outline(count):
+    return {"layouts": [
+        {"id": 7, "name": "content_02_no_image", "placeholders": [
+            {"idx": 0, "type": "TITLE (1)", "content": f"Slide {n}"}]}
+        for n in range(count)
+    ]}
+
+
+def _titles(path):
+    return [slide.shapes.title.text for slide in Presentation(path).slides]
+
+
+def _build(generator, outline, path):
+    metrics = BuildMetrics()
+    generator.create_presentation(outline, path, metrics)
+    return metrics.counters
+
+
+def test_rebuild_renders_only_changed_slides(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.incremental = True
+    path = str(tmp_path / "deck.pptx")
+
+    outline = _outline(20)
+    assert "slides_reused" not in _build(generator, outline, path)
+    assert os.path.exists(path + ".manifest.json")
+
+    edited = copy.deepcopy(outline)
+    edited["layouts"][5]["placeholders"][0]["content"] = "Edited"
+    counters = _build(generator, edited, path)
+    assert (counters["slides_reused"], counters["slides_rendered"]) == (19, 1)
+    assert _titles(path)[4:7] == ["Slide 4", "Edited", "Slide 6"]
+
+
+def test_rebuild_handles_added_removed_and_reordered_slides(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.incremental = True
+    path = str(tmp_path / "deck.pptx")
+    outline = _outline(6)
+    _build(generator, outline, path)
+
+    layouts = outline["layouts"]
+    new = {"id": 4, "name": "key_message_02_white_background",
+           "placeholders": [{"idx": 0, "type": "TITLE (1)", "content": "New"}]}
+    edited = {"layouts": [layouts[5], new, layouts[0], layouts[2], layouts[3]]}
+    counters = _build(generator, edited, path)
+
+    assert (counters["slides_reused"], counters["slides_rendered"]) == (4, 1)
+    assert _titles(path) == ["Slide 5", "New", "Slide 0", "Slide 2", "Slide 3"]
+    assert len(json.load(open(path + ".manifest.json"))["slides"]) == 5
+
+    # An unchanged rebuild reuses everything; a fresh generator reads the same manifest
+    fresh = PresentationGenerator(TEMPLATE)
+    fresh.incremental = True
+    assert _build(fresh, edited, path)["slides_rendered"] == 0
+
+
+def test_failed_save_keeps_the_previous_deck(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.incremental = True
+    path = str(tmp_path / "deck.pptx")
+    _build(generator, _outline(6), path)
+    previous = open(path, 'rb').read()
+    manifest = open(path + ".manifest.json").read()
+
+    append_entry = package_writer.append_entry
+    appended = []
+
+    def disk_full(zf, entry):
+        appended.append(entry.name)
+        if len(appended) == 20:
+            raise OSError(28, "No space left on device")
+        append_entry(zf, entry)
+
+    monkeypatch.setattr(package_writer, "append_entry", disk_full)
+    edited = _outline(6)
+    edited["layouts"][2]["placeholders"][0]["content"] = "Edited"
+    with pytest.raises(OSError):
+        _build(generator, edited, path)
+
+    assert open(path, 'rb').read() == previous
+    assert open(path + ".manifest.json").read() == manifest
+    assert sorted(os.listdir(tmp_path)) == ["deck.pptx", "deck.pptx.manifest.json"]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test tolerant parsing of LLM JSON and recovery of cut-off outlines
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from json_repair import repair_json, repair_outline
+from metrics import BuildMetrics
+from presentation_generator import PresentationGenerator
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+def _layout(layout_id, text="x"):
+    return {"id": layout_id, "placeholders": [{"idx": 0, "content": text}]}
+
+
+def test_common_faults_are_repaired():
+    value, repairs = repair_json('Sure, here it is:\n```json\n{"a": [1, 2,], "b": "one\ntwo",}\n```\nEnjoy!')
+    assert value == {"a": [1, 2], "b": "one\ntwo"}
+    assert set(repairs) == {"leading_prose", "trailing_prose", "trailing_comma", "unescaped_newline"}
+
+    assert repair_json('{"a": 1}') == ({"a": 1}, [])
+    with pytest.raises(ValueError):
+        repair_json("I cannot help with that.")
+
+
+def test_truncated_outline_keeps_only_complete_layouts():
+    text = json.dumps({"layouts": [_layout(0), _layout(4)]})
+    cut = text[:text.rindex('"content"') + 12]
+
+    outline, repairs = repair_outline(cut)
+    assert repairs == ["truncated"]
+    assert outline == {"layouts": [_layout(0)]}
+
+
+def test_cut_off_reply_requests_only_the_missing_tail(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.chdir(tmp_path)
+    generator = PresentationGenerator(TEMPLATE)
+    all_ids = list(generator.layouts_by_id)
+    full = json.dumps({"layouts": [_layout(i) for i in all_ids]})
+    prompts = []
+
+    def generate_content(prompt):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return SimpleNamespace(text=full[:len(full) // 2])
+        missing = json.loads(prompt.rsplit("with ids ", 1)[1].split("]")[0] + "]")
+        return SimpleNamespace(text=json.dumps({"layouts": [_layout(i) for i in missing]}))
+
+    generator.client = SimpleNamespace(generate_content=generate_content)
+    metrics = BuildMetrics("Topic")
+    outline = generator.generate_outline("Topic", fallback_to_mock=False, metrics=metrics)
+
+    assert sorted(layout["id"] for layout in outline["layouts"]) == sorted(all_ids)
+    assert len(prompts) == 2
+    assert "Return only the remaining layouts" in prompts[1]
+    assert metrics.counters["json_repair_truncated"] == 1
+    assert metrics.counters["json_tail_requests"] == 1
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test per-phase build metrics
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+from metrics import BuildMetrics
+from presentation_generator import PresentationGenerator
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+OUTLINE = {"layouts": [{"id": 4, "name": "key_message_02_white_background",
+                        "placeholders": [{"idx": 0, "type": "TITLE (1)", "content": "Hello"}]}]}
+
+
+class UsageClient:
+    def generate_content(self, prompt):
+        usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=80)
+        return SimpleNamespace(text=json.dumps(OUTLINE), usage_metadata=usage)
+
+
+def test_record_and_prometheus_output():
+    metrics = BuildMetrics("Topic")
+    with metrics.phase("render"):
+        pass
+    with metrics.phase("llm_request"):
+        pass
+    metrics.set("output_bytes", 1024)
+    metrics.set("prompt_tokens", None)
+    metrics.record_layout("cover", 0.5)
+    metrics.record_layout("cover", 0.25)
+
+    record = metrics.to_record()
+    assert list(record["phases"]) == ["llm_request", "render"]
+    assert record["counters"] == {"output_bytes": 1024}
+    assert record["layouts"] == {"cover": {"slides": 2, "seconds": 0.75}}
+
+    text = metrics.to_prometheus()
+    assert 'pptgen_phase_seconds{phase="render"}' in text
+    assert 'pptgen_layout_slides{layout="cover"} 2' in text
+    assert "pptgen_output_bytes 1024" in text
+
+
+def test_total_is_wall_time_not_the_sum_of_phases():
+    metrics = BuildMetrics("Topic")
+    with metrics.phase("render"):
+        with metrics.phase("image_wait"):
+            metrics.add_time("llm_request", 5.0)  # e.g. concurrent requests on other threads
+
+    record = metrics.to_record()
+    assert sum(record["phases"].values()) > 5.0
+    assert record["total_seconds"] < 1.0
+
+
+def test_build_records_every_phase(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.chdir(tmp_path)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = UsageClient()
+    generator.profile_path = str(tmp_path / "render.prof")
+    metrics = BuildMetrics("Topic")
+
+    outline = generator.generate_outline("Topic", fallback_to_mock=False, metrics=metrics)
+    generator.create_presentation(outline, str(tmp_path / "deck.pptx"), metrics)
+    metrics.write(str(tmp_path / "metrics.jsonl"))
+
+    record = json.loads((tmp_path / "metrics.jsonl").read_text().splitlines()[0])
+    assert list(record["phases"]) == ["prompt_load", "llm_request", "parse",
+                                      "template_load", "render", "save"]
+    assert record["counters"]["prompt_tokens"] == 120
+    assert record["counters"]["response_tokens"] == 80
+    assert record["counters"]["output_bytes"] == os.path.getsize(tmp_path / "deck.pptx")
+    assert record["layouts"]["key_message_02_white_background"]["slides"] == 1
+    assert (tmp_path / "render.prof").exists()
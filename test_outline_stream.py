@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test streaming outline parsing and pipelined slide rendering with a fake chunked client
+"""
+
+import json
+import os
+import re
+import time
+
+from outline_stream import LayoutStreamParser
+from presentation_generator import PresentationGenerator
+from pptx import Presentation
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+LAYOUTS = [
+    {"id": 0, "name": "cover", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Braces { in \"strings\" ]"}]},
+    {"id": 4, "name": "key_message_02_white_background", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Escaped \\\\ backslash"}]},
+    {"id": 10, "name": "salutation", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Thank You"}]},
+]
+RESPONSE = "```json\n" + json.dumps({"layouts": LAYOUTS}, indent=2) + "\n```"
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_emits_each_layout_once_complete():
+    for size in (1, 7, 64, len(RESPONSE)):
+        parser = LayoutStreamParser()
+        emitted = []
+        for chunk in _chunks(RESPONSE, size):
+            emitted.extend(parser.feed(chunk))
+        assert emitted == LAYOUTS
+        assert parser.done
+        assert parser.full_text == RESPONSE
+
+
+def test_parser_emits_before_stream_ends():
+    parser = LayoutStreamParser()
+    second_object = RESPONSE.index('"id": 4')
+    assert parser.feed(RESPONSE[:second_object]) == [LAYOUTS[0]]
+    assert parser.feed(RESPONSE[second_object:]) == LAYOUTS[1:]
+
+
+class FakeStreamingClient:
+    """Yields the response in chunks with a delay between them"""
+
+    def __init__(self, text, chunk_size=40, delay=0.01):
+        self.chunks = _chunks(text, chunk_size)
+        self.delay = delay
+        self.finished_at = None
+
+    def generate_content(self, prompt, stream=False):
+        assert stream
+
+        class Chunk:
+            def __init__(self, text):
+                self.text = text
+
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield Chunk(chunk)
+        self.finished_at = time.perf_counter()
+
+
+def test_streaming_build_renders_slides_while_streaming(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = FakeStreamingClient(RESPONSE)
+
+    progress = []
+    output = str(tmp_path / "streamed.pptx")
+    outline = generator.generate_presentation_streaming(
+        "Streaming", output, on_slide=lambda n, layout, elapsed: progress.append(
+            (n, layout["name"], time.perf_counter())))
+
+    assert outline == {"layouts": LAYOUTS}
+    assert [p[:2] for p in progress] == [(1, "cover"), (2, "key_message_02_white_background"),
+                                         (3, "salutation")]
+    assert progress[0][2] < generator.client.finished_at
+    assert len(Presentation(output).slides) == 3
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FailingStreamClient:
+    """Streams the response but fails after `fail_after` characters; plain requests succeed"""
+
+    def __init__(self, text, fail_after):
+        self.text = text
+        self.fail_after = fail_after
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False):
+        if not stream:
+            self.prompts.append(prompt)
+            wanted = re.search(r"Return only the remaining layouts, with ids \[([\d, ]*)\]", prompt)
+            layouts = LAYOUTS
+            if wanted:
+                ids = {int(n) for n in wanted.group(1).split(",")}
+                layouts = [layout for layout in LAYOUTS if layout["id"] in ids]
+            return StubResponse(json.dumps({"layouts": layouts}))
+        return self._stream()
+
+    def _stream(self):
+        for chunk in _chunks(self.text[:self.fail_after], 40):
+            yield StubResponse(chunk)
+        raise ConnectionError("stream reset by peer")
+
+
+def _streaming_generator(monkeypatch, tmp_path, client):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = client
+    return generator
+
+
+def test_stream_failing_part_way_requests_only_the_missing_layouts(tmp_path, monkeypatch):
+    client = FailingStreamClient(RESPONSE, fail_after=RESPONSE.index('"id": 4'))
+    generator = _streaming_generator(monkeypatch, tmp_path, client)
+    output = str(tmp_path / "streamed.pptx")
+
+    outline = generator.generate_presentation_streaming("Streaming", output, fallback_to_mock=False)
+
+    assert len(client.prompts) == 1 and "ids [0]" in client.prompts[0]
+    assert outline == {"layouts": LAYOUTS}
+    assert len(Presentation(output).slides) == 3
+    assert generator._metrics.counters["json_tail_requests"] == 1
+
+
+def test_stream_failing_before_any_layout_falls_back_to_a_regular_request(tmp_path, monkeypatch):
+    client = FailingStreamClient(RESPONSE, fail_after=0)
+    generator = _streaming_generator(monkeypatch, tmp_path, client)
+    output = str(tmp_path / "streamed.pptx")
+
+    outline = generator.generate_presentation_streaming("Streaming", output, fallback_to_mock=False)
+
+    assert outline == {"layouts": LAYOUTS}
+    assert len(client.prompts) == 1
+    assert len(Presentation(output).slides) == 3
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test writing decks to bytes, streams and stdout instead of files
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+from pptx import Presentation
+
+from presentation_generator import PresentationGenerator
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = os.path.join(ROOT, "input/branding.pptx")
+
+OUTLINE = {"layouts": [{"id": 4, "name": "key_message_02_white_background",
+                        "placeholders": [{"idx": 0, "type": "TITLE (1)", "content": "In memory"}]}]}
+
+
+def _generator(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    return PresentationGenerator(TEMPLATE)
+
+
+def test_deck_is_returned_as_bytes_without_extra_copies(monkeypatch):
+    generator = _generator(monkeypatch)
+    generator.create_presentation(OUTLINE, io.BytesIO())  # warm the template cache
+
+    tracemalloc.start()
+    deck = generator.create_presentation(OUTLINE)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert isinstance(deck, bytes)
+    assert retained < 1.5 * len(deck)
+    prs = Presentation(io.BytesIO(deck))
+    assert prs.slides[0].shapes.title.text == "In memory"
+
+
+def test_deck_is_written_to_a_stream(monkeypatch):
+    generator = _generator(monkeypatch)
+    stream = io.BytesIO()
+    assert generator.create_presentation(OUTLINE, stream) is None
+    assert stream.getvalue()[:2] == b"PK"
+
+
+def test_raw_response_file_can_be_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = _generator(monkeypatch)
+    generator.client = SimpleNamespace(
+        generate_content=lambda prompt: SimpleNamespace(text=json.dumps(OUTLINE)))
+
+    generator.save_responses = False
+    generator.generate_outline("Topic", fallback_to_mock=False)
+    assert not (tmp_path / "output").exists()
+
+    generator.save_responses = True
+    generator.generate_outline("Topic", fallback_to_mock=False)
+    assert (tmp_path / "output" / "topic_response.json").exists()
+
+
+def test_cli_writes_deck_to_stdout(tmp_path):
+    (tmp_path / "outline.json").write_text(json.dumps(OUTLINE))
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "presentation_generator.py"), "Topic",
+         "--json", "outline.json", "-o", "-", "-t", TEMPLATE],
+        cwd=tmp_path, env=env, capture_output=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    assert "written to stdout" in result.stderr.decode()
+    prs = Presentation(io.BytesIO(result.stdout))
+    assert prs.slides[0].shapes.title.text == "In memory"
+    assert not (tmp_path / "output").exists()
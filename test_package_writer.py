@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test saving decks with the package writer against python-pptx's own save
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from package_writer import save_package  # noqa: E402
+from presentation_generator import PresentationGenerator  # noqa: E402
+from synthetic import make_layouts_outline  # noqa: E402
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+def _deck(monkeypatch, slides=12):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.create_presentation(make_layouts_outline(slides))
+    return generator.prs
+
+
+def _raw(zf, info):
+    """A member's bytes as stored in the archive"""
+    with open(zf.filename, 'rb') as f:
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = int.from_bytes(f.read(2), "little"), int.from_bytes(f.read(2), "little")
+        f.seek(name_length + extra_length, os.SEEK_CUR)
+        return f.read(info.compress_size)
+
+
+def test_same_members_and_contents_as_prs_save(monkeypatch, tmp_path):
+    prs = _deck(monkeypatch)
+    expected, actual = tmp_path / "expected.pptx", tmp_path / "actual.pptx"
+    prs.save(str(expected))
+    report = save_package(prs, str(actual))
+    assert report["copied"] > 0 and report["deflated"] > 0
+
+    with zipfile.ZipFile(expected) as before, zipfile.ZipFile(actual) as after:
+        assert after.testzip() is None
+        assert after.namelist() == before.namelist()
+        for name in before.namelist():
+            assert after.read(name) == before.read(name), name
+    assert len(Presentation(str(actual)).slides) == 12
+
+
+def test_template_media_is_copied_without_recompressing(monkeypatch, tmp_path):
+    prs = _deck(monkeypatch)
+    output = tmp_path / "deck.pptx"
+    save_package(prs, str(output), level=1)
+
+    with zipfile.ZipFile(TEMPLATE) as template, zipfile.ZipFile(output) as deck:
+        media = [info for info in template.infolist() if info.filename.startswith("ppt/media/")]
+        assert media
+        for info in media:
+            copied = deck.getinfo(info.filename)
+            assert copied.compress_type == info.compress_type
+            assert _raw(deck, copied) == _raw(template, info)
+
+
+def test_level_zero_stores_new_parts(monkeypatch):
+    prs = _deck(monkeypatch, slides=3)
+    stored, deflated = io.BytesIO(), io.BytesIO()
+    save_package(prs, stored, level=0)
+    save_package(prs, deflated, level=9)
+    assert len(stored.getvalue()) > len(deflated.getvalue())
+
+    with zipfile.ZipFile(stored) as zf:
+        assert zf.getinfo("ppt/slides/slide1.xml").compress_type == zipfile.ZIP_STORED
+    assert len(Presentation(stored).slides) == 3
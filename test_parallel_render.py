@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test rendering one deck on a process pool against the sequential build
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+import parallel_render  # noqa: E402
+from presentation_generator import PresentationGenerator  # noqa: E402
+from synthetic import make_layouts_outline, make_slides_outline  # noqa: E402
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+@pytest.fixture(autouse=True)
+def stop_pools(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    # Small chunks so even a short outline is spread over several workers
+    monkeypatch.setattr(parallel_render, "MIN_CHUNK", 3)
+    yield
+    parallel_render.shutdown_pools()
+
+
+def _build(outline, render_workers, stream_write=False):
+    generator = PresentationGenerator(TEMPLATE)
+    generator.render_workers = render_workers
+    generator.stream_write = stream_write
+    return generator, generator.create_presentation(outline)
+
+
+def _members(deck: bytes):
+    archive = zipfile.ZipFile(io.BytesIO(deck))
+    return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.mark.parametrize("make_outline", [make_layouts_outline, make_slides_outline])
+def test_parallel_build_matches_sequential_build(make_outline):
+    outline = make_outline(30)
+    _, sequential = _build(outline, 1)
+    generator, parallel = _build(outline, 2)
+
+    assert _members(parallel) == _members(sequential)
+    assert generator._metrics.counters["render_workers"] == 2
+    assert sum(entry["slides"] for entry in generator._metrics.layouts.values()) == 30
+
+
+def test_parallel_build_feeds_the_streaming_writer():
+    outline = make_layouts_outline(20)
+    _, sequential = _build(outline, 1)
+    _, streamed = _build(outline, 2, stream_write=True)
+    assert _members(streamed) == _members(sequential)
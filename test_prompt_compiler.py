@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the compact prompt compiler and JSON mode
+"""
+
+import json
+import os
+import shutil
+from types import SimpleNamespace
+
+from presentation_generator import PresentationGenerator
+from prompt_compiler import PromptCompiler, encode_layout, estimate_tokens, json_generation_config
+from template_registry import TemplateRegistry
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = os.path.join(ROOT, "input/branding.pptx")
+LAYOUTS_FILE = os.path.join(ROOT, "input/slide_layouts.json")
+
+
+def test_layout_line_skips_pictures_and_groups_fields():
+    line = encode_layout({"id": 1, "name": "agenda", "description": "Agenda", "placeholders": [
+        {"idx": 0, "name": "title", "type": "TITLE (1)", "max_chars": 60},
+        {"idx": 10, "name": "image_placeholder", "type": "PICTURE (18)", "max_chars": None},
+        {"idx": 1, "name": "item", "type": "OBJECT (7)", "max_chars": 80},
+        {"idx": 11, "name": "item", "type": "OBJECT (7)", "max_chars": 80},
+    ]})
+    assert line == "1 agenda | Agenda | 0 title 60, 1/11 item 80"
+
+
+def test_compiled_prompt_is_cached_per_catalogue_key(tmp_path):
+    template = tmp_path / "brand.pptx"
+    layouts_file = tmp_path / "brand.layouts.json"
+    shutil.copy(TEMPLATE, template)
+    shutil.copy(LAYOUTS_FILE, layouts_file)
+    registry = TemplateRegistry(cache_dir=None)
+    catalogue = registry.resolve(str(template))
+    compiler = PromptCompiler()
+
+    prompt = compiler.compile(catalogue.key, catalogue.layouts)
+    assert "{topic}" in prompt
+    assert "13 layouts" in prompt
+    assert compiler.compile(catalogue.key, catalogue.layouts) is prompt
+    assert estimate_tokens(prompt) < estimate_tokens(open(os.path.join(ROOT, "input/prompt.md")).read()) / 3
+
+    overrides = json.loads(layouts_file.read_text())
+    overrides["layouts"][4]["description"] = "Renamed description"
+    layouts_file.write_text(json.dumps(overrides))
+    changed = registry.resolve(str(template))
+    assert changed.key != catalogue.key
+    assert "Renamed description" in compiler.compile(changed.key, changed.layouts)
+
+
+def test_json_mode_sends_schema_and_parses_bare_json(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    reply = {"layouts": [{"id": 4, "placeholders": [{"idx": 0, "content": "Compact"}]}]}
+
+    def generate_content(prompt, generation_config=None):
+        calls.append(generation_config)
+        return SimpleNamespace(text=json.dumps(reply))
+
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = SimpleNamespace(generate_content=generate_content)
+    generator.generation_config = json_generation_config()
+
+    outline = generator.generate_outline("Topic", fallback_to_mock=False)
+    assert outline == reply
+    assert calls[0]["response_mime_type"] == "application/json"
+
+    prs_bytes = generator.create_presentation(outline)
+    assert generator.prs.slides[0].shapes.title.text == "Compact"
+    assert prs_bytes[:2] == b"PK"
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test the precompiled per-layout render plans
+"""
+
+import os
+
+from presentation_generator import PresentationGenerator
+from render_plan import LayoutPlan
+from template_cache import template_cache
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+def test_plan_compiles_slots_pictures_and_legacy_bindings():
+    plan = LayoutPlan({"id": 7, "name": "content", "placeholders": [
+        {"idx": 0, "name": "title", "type": "text", "max_chars": 60},
+        {"idx": 26, "name": "subtitle", "type": "text", "max_chars": 100},
+        {"idx": 27, "name": "body_text", "type": "text", "max_chars": 600},
+        {"idx": 16, "name": "image_placeholder", "type": "PICTURE (18)", "max_chars": None},
+    ]})
+    assert plan.max_chars(27) == 600
+    assert plan.picture_idxs == {16}
+    assert plan.field_bindings == {0: ["title"], 26: ["title", "subtitle"], 27: ["content"]}
+
+
+def test_layout_slides_are_filled_through_plan_lookup(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.prs = template_cache.get(TEMPLATE)
+    generator.text_fit = False  # max_chars cuts; box fitting is covered in test_text_fit
+    layout = {"id": 7, "name": "content_02_no_image", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Title"},
+        {"idx": 26, "type": "BODY (2)", "content": "Subtitle"},
+        {"idx": 27, "type": "BODY (2)", "content": "x" * 700},
+    ]}
+
+    for _ in range(2):
+        slide = generator._add_layout_slide(layout)
+        texts = {shape.placeholder_format.idx: shape.text for shape in slide.placeholders}
+        assert texts[0] == "Title"
+        assert texts[26] == "Subtitle"
+        assert texts[27] == "x" * 597 + "..."
+    assert generator.render_plans[7].positions is not None
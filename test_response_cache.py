@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed GenAI response cache
+"""
+
+import json
+import os
+import time
+
+from presentation_generator import PresentationGenerator
+from response_cache import ResponseCache
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+class CountingClient:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+
+        class Response:
+            text = self.text
+        return Response()
+
+
+def _generator(tmp_path, monkeypatch, text):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE, response_cache=ResponseCache(str(tmp_path / "cache")))
+    generator.client = CountingClient(text)
+    return generator
+
+
+def test_key_covers_model_prompt_and_settings():
+    key = ResponseCache.key("gemini-2.0-flash", "prompt", {"temperature": 0.7})
+    assert key == ResponseCache.key("gemini-2.0-flash", "prompt", {"temperature": 0.7})
+    assert key != ResponseCache.key("gemini-2.0-pro", "prompt", {"temperature": 0.7})
+    assert key != ResponseCache.key("gemini-2.0-flash", "prompt 2", {"temperature": 0.7})
+    assert key != ResponseCache.key("gemini-2.0-flash", "prompt", {"temperature": 0.2})
+
+
+def test_hit_skips_network(tmp_path, monkeypatch):
+    generator = _generator(tmp_path, monkeypatch, json.dumps({"layouts": []}))
+    generator.generate_outline("Cloud Computing")
+    generator.generate_outline("Cloud Computing")
+    generator.generate_outline("Data Science")
+    assert generator.client.calls == 2
+    assert generator.response_cache.hits == 1
+
+
+def test_unparseable_response_is_not_cached(tmp_path, monkeypatch):
+    generator = _generator(tmp_path, monkeypatch, "not json")
+    generator.generate_outline("Cloud Computing")
+    generator.generate_outline("Cloud Computing")
+    assert generator.client.calls == 2
+
+
+def test_lru_eviction_and_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, name)
+        time.sleep(0.01)
+    assert cache.get("a") == "a"
+    time.sleep(0.01)
+    cache.put("c", "c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+    assert not [f for f in os.listdir(tmp_path) if f.startswith(".tmp-")]
+
+    expiring = ResponseCache(str(tmp_path / "ttl"), ttl_seconds=0)
+    expiring.put("k", "v")
+    time.sleep(0.01)
+    assert expiring.get("k") is None
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the quota-aware request scheduler against a fake client with 429s and slow replies
+"""
+
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from metrics import BuildMetrics
+from presentation_generator import PresentationGenerator
+from scheduler import BATCH, INTERACTIVE, DeadlineExceeded, RequestScheduler, is_retryable
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+OUTLINE = {"layouts": [{"id": 4, "placeholders": [{"idx": 0, "content": "Real"}]}]}
+
+
+class FakeClient:
+    """Fails the first `failures` calls with a 429, sleeps `latency` per call"""
+
+    def __init__(self, failures=0, latency=0.0, error="429 Resource has been exhausted"):
+        self.failures = failures
+        self.latency = latency
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        with self._lock:
+            self.calls.append(prompt)
+            fail = len(self.calls) <= self.failures
+        time.sleep(self.latency)
+        if fail:
+            raise RuntimeError(self.error)
+        return SimpleNamespace(text=json.dumps(OUTLINE))
+
+
+def test_retryable_errors_are_retried_with_backoff():
+    client = FakeClient(failures=2)
+    scheduler = RequestScheduler(base_delay=0.01, max_delay=0.05)
+    metrics = BuildMetrics()
+
+    response = scheduler.call(client.generate_content, "prompt", metrics=metrics)
+    assert json.loads(response.text) == OUTLINE
+    assert len(client.calls) == 3
+    assert metrics.counters["request_retries"] == 2
+    assert {"queue_wait", "retry_backoff", "llm_request"} <= set(metrics.phases)
+
+
+def test_other_errors_and_exhausted_retries_raise():
+    assert is_retryable(RuntimeError("503 Service Unavailable"))
+    assert not is_retryable(ValueError("400 Invalid argument"))
+
+    client = FakeClient(failures=10, error="400 Invalid argument")
+    with pytest.raises(RuntimeError):
+        RequestScheduler(base_delay=0.01).call(client.generate_content, "prompt")
+    assert len(client.calls) == 1
+
+    client = FakeClient(failures=10)
+    with pytest.raises(RuntimeError):
+        RequestScheduler(max_retries=2, base_delay=0.01).call(client.generate_content, "prompt")
+    assert len(client.calls) == 3
+
+
+def test_slow_requests_hit_the_deadline():
+    client = FakeClient(latency=1.0)
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        RequestScheduler(timeout=0.1).call(client.generate_content, "prompt")
+    assert time.perf_counter() - started < 0.5
+
+
+def test_the_time_left_is_passed_to_the_client():
+    options = []
+
+    def generate_content(prompt, request_options=None):
+        options.append(request_options)
+        return SimpleNamespace(text="{}")
+
+    RequestScheduler(timeout=5).call(generate_content, "prompt", request_options={"retry": None})
+    assert options[0]["retry"] is None
+    assert 4 < options[0]["timeout"] <= 5
+
+
+def test_request_budget_is_enforced_and_wait_reported():
+    scheduler = RequestScheduler(requests_per_minute=600)  # one every 0.1s
+    scheduler.requests.available = 0
+    client = FakeClient()
+    metrics = BuildMetrics()
+
+    for _ in range(3):
+        scheduler.call(client.generate_content, "prompt", metrics=metrics)
+    assert metrics.phases["queue_wait"] >= 0.25
+    assert metrics.phases["llm_request"] < 0.1
+
+
+def test_interactive_requests_go_before_batch():
+    scheduler = RequestScheduler(requests_per_minute=600)
+    scheduler.requests.available = 0
+    client = FakeClient()
+
+    def submit(name, priority):
+        scheduler.call(client.generate_content, name, priority=priority)
+
+    threads = [threading.Thread(target=submit, args=(f"batch{n}", BATCH)) for n in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.03)
+    interactive = threading.Thread(target=submit, args=("interactive", INTERACTIVE))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join()
+
+    assert client.calls[0] == "interactive"
+
+
+def test_generator_recovers_from_rate_limit_instead_of_mock(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.chdir(tmp_path)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.client = FakeClient(failures=1)
+    generator.scheduler = RequestScheduler(base_delay=0.01)
+
+    assert generator.generate_outline("Topic", fallback_to_mock=False) == OUTLINE
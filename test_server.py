@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the HTTP service mode against a local server with a stub GenAI client
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from server import GeneratorPool, GeneratorServer  # noqa: E402
+from synthetic import make_layouts_outline  # noqa: E402
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+OUTLINE = {"layouts": [{"id": 4, "placeholders": [{"idx": 0, "type": "TITLE (1)",
+                                                    "content": "Served"}]}]}
+
+
+class BlockingClient:
+    """Stub GenAI client that holds every call until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_content(self, prompt):
+        self.started.set()
+        self.release.wait(5)
+
+        class Response:
+            text = json.dumps(OUTLINE)
+        return Response()
+
+
+def _start(pool):
+    server = GeneratorServer(("127.0.0.1", 0), pool)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url + "/generate", data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+    return urllib.request.urlopen(request, timeout=10)
+
+
+def test_health_and_outline_request(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    server, url = _start(GeneratorPool(TEMPLATE, workers=2, queue_depth=1))
+    try:
+        health = json.load(urllib.request.urlopen(url + "/health", timeout=5))
+        assert health["status"] == "ok" and health["workers"] == 2
+
+        response = _post(url, {"outline": OUTLINE, "topic": "Served Deck"})
+        assert response.headers["Content-Type"].endswith("presentationml.presentation")
+        assert "served_deck.pptx" in response.headers["Content-Disposition"]
+        assert response.read()[:2] == b"PK"
+
+        try:
+            _post(url, {"neither": True})
+            assert False, "expected 400"
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+    finally:
+        server.shutdown()
+
+
+def test_full_queue_is_rejected_with_429(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    pool = GeneratorPool(TEMPLATE, workers=1, queue_depth=0)
+    client = BlockingClient()
+    for generator in list(pool._idle.queue):
+        generator.client = client
+    server, url = _start(pool)
+    try:
+        results = {}
+        first = threading.Thread(target=lambda: results.setdefault(
+            "first", _post(url, {"topic": "Slow"}).status))
+        first.start()
+        assert client.started.wait(5)
+
+        try:
+            _post(url, {"topic": "Rejected"})
+            assert False, "expected 429"
+        except urllib.error.HTTPError as e:
+            assert e.code == 429
+            assert e.headers["Retry-After"] == "1"
+
+        client.release.set()
+        first.join(10)
+        assert results["first"] == 200
+        assert pool.stats()["rejected"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_deck_is_streamed_in_chunks_and_early_failures_get_502(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    pool = GeneratorPool(TEMPLATE, workers=1, queue_depth=0)
+    server, url = _start(pool)
+    try:
+        response = _post(url, {"outline": make_layouts_outline(30), "topic": "Big"})
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        assert response.headers["Content-Length"] is None
+        assert len(Presentation(io.BytesIO(response.read())).slides) == 30
+
+        def fail(layout_data, images=None):
+            raise RuntimeError("render failed")
+
+        generator = pool._idle.queue[0]
+        monkeypatch.setattr(generator, "_add_layout_slide", fail)
+        try:
+            _post(url, {"outline": OUTLINE, "topic": "Broken"})
+            assert False, "expected 502"
+        except urllib.error.HTTPError as e:
+            assert e.code == 502
+            assert "render failed" in json.load(e)["error"]
+    finally:
+        server.shutdown()
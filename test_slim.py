@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test slimming decks before save
+"""
+
+import os
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import ImagePart
+
+from presentation_generator import PresentationGenerator
+from slim import dedupe_media, slim_presentation
+from template_cache import template_cache
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+OUTLINE = {"layouts": [
+    {"id": 7, "name": "content_02_no_image", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Title"}]},
+    {"id": 4, "name": "key_message_02_white_background", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Message"}]},
+]}
+
+
+def _build(tmp_path, monkeypatch, slim):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.slim = slim
+    output_path = str(tmp_path / f"deck_{slim}.pptx")
+    generator.create_presentation(OUTLINE, output_path)
+    return output_path
+
+
+def test_slim_deck_keeps_only_used_layouts(tmp_path, monkeypatch):
+    full = _build(tmp_path, monkeypatch, slim=False)
+    slim = _build(tmp_path, monkeypatch, slim=True)
+
+    prs = Presentation(slim)
+    assert {layout.name for layout in prs.slide_layouts} == \
+        {slide.slide_layout.name for slide in Presentation(full).slides}
+    assert [shape.text for slide in prs.slides for shape in slide.placeholders if shape.text] == \
+        ["Title", "Message"]
+    assert os.path.getsize(slim) < os.path.getsize(full) / 2
+
+
+def test_report_counts_pruned_parts():
+    prs = template_cache.get(TEMPLATE)
+    prs.slides.add_slide(prs.slide_layouts[4])
+
+    report = slim_presentation(prs)
+    assert report["layouts"] == 12
+    assert report["masters"] == 0
+    assert report["bytes_saved"] > 1_000_000
+
+
+def test_identical_media_parts_are_deduplicated():
+    prs = template_cache.get(TEMPLATE)
+    layout = prs.slide_layouts[0]
+    original = next(rel.target_part for rel in layout.part.rels.values()
+                    if rel.reltype == RT.IMAGE)
+    duplicate = ImagePart(original.package.next_image_partname("png"), original.content_type,
+                          original.package, original.blob)
+    prs.slide_layouts[4].part.relate_to(duplicate, RT.IMAGE)
+
+    assert dedupe_media(prs) == 1
+    parts = set(prs.part.package.iter_parts())
+    assert (original in parts) != (duplicate in parts)
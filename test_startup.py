@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test that the offline CLI paths never import the Gemini SDK
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+RUN_CLI = """
+import runpy, sys
+sys.argv = ["presentation_generator.py"] + sys.argv[1:]
+sys.path.insert(0, {root!r})
+try:
+    runpy.run_path({script!r}, run_name="__main__")
+finally:
+    print("GENAI_IMPORTED=" + str("google.generativeai" in sys.modules))
+"""
+
+
+def _run_cli(args, tmp_path, api_key):
+    env = dict(os.environ)
+    env.pop("GEMINI_API_KEY", None)
+    if api_key:
+        env["GEMINI_API_KEY"] = api_key
+    code = RUN_CLI.format(root=ROOT, script=os.path.join(ROOT, "presentation_generator.py"))
+    return subprocess.run([sys.executable, "-c", code] + args, cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_json_path_never_imports_genai(tmp_path):
+    outline = {"layouts": [{"id": 4, "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "From fixture"}]}]}
+    (tmp_path / "outline.json").write_text("```json\n" + json.dumps(outline) + "\n```")
+
+    result = _run_cli(["Fixture", "--json", "outline.json", "-o", "deck.pptx",
+                       "-t", os.path.join(ROOT, "input/branding.pptx"), "--timing-startup"],
+                      tmp_path, api_key="not-used")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "GENAI_IMPORTED=False" in result.stdout
+    assert "Startup timing" in result.stdout
+    assert (tmp_path / "deck.pptx").exists()
+
+
+def test_mock_path_never_imports_genai(tmp_path):
+    result = _run_cli(["Mock Topic", "-o", "deck.pptx", "--no-cache",
+                       "-t", os.path.join(ROOT, "input/branding.pptx")],
+                      tmp_path, api_key=None)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "GENAI_IMPORTED=False" in result.stdout
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the bounded-memory streaming writer against the regular save path
+"""
+
+import gc
+import io
+import os
+import stat
+import sys
+import weakref
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "bench"))
+
+from presentation_generator import PresentationGenerator  # noqa: E402
+from synthetic import make_layouts_outline  # noqa: E402
+from template_cache import template_cache  # noqa: E402
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+def _generator(monkeypatch, stream_write):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.stream_write = stream_write
+    return generator
+
+
+def test_streamed_deck_matches_the_regular_save(monkeypatch):
+    outline = make_layouts_outline(26)
+    streamed = _generator(monkeypatch, True).create_presentation(outline)
+    regular = _generator(monkeypatch, False).create_presentation(outline)
+
+    streamed_zip, regular_zip = zipfile.ZipFile(io.BytesIO(streamed)), zipfile.ZipFile(io.BytesIO(regular))
+    assert sorted(streamed_zip.namelist()) == sorted(regular_zip.namelist())
+    for name in regular_zip.namelist():
+        assert streamed_zip.read(name) == regular_zip.read(name), name
+
+    prs = Presentation(io.BytesIO(streamed))
+    assert len(prs.slides) == 26
+    assert prs.slides[7].shapes.title.text.startswith("Slide 8:")
+
+
+def test_written_slides_are_released(monkeypatch):
+    from stream_writer import StreamingDeckWriter
+
+    generator = _generator(monkeypatch, True)
+    generator.prs = template_cache.get(TEMPLATE)
+    generator._writer = StreamingDeckWriter(generator.prs, io.BytesIO())
+    layout = make_layouts_outline(8)["layouts"][7]
+
+    slide = generator._add_layout_slide(layout)
+    part = weakref.ref(slide.part)
+    generator._writer.write_slide(slide)
+    del slide
+    gc.collect()
+    assert part() is None
+    assert generator._writer.slides_written == 1
+    generator._writer.close()
+
+
+def test_failed_rebuild_keeps_the_previous_deck(monkeypatch, tmp_path):
+    generator = _generator(monkeypatch, True)
+    output = str(tmp_path / "deck.pptx")
+    generator.create_presentation(make_layouts_outline(3), output)
+    previous = open(output, 'rb').read()
+
+    add_layout_slide = generator._add_layout_slide
+    rendered = []
+
+    def fail_third(layout_data, images=None):
+        rendered.append(layout_data)
+        if len(rendered) == 3:
+            raise RuntimeError("render failed")
+        return add_layout_slide(layout_data, images)
+
+    monkeypatch.setattr(generator, "_add_layout_slide", fail_third)
+    with pytest.raises(RuntimeError):
+        generator.create_presentation(make_layouts_outline(5), output)
+    assert generator._writer is None
+    assert open(output, 'rb').read() == previous
+    assert len(Presentation(output).slides) == 3
+    assert os.listdir(tmp_path) == ["deck.pptx"]
+
+
+def test_streamed_deck_gets_the_same_mode_as_a_regular_save(monkeypatch, tmp_path):
+    outline = make_layouts_outline(3)
+    _generator(monkeypatch, True).create_presentation(outline, str(tmp_path / "streamed.pptx"))
+    _generator(monkeypatch, False).create_presentation(outline, str(tmp_path / "regular.pptx"))
+    modes = [stat.S_IMODE(os.stat(tmp_path / name).st_mode) for name in ("streamed.pptx", "regular.pptx")]
+    assert modes[0] == modes[1]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide template cache
+"""
+
+import os
+import shutil
+
+from template_cache import TemplateCache
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+def test_clones_are_independent(tmp_path):
+    """Edits to one build must not leak into the pristine copy or other builds"""
+    cache = TemplateCache()
+    first = cache.get(TEMPLATE)
+    slide = first.slides.add_slide(first.slide_layouts[4])
+    slide.shapes.title.text = "Only in the first deck"
+    first.save(str(tmp_path / "first.pptx"))
+
+    second = cache.get(TEMPLATE)
+    assert len(first.slides) == 1
+    assert len(second.slides) == 0
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+    second.slides.add_slide(second.slide_layouts[4])
+    second.save(str(tmp_path / "second.pptx"))
+
+
+def test_touch_keeps_warm_copy_but_new_content_reparses(tmp_path):
+    """A changed mtime alone re-hashes; a changed hash re-parses"""
+    template = tmp_path / "branding.pptx"
+    shutil.copy(TEMPLATE, template)
+    cache = TemplateCache()
+    cache.get(str(template))
+    fingerprint = cache.fingerprint(str(template))
+
+    stat = os.stat(template)
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.get(str(template))
+    assert cache.misses == 1
+    assert cache.fingerprint(str(template)) == fingerprint
+
+    prs = cache.get(str(template))
+    prs.slides.add_slide(prs.slide_layouts[0])
+    prs.save(str(template))
+    reloaded = cache.get(str(template))
+    assert cache.misses == 2
+    assert cache.fingerprint(str(template)) != fingerprint
+    assert len(reloaded.slides) == 1
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test layout catalogues derived from templates and merged with overrides
+"""
+
+import json
+import os
+import shutil
+
+from presentation_generator import PresentationGenerator
+from template_registry import TemplateRegistry, without_geometry
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = os.path.join(ROOT, "input/branding.pptx")
+LAYOUTS_FILE = os.path.join(ROOT, "input/slide_layouts.json")
+
+
+def _brand(tmp_path, name="brand.pptx"):
+    template = tmp_path / name
+    shutil.copy(TEMPLATE, template)
+    return str(template)
+
+
+def test_catalogue_is_derived_once_per_template_hash(tmp_path):
+    template = _brand(tmp_path)
+    registry = TemplateRegistry(cache_dir=str(tmp_path / "cache"))
+    catalogue = registry.resolve(template)
+
+    assert catalogue.overrides_path is None
+    assert [layout["name"] for layout in catalogue.layouts][:2] == ["cover", "agenda_with_image"]
+    title = catalogue.layouts[7]["placeholders"][2]
+    assert (title["idx"], title["type"], title["width"]) == (0, "TITLE (1)", 11084672)
+    assert "max_chars" not in title
+    assert registry.resolve(template) is catalogue
+
+    # A copy with the same content is served from the on-disk cache by a new registry
+    fresh = TemplateRegistry(cache_dir=str(tmp_path / "cache"))
+    assert fresh.resolve(_brand(tmp_path, "copy.pptx")).layouts == catalogue.layouts
+    assert (registry.introspections, fresh.introspections) == (1, 0)
+
+
+def test_overrides_are_merged_by_layout_name_and_idx(tmp_path):
+    template = _brand(tmp_path)
+    overrides = tmp_path / "brand.layouts.json"
+    overrides.write_text(json.dumps({"layouts": [
+        {"name": "content_02_no_image", "description": "Text slide",
+         "placeholders": [{"idx": 27, "name": "body", "max_chars": 300}, {"idx": 99, "max_chars": 1}]},
+        {"name": "not_in_template", "description": "ignored"},
+    ]}))
+    registry = TemplateRegistry(cache_dir=None)
+    catalogue = registry.resolve(template)
+
+    layout = catalogue.layouts[7]
+    assert catalogue.overrides_path == str(overrides)
+    assert layout["description"] == "Text slide"
+    assert [p["idx"] for p in layout["placeholders"]] == [27, 26, 0]
+    assert layout["placeholders"][0]["name"] == "body"
+    assert layout["placeholders"][0]["max_chars"] == 300
+    assert layout["placeholders"][0]["height"] > 0
+
+    overrides.write_text(json.dumps({"layouts": []}))
+    assert registry.resolve(template).key != catalogue.key
+    assert registry.introspections == 1
+
+
+def test_bundled_overrides_reproduce_slide_layouts_json():
+    catalogue = TemplateRegistry(cache_dir=None).resolve(TEMPLATE)
+    with open(LAYOUTS_FILE) as f:
+        assert [without_geometry(layout) for layout in catalogue.layouts] == json.load(f)["layouts"]
+
+
+def test_generator_uses_the_catalogue_of_its_template(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.chdir(tmp_path)
+    template = _brand(tmp_path)
+    overrides = tmp_path / "custom.json"
+    overrides.write_text(json.dumps({"layouts": [
+        {"name": "cover", "placeholders": [{"idx": 0, "name": "headline", "max_chars": 20}]}]}))
+
+    generator = PresentationGenerator(template, layouts_file=str(overrides))
+    assert generator.layouts_file == str(overrides)
+    assert generator.render_plans[0].max_chars(0) == 20
+    assert generator.render_plans[0].slots[0].name == "headline"
+    assert PresentationGenerator(template).layouts_file is None
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test metric-based fitting of placeholder text to the template's boxes
+"""
+
+import os
+
+from pptx.util import Pt
+
+from metrics import BuildMetrics
+from presentation_generator import PresentationGenerator
+from template_cache import template_cache
+from text_fit import ELLIPSIS, TextBox, fit_text, text_height, word_width
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+SENTENCE = "Cloud migration lets teams retire legacy data centres and ship faster."
+
+
+def test_text_is_kept_shrunk_or_cut_at_a_word_boundary():
+    box = TextBox(width=300, height=60, size=18)
+    assert word_width("MW", "regular", 10) == (833 + 944) / 100
+    assert word_width("MW", "bold", 10) > word_width("il", "bold", 10)
+
+    fitted = fit_text(SENTENCE, box)
+    assert (fitted.text, fitted.size, fitted.truncated) == (SENTENCE, None, False)
+
+    fitted = fit_text(" ".join([SENTENCE] * 2), box)
+    assert fitted.text == " ".join([SENTENCE] * 2)
+    assert 12.6 <= fitted.size < 18 and not fitted.truncated
+
+    fitted = fit_text(" ".join([SENTENCE] * 10), box)
+    assert fitted.truncated and fitted.size == 18 * 0.7
+    assert fitted.text.endswith(ELLIPSIS)
+    words = fitted.text[:-1].split()
+    assert words == " ".join([SENTENCE] * 10).split()[:len(words)]
+    assert text_height([fitted.text.split()], box, fitted.size) <= box.height
+
+
+def test_paragraphs_count_towards_the_height():
+    box = TextBox(width=400, height=100, size=14, space_after=12)
+    bullets = "\n".join(f"• Point {n}" for n in range(3))
+    assert fit_text(bullets, box).size is None
+    assert fit_text("\n".join(f"• Point {n}" for n in range(6)), box).size is not None
+
+
+def test_boxes_are_measured_from_the_template(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.prs = template_cache.get(TEMPLATE)
+    generator._metrics = BuildMetrics()
+    body = " ".join([SENTENCE] * 60)
+    layout = {"id": 7, "name": "content_02_no_image", "placeholders": [
+        {"idx": 0, "type": "TITLE (1)", "content": "Title"},
+        {"idx": 26, "type": "BODY (2)", "content": "Subtitle"},
+        {"idx": 27, "type": "BODY (2)", "content": body},
+    ]}
+    slide = generator._add_layout_slide(layout)
+
+    boxes = generator.render_plans[7].boxes
+    assert (boxes[0].size, boxes[0].font) == (32, "bold")
+    assert (boxes[26].size, boxes[26].font) == (18, "regular")
+    # The master sets zero insets, so the box is the full shape width
+    assert round(boxes[26].width, 1) == round(11084673 / 12700, 1)
+
+    shapes = {shape.placeholder_format.idx: shape for shape in slide.placeholders}
+    assert shapes[0].text == "Title"
+    runs = shapes[27].text_frame.paragraphs[0].runs
+    assert runs[0].font.size is not None and runs[0].font.size < Pt(boxes[27].size)
+    assert generator._metrics.counters["text_fit_shrunk"] == 1
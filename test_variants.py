@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test multi-variant decks offline with a stub GenAI client
+"""
+
+import json
+import os
+import re
+import threading
+
+import pytest
+from pptx import Presentation
+
+from metrics import BuildMetrics
+from presentation_generator import PresentationGenerator
+from template_cache import template_cache
+from variants import create_variant_presentations, generate_variant_outlines, parse_variants
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "input/branding.pptx")
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class VariantClient:
+    """Answers every variant listed in the prompt, fitting at most `fits` variants per reply"""
+
+    def __init__(self, layout_ids, fits=None):
+        self.layout_ids = layout_ids
+        self.fits = fits
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        names = re.findall(r"^- (\w+): ", prompt, re.MULTILINE)
+        with self._lock:
+            self.requests.append(names)
+        variants = {name: {"layouts": [{"id": layout_id, "placeholders": [
+            {"idx": 0, "content": f"{name} slide {layout_id}"}]} for layout_id in self.layout_ids]}
+            for name in names}
+        text = json.dumps({"variants": variants})
+        if self.fits is not None and len(names) > self.fits:
+            # Cut off half way through the first variant that does not fit
+            fitted = json.dumps({"variants": {name: variants[name] for name in names[:self.fits]}})[:-2]
+            partial = json.dumps({names[self.fits]: variants[names[self.fits]]})[1:]
+            text = f"{fitted}, {partial[:len(partial) // 2]}"
+        return StubResponse(text)
+
+
+def _generator(monkeypatch, fits=None):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    generator = PresentationGenerator(TEMPLATE)
+    generator.save_responses = False
+    generator.client = VariantClient(sorted(generator.layouts_by_id), fits)
+    return generator
+
+
+def test_parse_variants():
+    executive, german, board = parse_variants("executive, de, board=Three slides of key numbers")
+    assert executive.instruction == "aimed at executive readers"
+    assert "German" in german.instruction
+    assert (board.name, board.instruction) == ("board", "Three slides of key numbers")
+    with pytest.raises(ValueError):
+        parse_variants("en,en")
+
+
+def test_all_variants_come_from_one_request_and_share_the_template(monkeypatch, tmp_path):
+    generator = _generator(monkeypatch)
+    single = BuildMetrics()
+    generator.generate_outline("Topic", metrics=single)
+
+    metrics = BuildMetrics()
+    outlines = generate_variant_outlines(generator, "Topic", parse_variants("executive,technical,en,de,fr"),
+                                         metrics=metrics)
+    assert generator.client.requests[-1] == ["executive", "technical", "en", "de", "fr"]
+    assert metrics.counters["variant_requests"] == 1
+    # The layout catalogue is sent once, so five variants cost far less than five prompts
+    assert metrics.counters["prompt_tokens_estimate"] < 1.3 * single.counters["prompt_tokens_estimate"]
+
+    # Parsed (at most) once, then cloned for every variant
+    template_cache.get(TEMPLATE)
+    misses = template_cache.misses
+    paths = create_variant_presentations(generator, outlines, str(tmp_path / "deck.pptx"), metrics)
+    assert template_cache.misses == misses
+    assert list(paths) == ["executive", "technical", "en", "de", "fr"]
+    assert os.path.basename(paths["de"]) == "deck_de.pptx"
+    title = Presentation(paths["de"]).slides[0].shapes.title
+    assert title.text_frame.text.startswith("de slide")
+
+
+def test_variants_cut_off_by_the_output_limit_are_requested_again(monkeypatch):
+    generator = _generator(monkeypatch, fits=2)
+    metrics = BuildMetrics()
+    outlines = generate_variant_outlines(generator, "Topic", parse_variants("a1,b2,c3,d4,e5"),
+                                         metrics=metrics)
+
+    # Two variants fit the first reply; the cut-off third and the rest follow two per call
+    assert generator.client.requests[0] == ["a1", "b2", "c3", "d4", "e5"]
+    assert sorted(generator.client.requests[1:]) == [["c3", "d4"], ["e5"]]
+    assert metrics.counters["variant_requests"] == 3
+    for name, outline in outlines.items():
+        assert len(outline["layouts"]) == len(generator.layouts_by_id)
+        assert outline["layouts"][0]["placeholders"][0]["content"].startswith(name)
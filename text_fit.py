@@ -0,0 +1,306 @@
+"""
+Metric-based text fitting for placeholders
+
+Instead of cutting text at a fixed character count, each placeholder's text box
+is read from the template (size, insets, font size, weight, line and paragraph
+spacing, inherited slide -> layout -> master) and the text is word-wrapped with
+glyph-width tables. Text that would overflow is first set at a smaller font
+size, down to MIN_SCALE of the template size, and only when that is not enough
+is it cut at a word boundary with an ellipsis. Layout is plain arithmetic on
+cached word widths, so no renderer round-trip is involved.
+
+The width tables are the Helvetica metrics in 1/1000 em. Arial is metric
+compatible with them and the template's Graphik faces are close; semibold and
+bold faces use the bold table.
+"""
+
+import math
+import unicodedata
+from functools import lru_cache
+from typing import List, Optional
+
+_NAMESPACES = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+}
+
+EMU_PER_PT = 12700
+DEFAULT_SIZE = 18.0
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)  # left, top, right, bottom
+LINE_HEIGHT = 1.2  # line pitch as a multiple of the font size at 100% spacing
+MIN_SCALE = 0.7
+MIN_SIZE = 8.0
+ELLIPSIS = "…"
+
+_ASCII = "".join(chr(c) for c in range(32, 127))
+_REGULAR_ASCII = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_BOLD_ASCII = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_PUNCTUATION = {
+    "•": (350, 350),  # bullet
+    "–": (556, 556),  # en dash
+    "—": (1000, 1000),  # em dash
+    "‘": (222, 278), "’": (222, 278),
+    "“": (333, 500), "”": (333, 500),
+    "…": (1000, 1000),
+    "€": (556, 556), "£": (556, 556), " ": (278, 278),
+}
+
+WIDTHS = {
+    "regular": dict(zip(_ASCII, _REGULAR_ASCII), **{ch: w[0] for ch, w in _PUNCTUATION.items()}),
+    "bold": dict(zip(_ASCII, _BOLD_ASCII), **{ch: w[1] for ch, w in _PUNCTUATION.items()}),
+}
+
+
+def _fallback_width(char: str, font: str) -> int:
+    """Width of a character missing from the table"""
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 1000
+    base = unicodedata.normalize("NFD", char)[0]
+    return WIDTHS[font].get(base, 556)
+
+
+@lru_cache(maxsize=65536)
+def word_width(word: str, font: str, size: float) -> float:
+    """Advance width of `word` in points, cached per font and size"""
+    table = WIDTHS[font]
+    units = 0
+    for char in word:
+        width = table.get(char)
+        units += width if width is not None else _fallback_width(char, font)
+    return units * size / 1000.0
+
+
+class TextBox:
+    """Usable text area and base typography of one placeholder, in points"""
+
+    __slots__ = ("width", "height", "size", "font", "line_spacing", "space_after", "wrap")
+
+    def __init__(self, width: float, height: Optional[float], size: float = DEFAULT_SIZE,
+                 font: str = "regular", line_spacing: float = 1.0, space_after: float = 0.0,
+                 wrap: bool = True):
+        self.width = width
+        self.height = height  # None when the shape grows to fit its text
+        self.size = size
+        self.font = font
+        self.line_spacing = line_spacing
+        self.space_after = space_after
+        self.wrap = wrap
+
+    def __repr__(self):
+        height = "auto" if self.height is None else f"{self.height:.1f}"
+        return (f"TextBox({self.width:.1f}x{height}pt, {self.size:g}pt {self.font}, "
+                f"spacing={self.line_spacing:g}, after={self.space_after:g})")
+
+
+class FitResult:
+    """Text to write and the font size to force (None keeps the template size)"""
+
+    __slots__ = ("text", "size", "truncated")
+
+    def __init__(self, text: str, size: Optional[float] = None, truncated: bool = False):
+        self.text = text
+        self.size = size
+        self.truncated = truncated
+
+
+def _count_lines(words: List[str], box: TextBox, size: float) -> int:
+    """Lines one paragraph wraps to at `size`"""
+    if not words:
+        return 1
+    space = word_width(" ", box.font, size)
+    lines = 1
+    used = 0.0
+    for word in words:
+        width = word_width(word, box.font, size)
+        if not box.wrap:
+            used += (space if used else 0.0) + width
+            continue
+        if used and used + space + width <= box.width:
+            used += space + width
+            continue
+        if used:
+            lines += 1
+        if width > box.width:
+            # PowerPoint breaks an over-long word across lines
+            extra = math.ceil(width / box.width)
+            lines += extra - 1
+            used = width - (extra - 1) * box.width
+        else:
+            used = width
+    if not box.wrap and used > box.width:
+        return 2  # unwrapped text runs out of the box sideways
+    return lines
+
+
+def text_height(paragraphs: List[List[str]], box: TextBox, size: float) -> float:
+    """Height the wrapped paragraphs take at `size`"""
+    pitch = size * LINE_HEIGHT * box.line_spacing
+    lines = sum(_count_lines(words, box, size) for words in paragraphs)
+    return lines * pitch + box.space_after * (len(paragraphs) - 1)
+
+
+def _fits(paragraphs: List[List[str]], box: TextBox, size: float) -> bool:
+    if box.height is None:
+        return box.wrap or all(_count_lines(words, box, size) == 1 for words in paragraphs)
+    # A single line always fits: templates often size one-line boxes tighter than the line pitch
+    budget = max(box.height, size * LINE_HEIGHT * box.line_spacing)
+    return text_height(paragraphs, box, size) <= budget + 0.01
+
+
+def _split(text: str) -> List[List[str]]:
+    return [paragraph.split() for paragraph in text.split("\n")]
+
+
+def _prefix(paragraphs: List[List[str]], count: int) -> List[List[str]]:
+    """The first `count` words, keeping paragraph breaks, with an ellipsis appended"""
+    kept = []
+    for words in paragraphs:
+        if count <= 0:
+            break
+        kept.append(words[:count])
+        count -= len(words)
+    if not kept:
+        return [[ELLIPSIS]]
+    kept[-1] = kept[-1][:-1] + [kept[-1][-1].rstrip(",;:.-") + ELLIPSIS] if kept[-1] else [ELLIPSIS]
+    return kept
+
+
+def _join(paragraphs: List[List[str]]) -> str:
+    return "\n".join(" ".join(words) for words in paragraphs)
+
+
+def fit_text(text: str, box: TextBox, min_scale: float = MIN_SCALE) -> FitResult:
+    """Fit `text` into `box`: as is, at a smaller size, or cut at a word boundary
+
+    Font sizes step down one point at a time to min_scale of the template size
+    (never below MIN_SIZE); text that does not fit even then is truncated at
+    the smallest size.
+    """
+    paragraphs = _split(text)
+    if _fits(paragraphs, box, box.size):
+        return FitResult(text)
+
+    floor = max(min(MIN_SIZE, box.size), box.size * min_scale)
+    size = box.size
+    while size - 1 >= floor:
+        size -= 1
+        if _fits(paragraphs, box, size):
+            return FitResult(text, size)
+    if size > floor:
+        size = floor
+        if _fits(paragraphs, box, size):
+            return FitResult(text, size)
+
+    # Largest word prefix that fits, by bisection
+    total = sum(len(words) for words in paragraphs)
+    low, high = 0, total - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _fits(_prefix(paragraphs, middle), box, size):
+            low = middle
+        else:
+            high = middle - 1
+    return FitResult(_join(_prefix(paragraphs, low)), size if size != box.size else None, True)
+
+
+def _inheritance_chain(shape) -> list:
+    """The shape's XML element followed by its layout and master placeholders'"""
+    chain = []
+    while shape is not None:
+        chain.append(shape._element)
+        shape = getattr(shape, "_base_placeholder", None)
+    return chain
+
+
+@lru_cache(maxsize=None)
+def _xpath(path: str):
+    from lxml.etree import XPath
+    return XPath(path, namespaces=_NAMESPACES)
+
+
+def _first(elements, path: str):
+    for element in elements:
+        found = _xpath(path)(element)
+        if found:
+            return found[0]
+    return None
+
+
+def _master_style(chain, is_title: bool):
+    """lvl1pPr of the master's title or body text style"""
+    root = chain[-1].getroottree().getroot()
+    style = "p:titleStyle" if is_title else "p:bodyStyle"
+    found = _xpath(f"./p:txStyles/{style}/a:lvl1pPr")(root)
+    return found[0] if found else None
+
+
+def measure_box(shape) -> Optional[TextBox]:
+    """Read a placeholder's text box from the template, None if it has no geometry"""
+    try:
+        width, height = shape.width, shape.height
+    except (AttributeError, ValueError):
+        return None
+    if not width or not height:
+        return None
+
+    chain = _inheritance_chain(shape)
+    is_title = shape.placeholder_format.type in _title_types()
+    levels = [element for element in chain
+              for element in _xpath("./p:txBody/a:lstStyle/a:lvl1pPr")(element)]
+    master_style = _master_style(chain, is_title)
+    if master_style is not None:
+        levels.append(master_style)
+
+    insets = [
+        int(_first(chain, f"./p:txBody/a:bodyPr/@{name}") or default)
+        for name, default in zip(("lIns", "tIns", "rIns", "bIns"), DEFAULT_INSETS)
+    ]
+    size = _first(levels, "./a:defRPr/@sz")
+    bold = _first(levels, "./a:defRPr/@b")
+    typeface = _first(levels, "./a:defRPr/a:latin/@typeface") or ""
+    spacing = _first(levels, "./a:lnSpc/a:spcPct/@val")
+    after = _first(levels, "./a:spcAft/a:spcPts/@val")
+    grows = _first(chain, "./p:txBody/a:bodyPr/a:spAutoFit") is not None
+    wrap = _first(chain, "./p:txBody/a:bodyPr/@wrap") != "none"
+
+    heavy = bold in ("1", "true") or "bold" in typeface.lower()
+    return TextBox(
+        width=(width - insets[0] - insets[2]) / EMU_PER_PT,
+        height=None if grows else (height - insets[1] - insets[3]) / EMU_PER_PT,
+        size=int(size) / 100.0 if size else DEFAULT_SIZE,
+        font="bold" if heavy else "regular",
+        line_spacing=int(spacing) / 100000.0 if spacing else 1.0,
+        space_after=int(after) / 100.0 if after else 0.0,
+        wrap=wrap,
+    )
+
+
+@lru_cache(maxsize=1)
+def _title_types():
+    from pptx.enum.shapes import PP_PLACEHOLDER
+    return {PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.VERTICAL_TITLE}
+
+
+def apply_fit(shape, result: FitResult):
+    """Write a fit result into a placeholder"""
+    shape.text = result.text
+    if result.size is not None:
+        from pptx.util import Pt
+        size = Pt(result.size)
+        for paragraph in shape.text_frame.paragraphs:
+            for run in paragraph.runs:
+                run.font.size = size
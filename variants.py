@@ -0,0 +1,197 @@
+"""
+Multi-variant decks: several audiences or languages from one outline request
+
+Building executive and technical versions of a deck, or English, German and
+French ones, used to take one outline request per variant, each re-sending the
+whole layout catalogue. Here one request carries the catalogue once and asks for
+every variant in a single `{"variants": {name: outline}}` reply. When the reply
+hits the output limit, the variants that did not fit (including one cut off
+half way) are requested again in groups no larger than what fitted, concurrently,
+down to one variant per call.
+
+The variant outlines are then rendered as separate decks from the same parsed
+template (see template_cache), named <output stem>_<variant>.pptx.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from fanout import _load_prompt
+from json_repair import TRUNCATED
+from prompt_compiler import OUTLINE_SCHEMA, json_generation_config
+
+VARIANTS_PROMPT = os.path.join(os.path.dirname(__file__), "input/variants_prompt.md")
+
+# Variant names that are read as an output language rather than an audience
+LANGUAGES = {
+    "en": "English", "de": "German", "fr": "French", "es": "Spanish", "it": "Italian",
+    "nl": "Dutch", "pt": "Portuguese", "pl": "Polish", "ja": "Japanese", "zh": "Chinese",
+}
+
+
+class Variant:
+    """One requested version of a deck: a name (used in file names) and an instruction"""
+
+    __slots__ = ("name", "instruction")
+
+    def __init__(self, name: str, instruction: str):
+        self.name = name
+        self.instruction = instruction
+
+
+def parse_variants(spec: str) -> List[Variant]:
+    """Parse `executive,technical,de` or `board=Three slides of key numbers, ...`
+
+    Language codes in LANGUAGES ask for the deck in that language; any other
+    name is taken as the audience. `name=instruction` spells the instruction out.
+    """
+    variants = []
+    for item in spec.split(","):
+        name, _, instruction = (part.strip() for part in item.partition("="))
+        if not name:
+            continue
+        if not instruction:
+            language = LANGUAGES.get(name.lower())
+            instruction = (f"all placeholder text written in {language}" if language
+                           else f"aimed at {name} readers")
+        variants.append(Variant(name, instruction))
+    names = [variant.name for variant in variants]
+    if not variants or len(set(names)) != len(names):
+        raise ValueError(f"Variants must be distinct, non-empty names: {spec!r}")
+    return variants
+
+
+def variants_schema(names: List[str]) -> Dict:
+    """JSON-mode response schema for a variants reply"""
+    return {
+        "type": "object",
+        "properties": {
+            "variants": {
+                "type": "object",
+                "properties": {name: OUTLINE_SCHEMA for name in names},
+                "required": list(names),
+            },
+        },
+        "required": ["variants"],
+    }
+
+
+def _complete_variants(reply, group: List[str], truncated: bool, layout_ids) -> Dict[str, Dict]:
+    """Variants of `group` that came back whole
+
+    In a reply that was cut off, the last variant is incomplete unless it already
+    uses every layout.
+    """
+    found = reply.get("variants") if isinstance(reply, dict) else None
+    if not isinstance(found, dict):
+        return {}
+    present = [name for name in found if name in group and isinstance(found[name], dict)
+               and (found[name].get("layouts") or found[name].get("slides"))]
+    complete = {}
+    for name in present:
+        outline = found[name]
+        if truncated and name == present[-1]:
+            ids = {layout.get("id") for layout in outline.get("layouts", [])}
+            if not ids >= set(layout_ids):
+                continue
+        complete[name] = outline
+    return complete
+
+
+def generate_variant_outlines(generator, topic: str, variants: List[Variant],
+                              concurrency: int = 4, metrics=None) -> Dict[str, Dict]:
+    """Outlines for every variant of `topic`, keyed by variant name in the order given
+
+    Starts with one request for all variants; raises when a variant cannot be
+    generated even on its own.
+    """
+    from metrics import BuildMetrics
+
+    metrics = metrics or BuildMetrics(topic)
+    names = [variant.name for variant in variants]
+    if not generator.client:
+        print("⚠️  Using mock mode (no API key provided)")
+        return {name: generator._generate_mock_outline(topic) for name in names}
+
+    started = time.perf_counter()
+    print(f"🎭 Requesting {len(names)} variants ({', '.join(names)}) in one call...")
+    with metrics.phase("prompt_load"):
+        base_prompt = generator._load_prompt_template().replace("{topic}", topic)
+        variants_template = _load_prompt(VARIANTS_PROMPT)
+    by_name = {variant.name: variant for variant in variants}
+
+    def request(group: List[str], save_as: str = None):
+        prompt = base_prompt + (variants_template
+                                .replace("{variant_count}", str(len(group)))
+                                .replace("{variants}", "\n".join(f"- {name}: {by_name[name].instruction}"
+                                                                 for name in group)))
+        config = json_generation_config(variants_schema(group)) if generator.generation_config else None
+        repairs = []
+        reply = generator._request_json(prompt, metrics, save_as=save_as, repairs=repairs,
+                                        generation_config=config)
+        complete = _complete_variants(reply, group, TRUNCATED in repairs, generator.layouts_by_id)
+        if len(group) == 1 and not complete:
+            # On its own, keep whatever part of the variant was salvaged
+            partial = _complete_variants(reply, group, False, generator.layouts_by_id)
+            if partial:
+                print(f"⚠️  Variant '{group[0]}' was cut off, keeping the layouts received")
+            complete = partial
+        return complete
+
+    outlines: Dict[str, Dict] = {}
+    requests = 0
+    groups = [names]
+    while groups:
+        # Only the first, all-variants reply is saved to output/
+        save_as = f"{topic} variants" if requests == 0 else None
+        requests += len(groups)
+        fitted = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(groups)))) as pool:
+            futures = [(group, pool.submit(request, group, save_as)) for group in groups]
+            for group, future in futures:
+                try:
+                    complete = future.result()
+                except Exception as e:
+                    print(f"⚠️  Variants {', '.join(group)} failed: {e}")
+                    complete = {}
+                outlines.update(complete)
+                fitted = max(fitted, len(complete))
+                if len(group) == 1 and not complete:
+                    raise RuntimeError(f"Variant '{group[0]}' could not be generated")
+
+        pending = [name for name in names if name not in outlines]
+        if pending:
+            # Ask for as many variants per call as fitted in one reply (at least one)
+            size = max(1, fitted or max(len(group) for group in groups) // 2)
+            print(f"🔁 {len(pending)} variants did not fit, requesting them in groups of {size}...")
+            groups = [pending[i:i + size] for i in range(0, len(pending), size)]
+        else:
+            groups = []
+
+    metrics.set("variants", len(names))
+    metrics.set("variant_requests", requests)
+    print(f"✅ Generated {len(names)} variants in {requests} requests, "
+          f"{time.perf_counter() - started:.1f}s")
+    return {name: outlines[name] for name in names}
+
+
+def variant_output_path(output_path: str, name: str) -> str:
+    """deck.pptx -> deck_<name>.pptx"""
+    from presentation_generator import safe_topic_name
+
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{safe_topic_name(name)}{ext or '.pptx'}"
+
+
+def create_variant_presentations(generator, outlines: Dict[str, Dict], output_path: str,
+                                 metrics=None) -> Dict[str, str]:
+    """Render each variant's outline to its own deck; returns variant name -> path"""
+    paths = {}
+    for name, outline in outlines.items():
+        path = variant_output_path(output_path, name)
+        print(f"🎭 Rendering variant '{name}'")
+        generator.create_presentation(outline, path, metrics)
+        paths[name] = path
+    return paths